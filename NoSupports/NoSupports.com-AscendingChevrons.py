@@ -1,10 +1,19 @@
 import adsk.core, adsk.fusion, adsk.cam, traceback
 import math
+import time
 
 import os, sys
 sys.path.append("C:/Python311/Lib/site-packages")
+sys.path.append(os.path.dirname(os.path.realpath(__file__)))
 
-import ezdxf
+from chevronGeometry import ChevronLayout, computeChevronGrid
+from chevronDxf import dxfChevronLayout, writeChevronDxf
+from dxfSink import createDxfSink
+from chevronCache import ChevronCache, chevronCacheKey
+from commandSettings import CommandSettings
+from expressionCache import getExpressionCache
+from phaseTimer import finishTrace, span, startTrace
+from uiLogger import getLogger
 
 # Globals
 _app = adsk.core.Application.cast(None)
@@ -12,19 +21,42 @@ _ui = adsk.core.UserInterface.cast(None)
 _units = ''
 _uiName = 'NoSupports.com Ascending Chevron'
 
-class UiLogger:
-    def __init__(self, forceUpdate):  
-        app = adsk.core.Application.get()
-        ui  = app.userInterface
-        palettes = ui.palettes
-        self.textPalette = palettes.itemById("TextCommands")
-        self.forceUpdate = forceUpdate
-        self.textPalette.isVisible = True 
-    
-    def print(self, text):       
-        self.textPalette.writeText(text)
-        if (self.forceUpdate):
-            adsk.doEvents() 
+# Where the generated DXF is written before it is imported: 'tempfile' (unique
+# per run, removed afterwards), 'memory' or 'legacy' (the old c:/foo.dxf).
+_dxfSinkType = 'tempfile'
+
+# How chevrons and struts are written to the DXF: 'flat' (a polyline per
+# entity), 'insert' (blocks placed once per cell), 'minsert' (one block array
+# per block), 'stream' (R12 polylines streamed to the sink with constant
+# memory, for very large grids), 'welded' (shared vertices welded and
+# overlapping edges merged, written as lines) or 'merged' (the union of all the
+# webbing as a few closed outlines; needs shapely).  Set _dxfExplodeBlocks
+# when the importer needs flat geometry.  'flat' stays the default because it
+# is the only writer whose entities Fusion's import is known to turn into
+# sketch profiles; the block writers expand to the same segments but have not
+# been checked against the importer.
+_dxfWriter = 'flat'
+_dxfExplodeBlocks = False
+
+# Vertices closer than this (in DXF units) are welded by the 'welded' writer
+# and snapped together by the 'merged' writer.
+_weldTolerance = 1e-6
+
+# Generated DXF files are kept in a size-bounded on-disk cache (see
+# chevronCache.py) so re-running the same parameters skips generation.
+_useChevronCache = True
+_chevronCacheMaxBytes = 512 * 1024 * 1024
+
+# Largest grid (in cells) that 'Auto' output draws straight into the sketch.
+# Below this the per-entity API calls are cheaper than a DXF round trip; above
+# it the importer's bulk path wins.  Retune from benchmark runs.
+_directSketchMaxCells = 400
+
+# Set _tracePhases to time each phase of a run and print a summary table to the
+# TextCommands palette.  With _phaseTraceFile set as well, the spans are also
+# saved there as a Chrome trace (chrome://tracing or ui.perfetto.dev).
+_tracePhases = False
+_phaseTraceFile = ''
 
 # Command inputs
 
@@ -35,10 +67,25 @@ _heightParam = adsk.core.ValueCommandInput.cast(None)
 _numCols = adsk.core.ValueCommandInput.cast(None)
 _numRows = adsk.core.ValueCommandInput.cast(None)
 _webbing  = adsk.core.ValueCommandInput.cast(None)
+_output = adsk.core.DropDownCommandInput.cast(None)
 _errMessage = adsk.core.TextBoxCommandInput.cast(None)
 _module = adsk.core.ValueCommandInput.cast(None)
 _handlers = []
 
+# The dialog values saved on the design, loaded once when the command is
+# created and saved again on execute.
+_settingsDefaults = {
+    'sketchName': 'Sketch1',
+    'margin': 'margin',
+    'width': 'w1',
+    'height': 'h1',
+    'numCols': 4,
+    'numRows': 4,
+    'webbing': 2.0,
+    'output': 'Auto',
+}
+_settings = None
+
 def run(context):
     try:
         global _app, _ui
@@ -85,7 +132,8 @@ class MeshCommandDestroyHandler(adsk.core.CommandEventHandler):
 # problem where when you get the value from a ValueCommandInput it causes the
 # current expression to be evaluated and updates the display.  Some new functionality
 # is being added in the future to the ValueCommandInput object that will make 
-# this easier and should make this function obsolete.
+# this easier and should make this function obsolete.  Results are cached
+# for the life of the command, see expressionCache.py.
 def getCommandInputValue(commandInput, unitType):
     try:
         valCommandInput = adsk.core.ValueCommandInput.cast(commandInput)
@@ -96,11 +144,7 @@ def getCommandInputValue(commandInput, unitType):
         des = adsk.fusion.Design.cast(_app.activeProduct)
         unitsMgr = des.unitsManager
         
-        if unitsMgr.isValidExpression(valCommandInput.expression, unitType):
-            value = unitsMgr.evaluateExpression(valCommandInput.expression, unitType)
-            return (True, value)
-        else:
-            return (False, 0)
+        return getExpressionCache().evaluate(unitsMgr, valCommandInput.expression, unitType)
     except:
         if _ui:
             _ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
@@ -126,58 +170,33 @@ class MeshCommandCreatedHandler(adsk.core.CommandCreatedEventHandler):
             global _units
             _units = 'mm'
             
-            sketchName = 'Sketch1'
-            sketchNameAttrib = des.attributes.itemByName(_uiName, 'sketchName')
-            if sketchNameAttrib:
-                sketchName = sketchNameAttrib.value
-
-            margin = 'margin'
-            marginAttrib = des.attributes.itemByName(_uiName, 'margin')
-            if marginAttrib:
-                margin = marginAttrib.value
-
-            width = 'w1'
-            widthAttrib = des.attributes.itemByName(_uiName, 'width')
-            if widthAttrib:
-                width = widthAttrib.value
-
-            height = 'h1'
-            heightAttrib = des.attributes.itemByName(_uiName, 'height')
-            if heightAttrib:
-                height = heightAttrib.value
-
-            numCols = '4'
-            numColsAttrib = des.attributes.itemByName(_uiName, 'numCols')
-            if numColsAttrib:
-                numCols = numColsAttrib.value
-
-
-            numRows = '4'
-            numRowsAttrib = des.attributes.itemByName(_uiName, 'numRows')
-            if numRowsAttrib:
-                numRows = numRowsAttrib.value
-
-            webbing = '2'
-            webbingAttrib = des.attributes.itemByName(_uiName, 'webbing')
-            if webbingAttrib:
-                webbing = webbingAttrib.value
+            global _settings
+            _settings = CommandSettings(des, _uiName, _settingsDefaults).load()
+
+            # Parameters may have changed since the last time the dialog was
+            # open, so start with no remembered expression values.
+            getExpressionCache().invalidate()
 
             cmd = eventArgs.command
             cmd.isExecutedWhenPreEmpted = False
             inputs = cmd.commandInputs
             
-            global _marginParam, _sketchName, _widthParam, _heightParam, _numCols, _numRows, _webbing, _module, _errMessage
+            global _marginParam, _sketchName, _widthParam, _heightParam, _numCols, _numRows, _webbing, _output, _module, _errMessage
 
             # Define the command dialog.         
             _imgInput = inputs.addImageCommandInput('infoImage', '', 'resources/AscendingChevrons.png')
             _imgInput.isFullWidth = True
-            _marginParam = inputs.addStringValueInput('margin', 'Margin', margin)   
-            _sketchName = inputs.addStringValueInput('sketchName', 'SketchName', sketchName)   
-            _widthParam = inputs.addStringValueInput('width', 'Width', width)   
-            _heightParam = inputs.addStringValueInput('height', 'Height', height)   
-            _numCols = inputs.addStringValueInput('numCols', 'Num Cols', numCols)   
-            _numRows = inputs.addStringValueInput('numRows', 'Num Rows', numRows)   
-            _webbing = inputs.addStringValueInput('webbing', 'Webbing', webbing)   
+            _marginParam = inputs.addStringValueInput('margin', 'Margin', _settings['margin'])   
+            _sketchName = inputs.addStringValueInput('sketchName', 'SketchName', _settings['sketchName'])   
+            _widthParam = inputs.addStringValueInput('width', 'Width', _settings['width'])   
+            _heightParam = inputs.addStringValueInput('height', 'Height', _settings['height'])   
+            _numCols = inputs.addStringValueInput('numCols', 'Num Cols', str(_settings['numCols']))   
+            _numRows = inputs.addStringValueInput('numRows', 'Num Rows', str(_settings['numRows']))   
+            _webbing = inputs.addStringValueInput('webbing', 'Webbing', '{:g}'.format(_settings['webbing']))   
+
+            _output = inputs.addDropDownCommandInput('output', 'Output', adsk.core.DropDownStyles.TextListDropDownStyle)
+            for outputName in ['Auto', 'DXF import', 'Direct sketch', 'Pattern']:
+                _output.listItems.add(outputName, outputName == _settings['output'])
 
             
             _errMessage = inputs.addTextBoxCommandInput('errMessage', '', '', 2, True)
@@ -204,6 +223,19 @@ class MeshCommandCreatedHandler(adsk.core.CommandCreatedEventHandler):
                 _ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
 
 
+# Ends the phase trace of a run, if one was started, and reports it.
+def reportPhases():
+    trace = finishTrace()
+    if trace is None:
+        return
+    log = getLogger()
+    for line in trace.summary():
+        log.print(line)
+    if _phaseTraceFile:
+        trace.writeChromeTrace(_phaseTraceFile)
+        log.print("Wrote phase trace to " + _phaseTraceFile)
+
+
 def convertUnits(val):
     global _units
 
@@ -227,40 +259,60 @@ class MeshCommandExecuteHandler(adsk.core.CommandEventHandler):
     def __init__(self):
         super().__init__()
     def notify(self, args):
+        if _tracePhases:
+            startTrace('Ascending Chevrons')
         try:
             eventArgs = adsk.core.CommandEventArgs.cast(args)
   
-            # Save the current values as attributes.
+            # Save the current values on the design.
             des = adsk.fusion.Design.cast(_app.activeProduct)
-            attribs = des.attributes
-            attribs.add(_uiName, 'margin',  str(_marginParam.value))
-            attribs.add(_uiName, 'sketchName',  str(_sketchName.value))
-            attribs.add(_uiName, 'width', str(_widthParam.value))
-            attribs.add(_uiName, 'height', str(_heightParam.value))
-            attribs.add(_uiName, 'numCols', str(_numCols.value))
-            attribs.add(_uiName, 'numRows', str(_numRows.value))
-            attribs.add(_uiName, 'webbing', str(_webbing.value))
-
-            width = getDesignParam(des,str(_widthParam.value),False)
-            height = getDesignParam(des,str(_heightParam.value),False)
-            margin = getDesignParam(des,str(_marginParam.value),False)
+            with span('save settings'):
+                _settings.update(margin=_marginParam.value, sketchName=_sketchName.value,
+                                 width=_widthParam.value, height=_heightParam.value,
+                                 numCols=_numCols.value, numRows=_numRows.value,
+                                 webbing=_webbing.value, output=_output.selectedItem.name)
+                _settings.save()
+
+            with span('read parameters'):
+                width = getDesignParam(des,str(_widthParam.value),False)
+                height = getDesignParam(des,str(_heightParam.value),False)
+                margin = getDesignParam(des,str(_marginParam.value),False)
             numCols = float(_numCols.value)
             numRows = float(_numRows.value)
             webbing = convertUnits(float(_webbing.value))
             sketchName = str(_sketchName.value)
 
 
-            log = UiLogger(True)
+            log = getLogger()
 
             log.print("Width " + str(width))
             log.print("Height " + str(height))
             log.print("Margin " + str(margin))
 
             # Create the mesh.
-            dxfDrawAscendingChevrons(des, width, height, numCols, numRows, webbing, margin,sketchName)
+            output = _output.selectedItem.name
+            if output == 'Auto':
+                if int(numCols) * int(numRows) <= _directSketchMaxCells:
+                    output = 'Direct sketch'
+                else:
+                    output = 'DXF import'
+
+            start = time.perf_counter()
+            if output == 'Direct sketch':
+                sketchDrawAscendingChevrons(des, width, height, numCols, numRows, webbing, margin,sketchName)
+            elif output == 'Pattern':
+                patternDrawAscendingChevrons(des, width, height, numCols, numRows, webbing, margin,sketchName,
+                                             str(_widthParam.value), str(_heightParam.value), str(_marginParam.value),
+                                             str(_webbing.value))
+            else:
+                dxfDrawAscendingChevrons(des, width, height, numCols, numRows, webbing, margin,sketchName)
+            log.print("{} took {:.1f} ms".format(output, (time.perf_counter() - start) * 1000.0))
         except:
             if _ui:
                 _ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
+        finally:
+            reportPhases()
+            getLogger().flush()
                 
 # Event handler for the inputChanged event.
 class MeshCommandInputChangedHandler(adsk.core.InputChangedEventHandler):
@@ -299,6 +351,24 @@ class MeshCommandValidateInputsHandler(adsk.core.ValidateInputsEventHandler):
             eventArgs = adsk.core.ValidateInputsEventArgs.cast(args)
             
             _errMessage.text = ''
+
+            # The grid is built with, and the settings saved from, these
+            # values, so they must be numbers the settings can keep.
+            for commandInput, name in ((_numCols, 'columns'), (_numRows, 'rows')):
+                count = commandInput.value.strip()
+                if not count.isdigit() or int(count) < 1:
+                    _errMessage.text = 'The number of {} must be a whole number of 1 or more.'.format(name)
+                    eventArgs.areInputsValid = False
+                    return
+
+            try:
+                webbing = float(_webbing.value)
+            except ValueError:
+                webbing = math.nan
+            if not math.isfinite(webbing) or webbing <= 0.0:
+                _errMessage.text = 'The webbing must be a number greater than 0.'
+                eventArgs.areInputsValid = False
+                return
         except:
             if _ui:
                 _ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
@@ -547,45 +617,11 @@ def drawHex(sketch, numCols,startX,startY):
                                                  adsk.core.Point3D.create(numCols, 0, 0))
 
 
-# TODO: Add a flip axis flag to script and try to deduce it automatically
-
-def flipY(y,height):
-    return height-y - height
-
-def dxfDrawChevron(msp, chevronWidth,webbing,startX,startY,height):
-    apexHeight = chevronWidth/2.0
-    halfWidth = chevronWidth/2.0
-    # overall webbing + half width
-    # 1/2 numCols for bottom triangle
-    # 1/2 numCols for top triangle
-    # 1 numCols for middle square
-    #  y coords
-
-    y0 = startY
-    y1 = y0 + webbing
-    y2 = y1 + apexHeight
-    y3 = y2 - webbing
-
-    y0 = flipY(y0,height)
-    y1 = flipY(y1,height)
-    y2 = flipY(y2,height)
-    y3 = flipY(y3,height)
-
-    # compute x coords
-    x0 = startX
-    x1 = x0 + halfWidth
-    x2 = startX+chevronWidth
-
-    points = [ (x0, y0), (x0, y1), (x1, y2),(x2, y1), (x2, y0),(x1, y3),(x0, y0) ]
-                
-    msp.add_lwpolyline(points)
-
-
 def findSketch(sketches,sketchName):
 
     skt: fusion.Sketch = None
 
-    log = UiLogger(True)
+    log = getLogger()
 
     log.print("Found sketch " + sketchName)
 
@@ -598,123 +634,191 @@ def findSketch(sketches,sketchName):
 
     return result
 
-def dxfDrawStrut(msp,strutHeight,webbing,startX,startY,height):
-    # compute y coords
-    yAdj = webbing/2.0
-    y0 = startY
-    y1 = y0 + strutHeight
-
-    y0 = flipY(y0,height)
-    y1 = flipY(y1,height)
-
-    # compute x coords
-    x0 = startX - webbing/2.0
-    x1 = x0 + webbing
+# Finds the master sketch by name and clones it for the generated geometry.
+def cloneMasterSketch(design, sketchName):
+    with span('findSketch'):
+        masterSketch: fusion.Sketch = findSketch(design.rootComponent.sketches,sketchName)
+    with span('create_clone_sketch'):
+        return create_clone_sketch(masterSketch)
 
-    l1points = [(x0,y0),(x0,y1)]
-    msp.add_lwpolyline(l1points)
+# Writes the DXF for a layout to the sink with the writer chosen by _dxfWriter.
+def writeDxf(layout, dxfSink, log):
+    note = writeChevronDxf(layout, dxfSink, _dxfWriter, _dxfExplodeBlocks, _weldTolerance)
+    if note:
+        log.print(note)
 
-    l2points = [(x1,y0),(x1,y1)]
-    msp.add_lwpolyline(l2points)
-
-def dxfDrawAscendingChevrons(design, width, height, numCols, numRows, webbing, margin,sketchName):
+def dxfDrawAscendingChevrons(design, width, height, numCols, numRows, webbing, margin,sketchName, dxfSink=None):
     # TODO: Pass the cloned sketch in, fail with gracful error if sketch not found
 
     # Create a new sketch.
     thisComp = design.rootComponent
-    masterSketch: fusion.Sketch = findSketch(thisComp.sketches,sketchName)
-    sketch = create_clone_sketch(masterSketch)
-
-    log = UiLogger(True)
-
-    # Get the size from the UI
-    outerX1 = 0.0
-    outerY1 = 0.0
-    outerX2 = width
-    outerY2 = height
-
-    # Scale test
-    scale = 100.0
-
-    outerX2 = width/scale
-    outerY2 = height/scale
-    height = height/scale
-    width = width/scale
-    margin = margin/scale
-    webbing = webbing/scale
-
-    doc = ezdxf.new("R2000")
-    msp = doc.modelspace()
- 
- 
-
-    points = [(0, 0), (3, 0), (6, 3), (6, 6)]
-
-    r1x1 = 0
-    r1y1 = flipY(0,height)
-    r1x2 = outerX2
-    r1y2 = flipY(outerY2,height)
-    msp.add_lwpolyline([(r1x1,r1y1),(r1x2,r1y1),(r1x2,r1y2),(r1x1,r1y2),(r1x1,r1y1)])
-
-    r2x1 = margin
-    r2y1 = flipY(margin,height)
-    r2x2 = outerX2-margin
-    r2y2 = flipY(outerY2-margin,height)
+    sketch = cloneMasterSketch(design, sketchName)
 
-    msp.add_lwpolyline([(r2x1,r2y1),(r2x2,r2y1),(r2x2,r2y2),(r2x1,r2y2),(r2x1,r2y1)])
+    log = getLogger()
 
-    xOffset = margin
-    yOffset = margin
-
-    overallWidth = width-margin*2.0
-    overallHeight= height-margin*2.0
-
-    chevronWidth = (overallWidth/numCols)
-    
-    numCols = int(numCols)
-    numRows = int (numRows)
+    # The DXF is written at 1/dxfScale of the design size and mirrored in y.
+    layout = dxfChevronLayout(width, height, numCols, numRows, webbing, margin)
 
-    xStep = chevronWidth
-    yStep = overallHeight/float(numRows)
+    # Identical inputs produce an identical DXF, so a cache hit skips both the
+    # geometry and the write.
+    cache = None
+    cachedPath = None
+    if _useChevronCache:
+        with span('cache lookup'):
+            cache = ChevronCache(maxBytes=_chevronCacheMaxBytes)
+            cacheKey = chevronCacheKey(width, height, numCols, numRows, webbing, margin, _dxfWriter,
+                                       explode=_dxfExplodeBlocks, tolerance=_weldTolerance)
+            cachedPath = cache.get(cacheKey)
+        log.print(("Cache hit. " if cachedPath else "Cache miss. ") + cache.summary())
 
-    # TODO: broken when numRows = 1
-    if numRows == 1:
-        log.print("Uh oh, broken code!")
-    yStep = (overallHeight-(chevronWidth/2)-webbing)/(numRows-1)
+    if dxfSink is None:
+        dxfSink = createDxfSink(_dxfSinkType)
 
-    xOffset = margin
-    for y in range (0,numRows):
-        for x in range (0,numCols):
-            dxfDrawChevron(msp,chevronWidth,webbing,xOffset,yOffset,height)
-            xOffset += xStep
-        xOffset = margin
-        yOffset += yStep
-
-    # Draw struts at right sides of chevrons, except for last chevron
-    xOffset = margin
-    yOffset = margin
-
-    strutHeight = yStep*(numRows-1) + webbing/2
+    try:
+        if cachedPath:
+            dxfPath = cachedPath
+        else:
+            with span('dxf write'):
+                writeDxf(layout, dxfSink, log)
+                dxfPath = dxfSink.importPath()
+            if cache:
+                try:
+                    with span('cache store'):
+                        cache.put(cacheKey, dxfPath)
+                except OSError as error:
+                    log.print("Could not cache the DXF: " + str(error))
+
+        importStart = time.perf_counter()
+        with span('importToTarget'):
+            importManager = adsk.core.Application.get().importManager
+            dxfOptions = importManager.createDXF2DImportOptions(dxfPath, thisComp.xZConstructionPlane)
+
+            dxfOptions.isViewFit = False 
+            dxfOptions.isSingleSketchResult = True
+                
+            # Import dxf file to root component
+            importManager.importToTarget(dxfOptions, thisComp)
+        importSeconds = time.perf_counter() - importStart
+    finally:
+        dxfSink.close()
 
-    # TODO: Handle case with no struts!
-    for x in range (1,numCols):
-        dxfDrawStrut(msp,strutHeight,webbing,(xOffset+xStep),yOffset,height)
-        xOffset += xStep
+    log.print("DXF write {:.1f} ms ({} bytes), import {:.1f} ms".format(
+        dxfSink.writeSeconds * 1000.0, dxfSink.bytesWritten, importSeconds * 1000.0))
 
+    sketch.name = 'NoSupports Test'
+    return sketch
 
-    doc.saveas("c:/foo.dxf")
 
+# Draws polylines straight into a sketch.  Points are shared between polylines
+# so adjacent cells reuse the same sketch points, and a segment that was already
+# drawn (such as the edge two neighbouring chevrons have in common) is skipped.
+# Returns the sketch lines that were created.
+def sketchDrawPolylines(sketch, polylines):
+    lines = sketch.sketchCurves.sketchLines
+    sketchPoints = {}
+    drawnSegments = set()
+    newLines = []
 
-    importManager = adsk.core.Application.get().importManager
-    dxfOptions = importManager.createDXF2DImportOptions("C:/foo.dxf", thisComp.xZConstructionPlane)
+    def pointKey(x, y):
+        return (round(x * 1e7), round(y * 1e7))
 
-    dxfOptions.isViewFit = False 
-    dxfOptions.isSingleSketchResult = True
-            
-    # Import dxf file to root component
-    importManager.importToTarget(dxfOptions, thisComp)
+    sketch.isComputeDeferred = True
+    try:
+        for polyline in polylines:
+            prevKey = None
+            for x, y in polyline:
+                key = pointKey(x, y)
+                if prevKey is not None and key != prevKey:
+                    segment = (prevKey, key) if prevKey < key else (key, prevKey)
+                    if segment not in drawnSegments:
+                        drawnSegments.add(segment)
+                        startPoint = sketchPoints.get(prevKey) or adsk.core.Point3D.create(prevXY[0], prevXY[1], 0)
+                        endPoint = sketchPoints.get(key) or adsk.core.Point3D.create(x, y, 0)
+                        line = lines.addByTwoPoints(startPoint, endPoint)
+                        newLines.append(line)
+                        if prevKey not in sketchPoints:
+                            sketchPoints[prevKey] = line.startSketchPoint
+                        if key not in sketchPoints:
+                            sketchPoints[key] = line.endSketchPoint
+                prevKey = key
+                prevXY = (x, y)
+    finally:
+        sketch.isComputeDeferred = False
+
+    return newLines
+
+# Builds the chevron grid directly in the cloned sketch instead of going
+# through a DXF file and the import manager.
+def sketchDrawAscendingChevrons(design, width, height, numCols, numRows, webbing, margin,sketchName):
+    sketch = cloneMasterSketch(design, sketchName)
+
+    log = getLogger()
+
+    # Sketch coordinates are already in cm, so unlike the DXF path no scale is
+    # applied.  The y axis is mirrored the same way the DXF geometry is.
+    with span('geometry'):
+        grid = computeChevronGrid(width, height, numCols, numRows, webbing, margin)
+    with span('sketch lines'):
+        newLines = sketchDrawPolylines(sketch, grid.polylines())
+    log.print("Drew {} sketch lines".format(len(newLines)))
 
     sketch.name = 'NoSupports Test'
     return sketch
 
+# Builds one chevron cell and one strut, then lets sketch rectangular patterns
+# replicate them.  The pattern quantities and spacing are expressions of the
+# width, height and margin parameters, so changing those parameters recomputes
+# the grid natively instead of re-running the script.  The seed cell itself is
+# drawn at the size the parameters have today.
+def patternDrawAscendingChevrons(design, width, height, numCols, numRows, webbing, margin,sketchName,
+                                 widthName, heightName, marginName, webbingExpr):
+    sketch = cloneMasterSketch(design, sketchName)
+
+    log = getLogger()
+
+    layout = ChevronLayout(width, height, numCols, numRows, webbing, margin)
+    numCols = layout.numCols
+    numRows = layout.numRows
+
+    # The y axis is mirrored, so rows run towards -y.  Seed the pattern with
+    # the last row so it can grow in the positive direction.
+    with span('seed cell'):
+        seedChevron = layout.chevronRows(numRows - 1, numRows)[0, 0].tolist()
+        sketchDrawPolylines(sketch, layout.frames().tolist())
+        chevronLines = sketchDrawPolylines(sketch, [seedChevron])
+
+    colSpacing = '({w} - 2 * {m}) / {cols}'.format(w=widthName, m=marginName, cols=numCols)
+    constraints = sketch.geometricConstraints
+
+    with span('chevron pattern'):
+        entities = adsk.core.ObjectCollection.create()
+        for line in chevronLines:
+            entities.add(line)
+        patternInput = constraints.createRectangularPatternInput(entities, adsk.fusion.PatternDistanceType.SpacingPatternDistanceType)
+        patternInput.quantityOne = adsk.core.ValueInput.createByString(str(numCols))
+        patternInput.distanceOne = adsk.core.ValueInput.createByString(colSpacing)
+        if numRows > 1:
+            rowSpacing = '(({h} - 2 * {m}) - {colSpacing} / 2 - {web} mm) / ({rows} - 1)'.format(
+                h=heightName, m=marginName, colSpacing=colSpacing, web=webbingExpr, rows=numRows)
+            patternInput.quantityTwo = adsk.core.ValueInput.createByString(str(numRows))
+            patternInput.distanceTwo = adsk.core.ValueInput.createByString(rowSpacing)
+        else:
+            patternInput.quantityTwo = adsk.core.ValueInput.createByString('1')
+        constraints.addRectangularPattern(patternInput)
+
+    if layout.numStruts > 0:
+        with span('strut pattern'):
+            strutLines = sketchDrawPolylines(sketch, layout.struts()[0].tolist())
+            entities = adsk.core.ObjectCollection.create()
+            for line in strutLines:
+                entities.add(line)
+            patternInput = constraints.createRectangularPatternInput(entities, adsk.fusion.PatternDistanceType.SpacingPatternDistanceType)
+            patternInput.quantityOne = adsk.core.ValueInput.createByString(str(layout.numStruts))
+            patternInput.distanceOne = adsk.core.ValueInput.createByString(colSpacing)
+            patternInput.quantityTwo = adsk.core.ValueInput.createByString('1')
+            constraints.addRectangularPattern(patternInput)
+
+    log.print("Patterned a {} x {} grid from one cell".format(numCols, numRows))
 
+    sketch.name = 'NoSupports Test'
+    return sketch
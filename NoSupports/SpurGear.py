@@ -9,11 +9,56 @@
 import adsk.core, adsk.fusion, adsk.cam, traceback
 import math
 
+import os, sys
+sys.path.append(os.path.dirname(os.path.realpath(__file__)))
+
+from batchUtils import loadParameterSets
+from commandSettings import CommandSettings
+from expressionCache import getExpressionCache
+from gearAnalysis import analyzeGear
+from gearProfile import GearProfile, arcBulges
+from gearSpec import GearSpec, gearSpecFromAttribute
+from gearTrain import gearTrainFromParameterSets
+from involuteKernel import (adaptiveInvoluteRadii, involutePoints, involuteRadii, involuteSplineControlPoints,
+                            placeFlanks)
+from phaseTimer import finishTrace, span, startTrace
+from uiLogger import getLogger
+
 # Globals
 _app = adsk.core.Application.cast(None)
 _ui = adsk.core.UserInterface.cast(None)
 _units = ''
 
+# Points sampled along each involute flank.  With _involutePointCount set to
+# None the count is chosen per gear so the chords between samples stay within
+# _involuteTolerance (cm) of the true involute; set a number to force a fixed
+# count.
+_involutePointCount = None
+_involuteTolerance = 0.0005
+
+# How the involute flanks are drawn.  'fitted' adds a fitted spline through
+# the sampled points, which Fusion has to solve.  'controlPoint' adds a fixed
+# cubic spline whose control points are computed here and stay within
+# _involuteTolerance (cm) of the involute; _involutePointCount is not used.
+_involuteSplineType = 'fitted'
+
+# How the teeth are built.  'pattern' extrudes the root cylinder, joins one
+# tooth to it, fillets the root and patterns the tooth.  'fullProfile' draws
+# the whole outline, with the root fillets, in one sketch and extrudes it
+# once, which is faster to build and recompute for large tooth counts.
+_gearBuildMode = 'pattern'
+
+# With _reuseGearComponents set, a gear whose inputs match one already in the
+# design is placed as another occurrence of that component instead of being
+# built again.
+_reuseGearComponents = True
+
+# Set _tracePhases to time each step of building the gear and print a summary
+# table to the TextCommands palette.  With _phaseTraceFile set as well, the
+# spans are also saved there as a Chrome trace.
+_tracePhases = False
+_phaseTraceFile = ''
+
 # Command inputs
 _imgInputEnglish = adsk.core.ImageCommandInput.cast(None)
 _imgInputMetric = adsk.core.ImageCommandInput.cast(None)
@@ -28,10 +73,30 @@ _rootFilletRad = adsk.core.ValueCommandInput.cast(None)
 _thickness = adsk.core.ValueCommandInput.cast(None)
 _holeDiam = adsk.core.ValueCommandInput.cast(None)
 _pitchDiam = adsk.core.TextBoxCommandInput.cast(None)
+_mateTeeth = adsk.core.StringValueCommandInput.cast(None)
+_trainFile = adsk.core.StringValueCommandInput.cast(None)
+_editGear = adsk.core.SelectionCommandInput.cast(None)
 _errMessage = adsk.core.TextBoxCommandInput.cast(None)
 
 _handlers = []
 
+# The dialog values saved on the design, loaded once when the command is
+# created and saved again on execute.  'standard' defaults to the design's
+# units.
+_settingsDefaults = {
+    'standard': 'English',
+    'pressureAngle': '20 deg',
+    'pressureAngleCustom': 20 * (math.pi/180.0),
+    'diaPitch': 2.0,
+    'backlash': 0.0,
+    'numTeeth': 24,
+    'rootFilletRad': .0625 * 2.54,
+    'thickness': 0.5 * 2.54,
+    'holeDiam': 0.5 * 2.54,
+    'mateTeeth': '',
+}
+_settings = None
+
 def run(context):
     try:
         global _app, _ui
@@ -78,7 +143,8 @@ class GearCommandDestroyHandler(adsk.core.CommandEventHandler):
 # problem where when you get the value from a ValueCommandInput it causes the
 # current expression to be evaluated and updates the display.  Some new functionality
 # is being added in the future to the ValueCommandInput object that will make 
-# this easier and should make this function obsolete.
+# this easier and should make this function obsolete.  Results are cached
+# for the life of the command, see expressionCache.py.
 def getCommandInputValue(commandInput, unitType):
     try:
         valCommandInput = adsk.core.ValueCommandInput.cast(commandInput)
@@ -89,11 +155,7 @@ def getCommandInputValue(commandInput, unitType):
         des = adsk.fusion.Design.cast(_app.activeProduct)
         unitsMgr = des.unitsManager
         
-        if unitsMgr.isValidExpression(valCommandInput.expression, unitType):
-            value = unitsMgr.evaluateExpression(valCommandInput.expression, unitType)
-            return (True, value)
-        else:
-            return (False, 0)
+        return getExpressionCache().evaluate(unitsMgr, valCommandInput.expression, unitType)
     except:
         if _ui:
             _ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
@@ -123,65 +185,33 @@ class GearCommandCreatedHandler(adsk.core.CommandCreatedEventHandler):
                 _units = 'mm'
                         
             # Define the default values and get the previous values from the attributes.
+            defaults = dict(_settingsDefaults)
             if _units == 'in':
-                standard = 'English'
+                defaults['standard'] = 'English'
             else:
-                standard = 'Metric'
-            standardAttrib = des.attributes.itemByName('SpurGear', 'standard')
-            if standardAttrib:
-                standard = standardAttrib.value
+                defaults['standard'] = 'Metric'
+
+            global _settings
+            _settings = CommandSettings(des, 'SpurGear', defaults).load()
+
+            # Parameters may have changed since the last time the dialog was
+            # open, so start with no remembered expression values.
+            getExpressionCache().invalidate()
+            standard = _settings['standard']
+            pressureAngle = _settings['pressureAngle']
                 
             if standard == 'English':
                 _units = 'in'
             else:
                 _units = 'mm'
-            
-            pressureAngle = '20 deg'
-            pressureAngleAttrib = des.attributes.itemByName('SpurGear', 'pressureAngle')
-            if pressureAngleAttrib:
-                pressureAngle = pressureAngleAttrib.value
-            
-            pressureAngleCustom = 20 * (math.pi/180.0)
-            pressureAngleCustomAttrib = des.attributes.itemByName('SpurGear', 'pressureAngleCustom')
-            if pressureAngleCustomAttrib:
-                pressureAngleCustom = float(pressureAngleCustomAttrib.value)            
-
-            diaPitch = '2'
-            diaPitchAttrib = des.attributes.itemByName('SpurGear', 'diaPitch')
-            if diaPitchAttrib:
-                diaPitch = diaPitchAttrib.value
-            metricModule = 25.4 / float(diaPitch)
-
-            backlash = '0'
-            backlashAttrib = des.attributes.itemByName('SpurGear', 'backlash')
-            if backlashAttrib:
-                backlash = backlashAttrib.value
-
-            numTeeth = '24'            
-            numTeethAttrib = des.attributes.itemByName('SpurGear', 'numTeeth')
-            if numTeethAttrib:
-                numTeeth = numTeethAttrib.value
-
-            rootFilletRad = str(.0625 * 2.54)
-            rootFilletRadAttrib = des.attributes.itemByName('SpurGear', 'rootFilletRad')
-            if rootFilletRadAttrib:
-                rootFilletRad = rootFilletRadAttrib.value
-
-            thickness = str(0.5 * 2.54)
-            thicknessAttrib = des.attributes.itemByName('SpurGear', 'thickness')
-            if thicknessAttrib:
-                thickness = thicknessAttrib.value
-            
-            holeDiam = str(0.5 * 2.54)
-            holeDiamAttrib = des.attributes.itemByName('SpurGear', 'holeDiam')
-            if holeDiamAttrib:
-                holeDiam = holeDiamAttrib.value
+
+            metricModule = 25.4 / _settings['diaPitch']
 
             cmd = eventArgs.command
             cmd.isExecutedWhenPreEmpted = False
             inputs = cmd.commandInputs
             
-            global _standard, _pressureAngle, _pressureAngleCustom, _diaPitch, _pitch, _module, _numTeeth, _rootFilletRad, _thickness, _holeDiam, _pitchDiam, _backlash, _imgInputEnglish, _imgInputMetric, _errMessage
+            global _standard, _pressureAngle, _pressureAngleCustom, _diaPitch, _pitch, _module, _numTeeth, _rootFilletRad, _thickness, _holeDiam, _pitchDiam, _mateTeeth, _backlash, _imgInputEnglish, _imgInputMetric, _trainFile, _editGear, _errMessage
 
             # Define the command dialog.
             _imgInputEnglish = inputs.addImageCommandInput('gearImageEnglish', '', 'resources/GearEnglish.png')
@@ -221,11 +251,11 @@ class GearCommandCreatedHandler(adsk.core.CommandCreatedEventHandler):
             else:
                 _pressureAngle.listItems.add('Custom', False)
 
-            _pressureAngleCustom = inputs.addValueInput('pressureAngleCustom', 'Custom Angle', 'deg', adsk.core.ValueInput.createByReal(pressureAngleCustom))
+            _pressureAngleCustom = inputs.addValueInput('pressureAngleCustom', 'Custom Angle', 'deg', adsk.core.ValueInput.createByReal(_settings['pressureAngleCustom']))
             if pressureAngle != 'Custom':
                 _pressureAngleCustom.isVisible = False
                         
-            _diaPitch = inputs.addValueInput('diaPitch', 'Diametral Pitch', '', adsk.core.ValueInput.createByString(diaPitch))   
+            _diaPitch = inputs.addValueInput('diaPitch', 'Diametral Pitch', '', adsk.core.ValueInput.createByString(str(_settings['diaPitch'])))   
 
             _module = inputs.addValueInput('module', 'Module', '', adsk.core.ValueInput.createByReal(metricModule))   
             
@@ -234,17 +264,36 @@ class GearCommandCreatedHandler(adsk.core.CommandCreatedEventHandler):
             elif standard == 'Metric':
                 _diaPitch.isVisible = False
                 
-            _numTeeth = inputs.addStringValueInput('numTeeth', 'Number of Teeth', numTeeth)        
+            _numTeeth = inputs.addStringValueInput('numTeeth', 'Number of Teeth', str(_settings['numTeeth']))        
 
-            _backlash = inputs.addValueInput('backlash', 'Backlash', _units, adsk.core.ValueInput.createByReal(float(backlash)))
+            _backlash = inputs.addValueInput('backlash', 'Backlash', _units, adsk.core.ValueInput.createByReal(_settings['backlash']))
 
-            _rootFilletRad = inputs.addValueInput('rootFilletRad', 'Root Fillet Radius', _units, adsk.core.ValueInput.createByReal(float(rootFilletRad)))
+            _rootFilletRad = inputs.addValueInput('rootFilletRad', 'Root Fillet Radius', _units, adsk.core.ValueInput.createByReal(_settings['rootFilletRad']))
 
-            _thickness = inputs.addValueInput('thickness', 'Gear Thickness', _units, adsk.core.ValueInput.createByReal(float(thickness)))
+            _thickness = inputs.addValueInput('thickness', 'Gear Thickness', _units, adsk.core.ValueInput.createByReal(_settings['thickness']))
 
-            _holeDiam = inputs.addValueInput('holeDiam', 'Hole Diameter', _units, adsk.core.ValueInput.createByReal(float(holeDiam)))
+            _holeDiam = inputs.addValueInput('holeDiam', 'Hole Diameter', _units, adsk.core.ValueInput.createByReal(_settings['holeDiam']))
 
             _pitchDiam = inputs.addTextBoxCommandInput('pitchDiam', 'Pitch Diameter', '', 1, True)
+
+            # With a mating tooth count the dialog also checks the mesh with
+            # that gear before anything is built.
+            _mateTeeth = inputs.addStringValueInput('mateTeeth', 'Mating Gear Teeth', _settings['mateTeeth'])
+            _mateTeeth.tooltip = 'Optional number of teeth of the gear this one meshes with.'
+
+            # A CSV or JSON gear list (see gearTrain.py) builds a whole train,
+            # with the values above as the defaults for each gear.  The path
+            # is not saved with the other settings, so the next run draws a
+            # single gear unless a train file is given again.
+            _trainFile = inputs.addStringValueInput('trainFile', 'Gear Train File', '')
+            _trainFile.tooltip = 'Optional CSV or JSON list of gears to build and mesh in one step.'
+
+            # Selecting a gear drawGear made loads its values into the dialog
+            # and changes that gear instead of building a new one.
+            _editGear = inputs.addSelectionInput('editGear', 'Edit Gear', 'Select a spur gear to change it')
+            _editGear.addSelectionFilter('Occurrences')
+            _editGear.setSelectionLimits(0, 1)
+            _editGear.tooltip = 'Optional existing spur gear to change in place.'
             
             _errMessage = inputs.addTextBoxCommandInput('errMessage', '', '', 2, True)
             _errMessage.isFullWidth = True
@@ -275,6 +324,8 @@ class GearCommandExecuteHandler(adsk.core.CommandEventHandler):
     def __init__(self):
         super().__init__()
     def notify(self, args):
+        if _tracePhases:
+            startTrace('Spur Gear')
         try:
             eventArgs = adsk.core.CommandEventArgs.cast(args)
 
@@ -283,38 +334,43 @@ class GearCommandExecuteHandler(adsk.core.CommandEventHandler):
             elif _standard.selectedItem.name == 'Metric':
                 diaPitch = 25.4 / _module.value
             
-            # Save the current values as attributes.
+            # Save the current values on the design.
             des = adsk.fusion.Design.cast(_app.activeProduct)
-            attribs = des.attributes
-            attribs.add('SpurGear', 'standard', _standard.selectedItem.name)
-            attribs.add('SpurGear', 'pressureAngle', _pressureAngle.selectedItem.name)
-            attribs.add('SpurGear', 'pressureAngleCustom', str(_pressureAngleCustom.value))
-            attribs.add('SpurGear', 'diaPitch', str(diaPitch))
-            attribs.add('SpurGear', 'numTeeth', str(_numTeeth.value))
-            attribs.add('SpurGear', 'rootFilletRad', str(_rootFilletRad.value))
-            attribs.add('SpurGear', 'thickness', str(_thickness.value))
-            attribs.add('SpurGear', 'holeDiam', str(_holeDiam.value))
-            attribs.add('SpurGear', 'backlash', str(_backlash.value))
+            _settings.update(standard=_standard.selectedItem.name, pressureAngle=_pressureAngle.selectedItem.name,
+                             pressureAngleCustom=_pressureAngleCustom.value, diaPitch=diaPitch,
+                             numTeeth=_numTeeth.value, rootFilletRad=_rootFilletRad.value,
+                             thickness=_thickness.value, holeDiam=_holeDiam.value, backlash=_backlash.value,
+                             mateTeeth=_mateTeeth.value)
+            _settings.save()
 
             # Get the current values.
-            if _pressureAngle.selectedItem.name == 'Custom':
-                pressureAngle = _pressureAngleCustom.value
+            spec = GearSpec(diaPitch, int(_numTeeth.value), dialogPressureAngle(), _backlash.value,
+                            _thickness.value, _rootFilletRad.value, _holeDiam.value)
+
+            trainFile = _trainFile.value.strip()
+            if trainFile:
+                try:
+                    trainGears = gearTrainFromParameterSets(loadParameterSets(trainFile), spec)
+                except (OSError, ValueError) as error:
+                    _ui.messageBox('The gear train could not be read:\n' + str(error))
+                    return
+                if drawGearTrain(des, trainGears) and _tracePhases:
+                    with span('recompute'):
+                        des.computeAll()
+                return
+
+            # Change the selected gear, or create a new one.
+            editComp = selectedGearComponent()
+            if editComp:
+                gearComp = editGear(des, editComp, spec)
             else:
-                if _pressureAngle.selectedItem.name == '14.5 deg':
-                    pressureAngle = 14.5 * (math.pi/180)
-                elif _pressureAngle.selectedItem.name == '20 deg':
-                    pressureAngle = 20.0 * (math.pi/180)
-                elif _pressureAngle.selectedItem.name == '25 deg':
-                    pressureAngle = 25.0 * (math.pi/180)
-
-            numTeeth = int(_numTeeth.value)
-            rootFilletRad = _rootFilletRad.value
-            thickness = _thickness.value
-            holeDiam = _holeDiam.value
-            backlash = _backlash.value
-
-            # Create the gear.
-            gearComp = drawGear(des, diaPitch, numTeeth, thickness, rootFilletRad, pressureAngle, backlash, holeDiam)
+                gearComp = drawGear(des, spec)
+
+            # When tracing, time a full recompute too, which is where the
+            # build modes differ most once the gear exists.
+            if gearComp and _tracePhases:
+                with span('recompute'):
+                    des.computeAll()
             
             if gearComp:
                 if _standard.selectedItem.name == 'English':
@@ -322,17 +378,120 @@ class GearCommandExecuteHandler(adsk.core.CommandEventHandler):
                 elif _standard.selectedItem.name == 'Metric':
                     desc = 'Spur Gear; Module: ' +  str(25.4 / diaPitch) + '; '
                 
-                desc += 'Num Teeth: ' + str(numTeeth) + '; '
-                desc += 'Pressure Angle: ' + str(pressureAngle * (180/math.pi)) + '; '
+                desc += 'Num Teeth: ' + str(spec.numTeeth) + '; '
+                desc += 'Pressure Angle: ' + str(spec.pressureAngle * (180/math.pi)) + '; '
                 
-                desc += 'Backlash: ' + des.unitsManager.formatInternalValue(backlash, _units, True)
+                desc += 'Backlash: ' + des.unitsManager.formatInternalValue(spec.backlash, _units, True)
                 gearComp.description = desc
         except:
             if _ui:
                 _ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
+        finally:
+            reportPhases()
+            getLogger().flush()
         
 
         
+# The pressure angle selected in the dialog, in radians.
+def dialogPressureAngle():
+    if _pressureAngle.selectedItem.name == 'Custom':
+        return _pressureAngleCustom.value
+    elif _pressureAngle.selectedItem.name == '14.5 deg':
+        return 14.5 * (math.pi/180)
+    elif _pressureAngle.selectedItem.name == '20 deg':
+        return 20.0 * (math.pi/180)
+    elif _pressureAngle.selectedItem.name == '25 deg':
+        return 25.0 * (math.pi/180)
+
+
+# The diametral pitch the dialog's pitch or module expression gives, or None
+# if the expression is not valid.
+def dialogDiaPitch():
+    if _standard.selectedItem.name == 'English':
+        result = getCommandInputValue(_diaPitch, '')
+        if result[0]:
+            return result[1]
+    elif _standard.selectedItem.name == 'Metric':
+        result = getCommandInputValue(_module, '')
+        if result[0]:
+            return 25.4 / result[1]
+    return None
+
+
+# The component of the occurrence selected for editing, or None.
+def selectedGearComponent():
+    if _editGear.selectionCount != 1:
+        return None
+    occ = adsk.fusion.Occurrence.cast(_editGear.selection(0).entity)
+    if not occ:
+        return None
+    return occ.component
+
+
+# Sets the dialog's inputs to the values of a spec, keeping the dialog's
+# standard and units.
+def loadDialogSpec(spec):
+    _diaPitch.value = spec.diametralPitch
+    _module.value = 25.4 / spec.diametralPitch
+    _numTeeth.value = str(spec.numTeeth)
+
+    angleName = 'Custom'
+    for name in ('14.5 deg', '20 deg', '25 deg'):
+        if math.isclose(spec.pressureAngle, float(name.split()[0]) * (math.pi/180)):
+            angleName = name
+    for item in _pressureAngle.listItems:
+        if item.name == angleName:
+            item.isSelected = True
+    if angleName == 'Custom':
+        _pressureAngleCustom.value = spec.pressureAngle
+    _pressureAngleCustom.isVisible = angleName == 'Custom'
+
+    _backlash.value = spec.backlash
+    _rootFilletRad.value = spec.rootFilletRad
+    _thickness.value = spec.thickness
+    _holeDiam.value = spec.holeDiam
+
+
+_lastGearSpec = None
+
+# Builds the GearSpec for the dialog's current inputs.  Returns (spec,
+# isComplete): spec is None if the tooth count or pitch can't be read, and
+# isComplete is False if the hole diameter expression is not valid.  The
+# previous spec is reused while the inputs stay the same, so the inputChanged
+# and validateInputs events of one edit compute the derived sizes only once.
+def dialogGearSpec():
+    global _lastGearSpec
+    if not _numTeeth.value.isdigit():
+        return (None, False)
+    diaPitch = dialogDiaPitch()
+    if diaPitch is None:
+        return (None, False)
+
+    result = getCommandInputValue(_holeDiam, _units)
+    holeDiam = result[1] if result[0] else 0.0
+    spec = GearSpec(diaPitch, int(_numTeeth.value), dialogPressureAngle(), _backlash.value,
+                    _thickness.value, _rootFilletRad.value, holeDiam)
+    if spec == _lastGearSpec:
+        spec = _lastGearSpec
+    else:
+        _lastGearSpec = spec
+    return (spec, result[0])
+
+
+# Ends the phase trace of a run, if one was started, and logs it for the
+# TextCommands palette.  The execute handler flushes the log.
+def reportPhases():
+    trace = finishTrace()
+    if trace is None:
+        return
+    log = getLogger()
+    for line in trace.summary():
+        log.print(line)
+    if _phaseTraceFile:
+        trace.writeChromeTrace(_phaseTraceFile)
+        log.print('Wrote phase trace to ' + _phaseTraceFile)
+
+
 # Event handler for the inputChanged event.
 class GearCommandInputChangedHandler(adsk.core.InputChangedEventHandler):
     def __init__(self):
@@ -377,28 +536,20 @@ class GearCommandInputChangedHandler(adsk.core.InputChangedEventHandler):
                 _thickness.unitType = _units
                 _holeDiam.value = _holeDiam.value
                 _holeDiam.unitType = _units
+
+            # Start from the values of the gear selected for editing.
+            if changedInput.id == 'editGear':
+                editComp = selectedGearComponent()
+                editSpec = gearSpecOf(editComp) if editComp else None
+                if editSpec:
+                    loadDialogSpec(editSpec)
                 
             # Update the pitch diameter value.
-            diaPitch = None
-            if _standard.selectedItem.name == 'English':
-                result = getCommandInputValue(_diaPitch, '')
-                if result[0]:
-                    diaPitch = result[1]
-            elif _standard.selectedItem.name == 'Metric':
-                result = getCommandInputValue(_module, '')
-                if result[0]:
-                    diaPitch = 25.4 / result[1]
-            if not diaPitch == None:
-                if _numTeeth.value.isdigit(): 
-                    numTeeth = int(_numTeeth.value)
-                    pitchDia = numTeeth/diaPitch
-
-                    # The pitch dia has been calculated in inches, but this expects cm as the input units.
-                    des = adsk.fusion.Design.cast(_app.activeProduct)
-                    pitchDiaText = des.unitsManager.formatInternalValue(pitchDia * 2.54, _units, True)
-                    _pitchDiam.text = pitchDiaText
-                else:
-                    _pitchDiam.text = ''                    
+            spec, isComplete = dialogGearSpec()
+            if spec:
+                des = adsk.fusion.Design.cast(_app.activeProduct)
+                pitchDiaText = des.unitsManager.formatInternalValue(spec.pitchDia, _units, True)
+                _pitchDiam.text = pitchDiaText
             else:
                 _pitchDiam.text = ''
 
@@ -435,154 +586,446 @@ class GearCommandValidateInputsHandler(adsk.core.ValidateInputsEventHandler):
                 eventArgs.areInputsValid = False
                 return
                 
-            # Calculate some of the gear sizes to use in validation.
-            if _standard.selectedItem.name == 'English':
-                result = getCommandInputValue(_diaPitch, '')
-                if result[0] == False:
-                    eventArgs.areInputsValid = False
-                    return
-                else:
-                    diaPitch = result[1]
-            elif _standard.selectedItem.name == 'Metric':
-                result = getCommandInputValue(_module, '')
-                if result[0] == False:
-                    eventArgs.areInputsValid = False
-                    return
-                else:
-                    diaPitch = 25.4 / result[1]
-
-            diametralPitch = diaPitch / 2.54
-            pitchDia = numTeeth / diametralPitch
-            
-            if (diametralPitch < (20 *(math.pi/180))-0.000001):
-                dedendum = 1.157 / diametralPitch
-            else:
-                circularPitch = math.pi / diametralPitch
-                if circularPitch >= 20:
-                    dedendum = 1.25 / diametralPitch
-                else:
-                    dedendum = (1.2 / diametralPitch) + (.002 * 2.54)                
-
-            rootDia = pitchDia - (2 * dedendum)        
-                    
-            if _pressureAngle.selectedItem.name == 'Custom':
-                pressureAngle = _pressureAngleCustom.value
-            else:
-                if _pressureAngle.selectedItem.name == '14.5 deg':
-                    pressureAngle = 14.5 * (math.pi/180)
-                elif _pressureAngle.selectedItem.name == '20 deg':
-                    pressureAngle = 20.0 * (math.pi/180)
-                elif _pressureAngle.selectedItem.name == '25 deg':
-                    pressureAngle = 25.0 * (math.pi/180)
-            baseCircleDia = pitchDia * math.cos(pressureAngle)
-            baseCircleCircumference = 2 * math.pi * (baseCircleDia / 2) 
+            trainFile = _trainFile.value.strip()
+            if trainFile and not os.path.isfile(trainFile):
+                _errMessage.text = 'The gear train file does not exist.'
+                eventArgs.areInputsValid = False
+                return
 
-            des = adsk.fusion.Design.cast(_app.activeProduct)
+            editComp = selectedGearComponent()
+            if editComp and trainFile:
+                _errMessage.text = 'Select a gear to edit or give a gear train file, not both.'
+                eventArgs.areInputsValid = False
+                return
+            if editComp and not gearSpecOf(editComp):
+                _errMessage.text = 'The selected component is not a spur gear.'
+                eventArgs.areInputsValid = False
+                return
 
-            result = getCommandInputValue(_holeDiam, _units)
-            if result[0] == False:
+            # Check the gear sizes the inputs give.
+            spec, isComplete = dialogGearSpec()
+            if not spec or not isComplete:
                 eventArgs.areInputsValid = False
                 return
-            else:
-                holeDiam = result[1]
-                           
-            if holeDiam >= (rootDia - 0.01):
-                _errMessage.text = 'The center hole diameter is too large.  It must be less than ' + des.unitsManager.formatInternalValue(rootDia - 0.01, _units, True)
+
+            problem = spec.problem()
+            if problem:
+                message, limit = problem
+                if limit is not None:
+                    des = adsk.fusion.Design.cast(_app.activeProduct)
+                    message += des.unitsManager.formatInternalValue(limit, _units, True)
+                _errMessage.text = message
                 eventArgs.areInputsValid = False
                 return
 
-            toothThickness = baseCircleCircumference / (numTeeth * 2)
-            if _rootFilletRad.value > toothThickness * .4:
-                _errMessage.text = 'The root fillet radius is too large.  It must be less than ' + des.unitsManager.formatInternalValue(toothThickness * .4, _units, True)
+            mateTeeth = _mateTeeth.value.strip()
+            if mateTeeth and not mateTeeth.isdigit():
+                _errMessage.text = 'The number of mating teeth must be a whole number.'
+                eventArgs.areInputsValid = False
+                return
+            if mateTeeth and int(mateTeeth) < 4:
+                _errMessage.text = 'The mating gear must have 4 or more teeth.'
                 eventArgs.areInputsValid = False
                 return
+
+            # Check the tooth shape, and the mesh with the mating gear, the
+            # way drawGear will build them.  The first error stops the
+            # command; a warning is only shown.
+            issues = analyzeGear(spec, int(mateTeeth) if mateTeeth else None)
+            if issues:
+                issue = issues[0]
+                message = issue.message
+                if issue.limit is not None:
+                    des = adsk.fusion.Design.cast(_app.activeProduct)
+                    message += des.unitsManager.formatInternalValue(issue.limit, _units, True)
+                _errMessage.text = message
+                if issue.isError:
+                    eventArgs.areInputsValid = False
+                    return
         except:
             if _ui:
                 _ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
 
 
-# Calculate points along an involute curve.
-def involutePoint(baseCircleRadius, distFromCenterToInvolutePoint):
-    try:
-        # Calculate the other side of the right-angle triangle defined by the base circle and the current distance radius.
-        # This is also the length of the involute chord as it comes off of the base circle.
-        triangleSide = math.sqrt(math.pow(distFromCenterToInvolutePoint,2) - math.pow(baseCircleRadius,2)) 
-        
-        # Calculate the angle of the involute.
-        alpha = triangleSide / baseCircleRadius
+# One flank of the tooth before it is rotated into place, from innerRadius (the
+# base circle by default) to the outside circle.  Returns the points and, for
+# control-point splines, the knot vector; the knots are None for fitted
+# splines.
+def involuteFlank(spec, innerRadius=None):
+    baseRadius = spec.baseCircleDia / 2.0
+    outsideRadius = spec.outsideDia / 2.0
+    if _involuteSplineType == 'controlPoint':
+        controlPoints, knots, deviation = involuteSplineControlPoints(baseRadius, outsideRadius, _involuteTolerance,
+                                                                      innerRadius=innerRadius)
+        if deviation > _involuteTolerance:
+            getLogger().warning('Involute spline is within {:.3g} cm, not {:.3g} cm.', deviation, _involuteTolerance)
+        return controlPoints, knots
+
+    if _involutePointCount:
+        radii = involuteRadii(baseRadius, outsideRadius, _involutePointCount, innerRadius)
+    else:
+        radii = adaptiveInvoluteRadii(baseRadius, outsideRadius, _involuteTolerance, innerRadius)
+    return involutePoints(baseRadius, radii), None
+
+
+# The involute and, for the full-profile build, the gear outline for a spec,
+# computed once per spec and set of involute options.  A gear train computes
+# every gear's geometry before it starts on the API work.
+_geometryCache = {}
+_maxGeometryCacheEntries = 64
+
+def gearGeometry(spec):
+    key = (spec, _gearBuildMode, _involuteSplineType, _involutePointCount, _involuteTolerance)
+    geometry = _geometryCache.get(key)
+    if geometry is None:
+        if _gearBuildMode == 'fullProfile':
+            profile = GearProfile(spec)
+            flankPoints, knots = involuteFlank(spec, profile.flankStartRadius)
+        else:
+            profile = None
+            flankPoints, knots = involuteFlank(spec)
+        if len(_geometryCache) >= _maxGeometryCacheEntries:
+            _geometryCache.clear()
+        geometry = _geometryCache[key] = (profile, flankPoints, knots)
+    return geometry
 
-        # Calculate the angle where the current involute point is.
-        theta = alpha - math.acos(baseCircleRadius / distFromCenterToInvolutePoint)
 
-        # Calculate the coordinates of the involute point.    
-        x = distFromCenterToInvolutePoint * math.cos(theta)
-        y = distFromCenterToInvolutePoint * math.sin(theta)
+# Adds a flank to the sketch: a fitted spline through the points, or a fixed
+# spline with the points as control points when knots are given.
+def addFlankSpline(sketch, points, knots):
+    if knots:
+        # There is no fit for Fusion to solve.
+        nurbs = adsk.core.NurbsCurve3D.createNonRational(points, 3, knots, False)
+        return sketch.sketchCurves.sketchFixedSplines.addByNurbsCurve(nurbs)
+    return sketch.sketchCurves.sketchFittedSplines.add(adsk.core.ObjectCollection.createWithArray(points))
 
-        # Create a point to return.        
-        return adsk.core.Point3D.create(x, y, 0)
-    except:
-        if _ui:
-            _ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
 
+# Whether a gear with this hole diameter gets a center hole.
+def hasCenterHole(holeDiam):
+    return holeDiam - (_app.pointTolerance * 2) > 0
 
-# Builds a spur gear.
-def drawGear(design, diametralPitch, numTeeth, thickness, rootFilletRad, pressureAngle, backlash, holeDiam):
+
+# Draws the center hole, if the value is greater than 0, and returns the
+# profile of the gear body: the one that uses both the hole and the outer
+# curves, or the single profile.
+def gearBodyProfile(sketch, holeDiam):
+    if hasCenterHole(holeDiam):
+        sketch.sketchCurves.sketchCircles.addByCenterRadius(adsk.core.Point3D.create(0,0,0), holeDiam/2.0)
+
+        # Find the profile that uses both circles.
+        prof = adsk.fusion.Profile.cast(None)
+        for prof in sketch.profiles:
+            if prof.profileLoops.count == 2:
+                break
+        return prof
+
+    # Use the single profile.
+    return sketch.profiles.item(0)
+
+
+# The component of a gear already in the design that was built from the same
+# inputs, or None.  One findAttributes call finds every gear drawGear has made.
+def findGearComponent(design, spec):
+    key = spec.roundedKey()
+    for attrib in design.findAttributes('SpurGear', 'Values'):
+        existing = gearSpecFromAttribute(attrib.value)
+        if not existing or existing.roundedKey() != key:
+            continue
+
+        # Skip gears whose component is gone or whose body has been deleted.
+        comp = adsk.fusion.Component.cast(attrib.parent)
+        if comp and comp.bRepBodies.count != 0:
+            return comp
+    return None
+
+
+# Builds a spur gear from a GearSpec.  transform places the new occurrence;
+# with groupTimeline False the caller groups the timeline itself.
+def drawGear(design, spec, transform=None, groupTimeline=True):
     try:
-        # The diametral pitch is specified in inches but everthing
-        # here expects all distances to be in centimeters, so convert
-        # for the gear creation.
-        diametralPitch = diametralPitch / 2.54
-    
-        # Compute the various values for a gear.
-        pitchDia = numTeeth / diametralPitch
+        if transform is None:
+            transform = adsk.core.Matrix3D.create()
+
+        if _reuseGearComponents:
+            with span('find existing'):
+                existingComp = findGearComponent(design, spec)
+            if existingComp:
+                with span('component'):
+                    occs = design.rootComponent.occurrences
+                    occs.addExistingComponent(existingComp, transform)
+                return existingComp
+
+        numTeeth = spec.numTeeth
+        pitchDia = spec.pitchDia
         
-        #addendum = 1.0 / diametralPitch
-        if (diametralPitch < (20 *(math.pi/180))-0.000001):
-            dedendum = 1.157 / diametralPitch
-        else:
-            circularPitch = math.pi / diametralPitch
-            if circularPitch >= 20:
-                dedendum = 1.25 / diametralPitch
-            else:
-                dedendum = (1.2 / diametralPitch) + (.002 * 2.54)                
+        # Create a new component by creating an occurrence.
+        with span('component'):
+            occs = design.rootComponent.occurrences
+            newOcc = occs.addNewComponent(transform)
+            newComp = adsk.fusion.Component.cast(newOcc.component)
 
-        rootDia = pitchDia - (2 * dedendum)
+        if _gearBuildMode == 'fullProfile':
+            drawFullProfile(newComp, spec)
+        else:
+            drawPatternedTeeth(newComp, spec)
         
-        baseCircleDia = pitchDia * math.cos(pressureAngle)
-        outsideDia = (numTeeth + 2) / diametralPitch
+        diametralPitchSketch = drawPitchSketch(newComp, pitchDia)
         
-        # Create a new component by creating an occurrence.
-        occs = design.rootComponent.occurrences
-        mat = adsk.core.Matrix3D.create()
-        newOcc = occs.addNewComponent(mat)        
-        newComp = adsk.fusion.Component.cast(newOcc.component)
+        # Group everything used to create the gear in the timeline.
+        if groupTimeline:
+            with span('timeline group'):
+                timelineGroups = design.timeline.timelineGroups
+                newOccIndex = newOcc.timelineObject.index
+                pitchSketchIndex = diametralPitchSketch.timelineObject.index
+                # ui.messageBox("Indices: " + str(newOccIndex) + ", " + str(pitchSketchIndex))
+                timelineGroup = timelineGroups.add(newOccIndex, pitchSketchIndex)
+                timelineGroup.name = 'Spur Gear'
         
-        # Create a new sketch.
-        sketches = newComp.sketches
-        xyPlane = newComp.xYConstructionPlane
-        baseSketch = sketches.add(xyPlane)
-
-        # Draw a circle for the base.
-        baseSketch.sketchCurves.sketchCircles.addByCenterRadius(adsk.core.Point3D.create(0,0,0), rootDia/2.0)
+        # Add an attribute to the component with all of the input values, so
+        # findGearComponent can place this gear again and editGear can change
+        # it, and one with how it was built.
+        attrib = newComp.attributes.add('SpurGear', 'Values', spec.attributeValue())
+        newComp.attributes.add('SpurGear', 'BuildMode', _gearBuildMode)
         
-        # Draw a circle for the center hole, if the value is greater than 0.
-        prof = adsk.fusion.Profile.cast(None)
-        if holeDiam - (_app.pointTolerance * 2) > 0:
-            baseSketch.sketchCurves.sketchCircles.addByCenterRadius(adsk.core.Point3D.create(0,0,0), holeDiam/2.0)
+        newComp.name = 'Spur Gear (' + str(numTeeth) + ' teeth)'
+        return newComp
+    except Exception as error:
+        _ui.messageBox("drawGear Failed : " + str(error)) 
+        return None
+
+
+# Adds an extra sketch that contains a circle of the pitch diameter.
+def drawPitchSketch(comp, pitchDia):
+    with span('pitch sketch'):
+        diametralPitchSketch = comp.sketches.add(comp.xYConstructionPlane)
+        diametralPitchCircle = diametralPitchSketch.sketchCurves.sketchCircles.addByCenterRadius(adsk.core.Point3D.create(0,0,0), pitchDia/2.0)
+        diametralPitchCircle.isConstruction = True
+        diametralPitchCircle.isFixed = True
+    return diametralPitchSketch
+
+
+# The GearSpec a gear component was built from, or None if drawGear did not
+# build it.
+def gearSpecOf(comp):
+    attrib = comp.attributes.itemByName('SpurGear', 'Values')
+    if not attrib:
+        return None
+    return gearSpecFromAttribute(attrib.value)
+
+
+# How a gear component was built.  Gears from before the build mode was
+# recorded were all patterned.
+def gearBuildMode(comp):
+    attrib = comp.attributes.itemByName('SpurGear', 'BuildMode')
+    if not attrib:
+        return 'pattern'
+    return attrib.value
+
+
+# The inputs editGear can change by updating the features that use them.  Any
+# other change, the tooth count included, moves the pitch, base, root and
+# outside circles and so changes the tooth profile itself.
+_inPlaceChanges = frozenset(('thickness', 'rootFilletRad', 'holeDiam'))
+
+# Changes a gear drawGear built so it matches spec, in the same component, so
+# every occurrence of it stays where it is.  Thickness, root fillet and center
+# hole changes set the parameters of the features that use them and only those
+# recompute; anything that changes the tooth profile, or adds or removes the
+# fillet or hole, rebuilds the gear's sketches and features.  Returns the
+# component, or None if the edit failed.
+def editGear(design, comp, spec):
+    try:
+        oldSpec = gearSpecOf(comp)
+        if not oldSpec:
+            _ui.messageBox('The selected component is not a spur gear.')
+            return None
+        changes = oldSpec.changes(spec)
+        if not changes:
+            return comp
+
+        buildMode = gearBuildMode(comp)
+        inPlace = changes <= _inPlaceChanges
+        if 'rootFilletRad' in changes:
+            # The full profile has its fillets in the sketch, and the patterned
+            # build only has a fillet feature while the radius is above 0.
+            inPlace = (inPlace and buildMode == 'pattern' and
+                       oldSpec.rootFilletRad > 0 and spec.rootFilletRad > 0)
+        if 'holeDiam' in changes:
+            inPlace = inPlace and hasCenterHole(oldSpec.holeDiam) and hasCenterHole(spec.holeDiam)
+
+        with span('edit'):
+            if not (inPlace and updateGearFeatures(comp, oldSpec, spec, buildMode)):
+                rebuildGear(design, comp, oldSpec, spec, buildMode)
+                comp.attributes.add('SpurGear', 'BuildMode', _gearBuildMode)
+
+        comp.attributes.add('SpurGear', 'Values', spec.attributeValue())
+        comp.name = 'Spur Gear (' + str(spec.numTeeth) + ' teeth)'
+
+        # Feature parameters have changed, so expressions that use them may
+        # evaluate differently now.
+        getExpressionCache().invalidate()
+        return comp
+    except Exception as error:
+        _ui.messageBox("editGear Failed : " + str(error))
+        return None
+
 
-            # Find the profile that uses both circles.
-            for prof in baseSketch.profiles:
-                if prof.profileLoops.count == 2:
+# Sets the thickness, root fillet radius and hole diameter of a gear's
+# existing features.  The features are found by the order drawGear created
+# them in, ahead of anything added to the component later.  Returns False if
+# one is not there any more, so the caller can rebuild instead.
+def updateGearFeatures(comp, oldSpec, spec, buildMode):
+    changes = oldSpec.changes(spec)
+    features = comp.features
+    try:
+        if 'thickness' in changes:
+            # The base and tooth extrudes, or the one extrude of the full
+            # profile.
+            extrudes = features.extrudeFeatures
+            for index in range(2 if buildMode == 'pattern' else 1):
+                extent = adsk.fusion.DistanceExtentDefinition.cast(extrudes.item(index).extentOne)
+                if not extent:
+                    return False
+                extent.distance.value = spec.thickness
+
+        if 'rootFilletRad' in changes:
+            # The pattern repeats the fillet, so this changes every tooth.
+            fillet = features.filletFeatures.item(0)
+            edgeSet = adsk.fusion.ConstantRadiusFilletEdgeSet.cast(fillet.edgeSets.item(0))
+            if not edgeSet:
+                return False
+            edgeSet.radius.value = spec.rootFilletRad
+
+        if 'holeDiam' in changes:
+            # The hole is in the first sketch, with the root circle in the
+            # patterned build and on its own among the outline's arcs in the
+            # full profile.
+            hole = None
+            for circle in comp.sketches.item(0).sketchCurves.sketchCircles:
+                if abs(circle.radius - oldSpec.holeDiam / 2.0) < _app.pointTolerance:
+                    hole = circle
                     break
+            if not hole:
+                return False
+            hole.radius = spec.holeDiam / 2.0
+    except (AttributeError, RuntimeError):
+        return False
+    return True
+
+
+# The sketches and features drawGear made in a gear's component: the first of
+# each kind, since they come before anything added to the component later.
+def _gearEntities(comp, oldSpec, buildMode):
+    features = comp.features
+    if buildMode == 'fullProfile':
+        counts = [(comp.sketches, 2), (features.extrudeFeatures, 1)]
+    else:
+        counts = [(comp.sketches, 3), (features.extrudeFeatures, 2), (features.circularPatternFeatures, 1)]
+        if oldSpec.rootFilletRad > 0:
+            counts.append((features.filletFeatures, 1))
+    entities = []
+    for collection, count in counts:
+        entities += [collection.item(index) for index in range(min(count, collection.count))]
+    return entities
+
+
+# Deletes a gear's sketches and features and builds them again from spec in
+# the same component, with the current build options.  The timeline marker is
+# rolled back to where the old ones started, so the new ones take their place
+# ahead of any later features that use the gear.
+def rebuildGear(design, comp, oldSpec, spec, buildMode):
+    timeline = design.timeline
+    with span('delete'):
+        entities = _gearEntities(comp, oldSpec, buildMode)
+        indexed = sorted(((entity.timelineObject.index, entity) for entity in entities),
+                         key=lambda pair: pair[0])
+        # The last first, so nothing is deleted before what depends on it.
+        for index, entity in reversed(indexed):
+            entity.deleteMe()
+        if indexed:
+            timeline.markerPosition = indexed[0][0]
+
+    try:
+        if _gearBuildMode == 'fullProfile':
+            drawFullProfile(comp, spec)
         else:
-            # Use the single profile.
-            prof = baseSketch.profiles.item(0)
-        
-        #### Extrude the circle to create the base of the gear.
+            drawPatternedTeeth(comp, spec)
+        drawPitchSketch(comp, spec.pitchDia)
+    finally:
+        timeline.moveToEnd()
+
+
+# Builds every gear of a train in one command.  The geometry of each distinct
+# gear is computed before any API work, identical gears share a component when
+# _reuseGearComponents is set, and the whole train is one timeline group.
+# Returns the gears' components, or None if one could not be built.
+def drawGearTrain(design, trainGears):
+    with span('train geometry'):
+        for gear in trainGears:
+            gearGeometry(gear.spec)
+
+    timeline = design.timeline
+    startIndex = timeline.markerPosition
+    comps = []
+    zAxis = adsk.core.Vector3D.create(0, 0, 1)
+    origin = adsk.core.Point3D.create(0, 0, 0)
+    builtComps = {}
+    for gear in trainGears:
+        transform = adsk.core.Matrix3D.create()
+        transform.setToRotation(gear.rotation, zAxis, origin)
+        transform.translation = adsk.core.Vector3D.create(gear.center[0], gear.center[1], 0)
+
+        # Gears repeated within the train are placed from the component built
+        # for the first of them, without another attribute search.
+        key = gear.spec.roundedKey()
+        comp = builtComps.get(key) if _reuseGearComponents else None
+        if comp:
+            with span('component'):
+                design.rootComponent.occurrences.addExistingComponent(comp, transform)
+        else:
+            comp = drawGear(design, gear.spec, transform, groupTimeline=False)
+            if not comp:
+                return None
+            builtComps[key] = comp
+        comps.append(comp)
+
+    with span('timeline group'):
+        endIndex = timeline.markerPosition - 1
+        if endIndex > startIndex:
+            timelineGroup = timeline.timelineGroups.add(startIndex, endIndex)
+            timelineGroup.name = 'Gear Train'
+    return comps
+
+
+# The original construction: the root cylinder, one tooth joined to it and
+# filleted, then patterned around the cylinder.
+def drawPatternedTeeth(comp, spec):
+    numTeeth = spec.numTeeth
+    thickness = spec.thickness
+    rootFilletRad = spec.rootFilletRad
+    holeDiam = spec.holeDiam
+
+    # The sizes of the gear, in centimeters.
+    rootDia = spec.rootDia
+    baseCircleDia = spec.baseCircleDia
+    outsideDia = spec.outsideDia
+
+    # Create a new sketch.
+    with span('base sketch'):
+        sketches = comp.sketches
+        xyPlane = comp.xYConstructionPlane
+        baseSketch = sketches.add(xyPlane)
 
-        # Create an extrusion input to be able to define the input needed for an extrusion
-        # while specifying the profile and that a new component is to be created
-        extrudes = newComp.features.extrudeFeatures
+        # Draw a circle for the base.
+        baseSketch.sketchCurves.sketchCircles.addByCenterRadius(adsk.core.Point3D.create(0,0,0), rootDia/2.0)
+        prof = gearBodyProfile(baseSketch, holeDiam)
+    
+    #### Extrude the circle to create the base of the gear.
+
+    # Create an extrusion input to be able to define the input needed for an extrusion
+    # while specifying the profile and that a new component is to be created
+    with span('base extrude'):
+        extrudes = comp.features.extrudeFeatures
         extInput = extrudes.createInput(prof, adsk.fusion.FeatureOperations.NewBodyFeatureOperation)
 
         # Define that the extent is a distance extent of 5 cm.
@@ -591,78 +1034,31 @@ def drawGear(design, diametralPitch, numTeeth, thickness, rootFilletRad, pressur
 
         # Create the extrusion.
         baseExtrude = extrudes.add(extInput)
-        
-        # Create a second sketch for the tooth.
-        toothSketch = sketches.add(xyPlane)
-
-        # Calculate points along the involute curve.
-        involutePointCount = 15 
-        involuteIntersectionRadius = baseCircleDia / 2.0
-        involutePoints = []
-        involuteSize = (outsideDia - baseCircleDia) / 2.0
-        for i in range(0, involutePointCount):
-            involuteIntersectionRadius = (baseCircleDia / 2.0) + ((involuteSize / (involutePointCount - 1)) * i)
-            newPoint = involutePoint(baseCircleDia / 2.0, involuteIntersectionRadius)
-            involutePoints.append(newPoint)
-            
-        # Get the point along the tooth that's at the pictch diameter and then
-        # calculate the angle to that point.
-        pitchInvolutePoint = involutePoint(baseCircleDia / 2.0, pitchDia / 2.0)
-        pitchPointAngle = math.atan(pitchInvolutePoint.y / pitchInvolutePoint.x)
-
-        # Determine the angle defined by the tooth thickness as measured at
-        # the pitch diameter circle.
-        toothThicknessAngle = (2 * math.pi) / (2 * numTeeth)
-        
-        # Determine the angle needed for the specified backlash.
-        backlashAngle = (backlash / (pitchDia / 2.0)) * .25
-        
-        # Determine the angle to rotate the curve.
-        rotateAngle = -((toothThicknessAngle/2) + pitchPointAngle - backlashAngle)
-        
-        # Rotate the involute so the middle of the tooth lies on the x axis.
-        cosAngle = math.cos(rotateAngle)
-        sinAngle = math.sin(rotateAngle)
-        for i in range(0, involutePointCount):
-            newX = involutePoints[i].x * cosAngle - involutePoints[i].y * sinAngle
-            newY = involutePoints[i].x * sinAngle + involutePoints[i].y * cosAngle
-            involutePoints[i] = adsk.core.Point3D.create(newX, newY, 0)
-
-        # Create a new set of points with a negated y.  This effectively mirrors the original
-        # points about the X axis.
-        involute2Points = []
-        for i in range(0, involutePointCount):
-            involute2Points.append(adsk.core.Point3D.create(involutePoints[i].x, -involutePoints[i].y, 0))
-
-        curve1Dist = []
-        curve1Angle = []
-        for i in range(0, involutePointCount):
-            curve1Dist.append(math.sqrt(involutePoints[i].x * involutePoints[i].x + involutePoints[i].y * involutePoints[i].y))
-            curve1Angle.append(math.atan(involutePoints[i].y / involutePoints[i].x))
-        
-        curve2Dist = []
-        curve2Angle = []
-        for i in range(0, involutePointCount):
-            curve2Dist.append(math.sqrt(involute2Points[i].x * involute2Points[i].x + involute2Points[i].y * involute2Points[i].y))
-            curve2Angle.append(math.atan(involute2Points[i].y / involute2Points[i].x))
-
+    
+    # Create a second sketch for the tooth.
+    toothSketch = sketches.add(xyPlane)
+
+    # Calculate points along the involute curve.
+    with span('involute'):
+        # Both flanks are computed in one batch; Point3D objects are only
+        # made for the final points.
+        profile, flankPoints, knots = gearGeometry(spec)
+        flank1, flank2 = placeFlanks(flankPoints, spec.rotateAngle)
+        involute1Points = [adsk.core.Point3D.create(x, y, 0) for x, y in flank1.tolist()]
+        involute2Points = [adsk.core.Point3D.create(x, y, 0) for x, y in flank2.tolist()]
+
+        # The angles of the first point of each flank, for the lines down to
+        # the root.  A clamped spline starts on its first control point, so
+        # this holds for either spline type.
+        curve1Angle = math.atan(flank1[0, 1] / flank1[0, 0])
+        curve2Angle = math.atan(flank2[0, 1] / flank2[0, 0])
+
+    with span('tooth sketch'):
         toothSketch.isComputeDeferred = True
-		
-        # Create and load an object collection with the points.
-        pointSet = adsk.core.ObjectCollection.create()
-        for i in range(0, involutePointCount):
-            pointSet.add(involutePoints[i])
 
-        # Create the first spline.
-        spline1 = toothSketch.sketchCurves.sketchFittedSplines.add(pointSet)
-
-        # Add the involute points for the second spline to an ObjectCollection.
-        pointSet = adsk.core.ObjectCollection.create()
-        for i in range(0, involutePointCount):
-            pointSet.add(involute2Points[i])
-
-        # Create the second spline.
-        spline2 = toothSketch.sketchCurves.sketchFittedSplines.add(pointSet)
+        # Create the two splines.
+        spline1 = addFlankSpline(toothSketch, involute1Points, knots)
+        spline2 = addFlankSpline(toothSketch, involute2Points, knots)
 
         # Draw the arc for the top of the tooth.
         midPoint = adsk.core.Point3D.create((outsideDia / 2), 0, 0)
@@ -673,25 +1069,33 @@ def drawGear(design, diametralPitch, numTeeth, thickness, rootFilletRad, pressur
         if( baseCircleDia < rootDia ):
             toothSketch.sketchCurves.sketchLines.addByTwoPoints(spline2.startSketchPoint, spline1.startSketchPoint)
         else:
-            rootPoint1 = adsk.core.Point3D.create((rootDia / 2 - 0.001) * math.cos(curve1Angle[0] ), (rootDia / 2) * math.sin(curve1Angle[0]), 0)
+            # The involute leaves the base circle radially, so each line runs
+            # down the radius through the first point of its flank.
+            rootRadius = rootDia / 2
+            rootPoint1 = adsk.core.Point3D.create(rootRadius * math.cos(curve1Angle), rootRadius * math.sin(curve1Angle), 0)
             line1 = toothSketch.sketchCurves.sketchLines.addByTwoPoints(rootPoint1, spline1.startSketchPoint)
 
-            rootPoint2 = adsk.core.Point3D.create((rootDia / 2 - 0.001) * math.cos(curve2Angle[0]), (rootDia / 2) * math.sin(curve2Angle[0]), 0)
+            rootPoint2 = adsk.core.Point3D.create(rootRadius * math.cos(curve2Angle), rootRadius * math.sin(curve2Angle), 0)
             line2 = toothSketch.sketchCurves.sketchLines.addByTwoPoints(rootPoint2, spline2.startSketchPoint)
 
             baseLine = toothSketch.sketchCurves.sketchLines.addByTwoPoints(line1.startSketchPoint, line2.startSketchPoint)
 
-            # Make the lines tangent to the spline so the root fillet will behave correctly.            
+            # Make the lines tangent to the spline so the root fillet will
+            # behave correctly.  A fitted spline is bent by the solver to meet
+            # its line.  A fixed spline already starts along its line, and a
+            # tangent between two fixed curves would over-constrain the sketch.
             line1.isFixed = True
             line2.isFixed = True
-            toothSketch.geometricConstraints.addTangent(spline1, line1)
-            toothSketch.geometricConstraints.addTangent(spline2, line2)
-       
+            if not knots:
+                toothSketch.geometricConstraints.addTangent(spline1, line1)
+                toothSketch.geometricConstraints.addTangent(spline2, line2)
+   
         toothSketch.isComputeDeferred = False
 
-        ### Extrude the tooth.
-        
-        # Get the profile defined by the tooth.
+    ### Extrude the tooth.
+    
+    # Get the profile defined by the tooth.
+    with span('tooth extrude'):
         prof = toothSketch.profiles.item(0)
 
         # Create an extrusion input to be able to define the input needed for an extrusion
@@ -705,35 +1109,37 @@ def drawGear(design, diametralPitch, numTeeth, thickness, rootFilletRad, pressur
         # Create the extrusion.
         toothExtrude = extrudes.add(extInput)
 
-        baseFillet = None
-        if rootFilletRad > 0:
+    baseFillet = None
+    if rootFilletRad > 0:
+        with span('fillet'):
             ### Find the edges between the base cylinder and the tooth.
-            
+        
             # Get the outer cylindrical face from the base extrusion by checking the number
             # of edges and if it's 2 get the other one.
             cylFace = baseExtrude.sideFaces.item(0)
             if cylFace.edges.count == 2:
                 cylFace = baseExtrude.sideFaces.item(1)
-    
+
             # Get the two linear edges, which are the connection between the cylinder and tooth.
             edges = adsk.core.ObjectCollection.create()
             for edge in cylFace.edges:
                 if isinstance(edge.geometry, adsk.core.Line3D):
                     edges.add(edge)
-    
+
             # Create a fillet input to be able to define the input needed for a fillet.
-            fillets = newComp.features.filletFeatures;
+            fillets = comp.features.filletFeatures;
             filletInput = fillets.createInput()
-    
+
             # Define that the extent is a distance extent of 5 cm.
             radius = adsk.core.ValueInput.createByReal(rootFilletRad)
             filletInput.addConstantRadiusEdgeSet(edges, radius, False)
-    
+
             # Create the extrusion.
             baseFillet = fillets.add(filletInput)
 
-        # Create a pattern of the tooth extrude and the base fillet.
-        circularPatterns = newComp.features.circularPatternFeatures
+    # Create a pattern of the tooth extrude and the base fillet.
+    with span('circular pattern'):
+        circularPatterns = comp.features.circularPatternFeatures
         entities = adsk.core.ObjectCollection.create()
         entities.add(toothExtrude)
         if baseFillet:
@@ -743,36 +1149,76 @@ def drawGear(design, diametralPitch, numTeeth, thickness, rootFilletRad, pressur
         numTeethInput = adsk.core.ValueInput.createByString(str(numTeeth))
         patternInput.quantity = numTeethInput
         patternInput.patternComputeOption = adsk.fusion.PatternComputeOptions.IdenticalPatternCompute        
-        pattern = circularPatterns.add(patternInput)        
-        
-        # Create an extra sketch that contains a circle of the diametral pitch.
-        diametralPitchSketch = sketches.add(xyPlane)
-        diametralPitchCircle = diametralPitchSketch.sketchCurves.sketchCircles.addByCenterRadius(adsk.core.Point3D.create(0,0,0), pitchDia/2.0)
-        diametralPitchCircle.isConstruction = True
-        diametralPitchCircle.isFixed = True
-        
-        # Group everything used to create the gear in the timeline.
-        timelineGroups = design.timeline.timelineGroups
-        newOccIndex = newOcc.timelineObject.index
-        pitchSketchIndex = diametralPitchSketch.timelineObject.index
-        # ui.messageBox("Indices: " + str(newOccIndex) + ", " + str(pitchSketchIndex))
-        timelineGroup = timelineGroups.add(newOccIndex, pitchSketchIndex)
-        timelineGroup.name = 'Spur Gear'
-        
-        # Add an attribute to the component with all of the input values.  This might 
-        # be used in the future to be able to edit the gear.     
-        gearValues = {}
-        gearValues['diametralPitch'] = str(diametralPitch * 2.54)
-        gearValues['numTeeth'] = str(numTeeth)
-        gearValues['thickness'] = str(thickness)
-        gearValues['rootFilletRad'] = str(rootFilletRad)
-        gearValues['pressureAngle'] = str(pressureAngle)
-        gearValues['holeDiam'] = str(holeDiam)
-        gearValues['backlash'] = str(backlash)
-        attrib = newComp.attributes.add('SpurGear', 'Values',str(gearValues))
-        
-        newComp.name = 'Spur Gear (' + str(numTeeth) + ' teeth)'
-        return newComp
-    except Exception as error:
-        _ui.messageBox("drawGear Failed : " + str(error)) 
-        return None
\ No newline at end of file
+        pattern = circularPatterns.add(patternInput)
+
+
+def _points3D(points):
+    return [adsk.core.Point3D.create(x, y, 0) for x, y in points]
+
+
+# The whole outline -- every tooth, root fillet and root arc -- drawn in one
+# sketch and extruded once, so there is no join, fillet feature or pattern to
+# build or recompute.
+def drawFullProfile(comp, spec):
+    with span('profile'):
+        profile, flankPoints, knots = gearGeometry(spec)
+        flanks1, flanks2 = profile.teeth(flankPoints)
+        noPieces = [None] * profile.numTeeth
+        sides = []
+        # Sketch arcs run counterclockwise, so a fillet arc starts at the root
+        # circle only if the fillet, drawn from the root, turns that way.  The
+        # teeth are rotated copies, so the first one tells for a whole side.
+        rootAtStart = []
+        for flanks, lines, fillets in ((flanks1, profile.lines1, profile.fillets1),
+                                       (flanks2, profile.lines2, profile.fillets2)):
+            sides.append(list(zip(flanks.tolist(),
+                                  noPieces if lines is None else lines.tolist(),
+                                  noPieces if fillets is None else fillets.tolist())))
+            rootAtStart.append(fillets is not None and bool(arcBulges(fillets[:1])[0] > 0.0))
+        tipMids = profile.tipArcs[:, 1].tolist()
+        rootMids = profile.rootArcs[:, 1].tolist()
+
+    with span('gear sketch'):
+        sketch = comp.sketches.add(comp.xYConstructionPlane)
+        sketch.isComputeDeferred = True
+        sketchArcs = sketch.sketchCurves.sketchArcs
+        sketchLines = sketch.sketchCurves.sketchLines
+
+        # Neighbouring curves share their end points: each curve after a
+        # flank is drawn to the sketch point the one before it ends at, so the
+        # outline is one connected loop.  rootEnds holds the sketch points
+        # where each side of each tooth meets the root circle.
+        rootEnds = []
+        for tooth in range(profile.numTeeth):
+            ends = []
+            tips = []
+            for side, filletRootAtStart in zip(sides, rootAtStart):
+                flank, line, fillet = side[tooth]
+                spline = addFlankSpline(sketch, _points3D(flank), knots)
+                tips.append(spline.endSketchPoint)
+                end = spline.startSketchPoint
+                if line:
+                    start = adsk.core.Point3D.create(line[0][0], line[0][1], 0)
+                    end = sketchLines.addByTwoPoints(start, end).startSketchPoint
+                if fillet:
+                    start, mid = _points3D(fillet[:2])
+                    arc = sketchArcs.addByThreePoints(start, mid, end)
+                    end = arc.startSketchPoint if filletRootAtStart else arc.endSketchPoint
+                ends.append(end)
+            tipMid = adsk.core.Point3D.create(tipMids[tooth][0], tipMids[tooth][1], 0)
+            sketchArcs.addByThreePoints(tips[0], tipMid, tips[1])
+            rootEnds.append(ends)
+
+        for tooth in range(profile.numTeeth):
+            rootMid = adsk.core.Point3D.create(rootMids[tooth][0], rootMids[tooth][1], 0)
+            nextTooth = (tooth + 1) % profile.numTeeth
+            sketchArcs.addByThreePoints(rootEnds[tooth][1], rootMid, rootEnds[nextTooth][0])
+        sketch.isComputeDeferred = False
+        prof = gearBodyProfile(sketch, spec.holeDiam)
+
+    with span('gear extrude'):
+        extrudes = comp.features.extrudeFeatures
+        extInput = extrudes.createInput(prof, adsk.fusion.FeatureOperations.NewBodyFeatureOperation)
+        distance = adsk.core.ValueInput.createByReal(spec.thickness)
+        extInput.setDistanceExtent(False, distance)
+        extrudes.add(extInput)
@@ -0,0 +1,238 @@
+# Counts adsk API round trips made by the scripts.
+#
+# ApiProfiler.install(module) swaps the adsk namespaces a script module uses
+# (adsk, and the core/fusion aliases) for proxies.  Every object reached
+# through them is proxied too, so each method call, property read and property
+# set is counted by the script function that made it and by the current
+# phase: the innermost phaseTimer span while a trace is running, otherwise the
+# name set with ApiProfiler.phase().  It works the same against Fusion's real
+# adsk and the benchmarks' recording stand-in.  Install it after the script
+# has been imported: the handler classes must subclass the real adsk types.
+
+import contextlib
+import sys
+import types
+from collections import Counter
+
+import phaseTimer
+
+_plainTypes = (int, float, complex, str, bytes, bool, type(None))
+_namespaceNames = ('adsk', 'core', 'fusion', 'cam')
+
+
+def _unwrap(value):
+    if isinstance(value, _Proxy):
+        return object.__getattribute__(value, '_target')
+    if isinstance(value, list):
+        return [_unwrap(v) for v in value]
+    if isinstance(value, tuple):
+        return tuple(_unwrap(v) for v in value)
+    return value
+
+
+def _label(target):
+    if isinstance(target, (type, types.ModuleType)):
+        return target.__name__.split('.')[-1]
+    # The recording stand-in names its objects after the attribute they came
+    # from, which reads better than its class name.
+    name = getattr(target, '__dict__', {}).get('_name')
+    if isinstance(name, str):
+        return name
+    return type(target).__name__
+
+
+# The name a call through a proxy is counted under.  The stand-in's members
+# know the owner they were read from.
+def _callName(target, label):
+    name = getattr(target, '__dict__', {}).get('_qualifiedName')
+    return name if isinstance(name, str) else label
+
+
+def _isMethod(value):
+    return isinstance(value, (types.MethodType, types.BuiltinFunctionType, types.FunctionType))
+
+
+class ApiProfiler:
+    def __init__(self):
+        self.counts = Counter()
+        self.currentPhase = ''
+        self._moduleGlobals = []
+        self._installed = []
+
+    def reset(self):
+        self.counts.clear()
+
+    # Replaces the adsk namespaces in a script module's globals with proxies.
+    def install(self, module):
+        self._moduleGlobals.append(module.__dict__)
+        for name in _namespaceNames:
+            value = module.__dict__.get(name)
+            if isinstance(value, types.ModuleType):
+                self._installed.append((module, name, value))
+                setattr(module, name, self.wrap(value))
+
+    # Puts the original namespaces back.
+    def uninstall(self):
+        for module, name, value in reversed(self._installed):
+            setattr(module, name, value)
+        self._installed = []
+        self._moduleGlobals = []
+
+    def wrap(self, target):
+        if isinstance(target, _plainTypes) or isinstance(target, _Proxy):
+            return target
+        if isinstance(target, tuple):
+            return tuple(self.wrap(v) for v in target)
+        if isinstance(target, list):
+            return [self.wrap(v) for v in target]
+        return _Proxy(self, target)
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        previous = self.currentPhase
+        self.currentPhase = name
+        try:
+            yield
+        finally:
+            self.currentPhase = previous
+
+    # The innermost function of an installed script module on the call stack.
+    def _caller(self):
+        frame = sys._getframe(3)
+        while frame is not None:
+            for moduleGlobals in self._moduleGlobals:
+                if frame.f_globals is moduleGlobals:
+                    return frame.f_code.co_name
+            frame = frame.f_back
+        return '<other>'
+
+    def record(self, kind, name):
+        phase = self.currentPhase
+        trace = phaseTimer.activeTrace()
+        if trace is not None and trace.stack:
+            phase = trace.currentPhase()
+        self.counts[(kind, self._caller(), phase, name)] += 1
+
+    # Method calls plus property sets: the round trips that change the model.
+    # Property reads are counted separately by gets().
+    def calls(self, function=None, phase=None):
+        return self._total(('call', 'set'), function, phase)
+
+    def gets(self, function=None, phase=None):
+        return self._total(('get',), function, phase)
+
+    def _total(self, kinds, function, phase):
+        total = 0
+        for (kind, fn, ph, name), count in self.counts.items():
+            if kind in kinds and (function is None or fn == function) and (phase is None or ph == phase):
+                total += count
+        return total
+
+    def _grouped(self, index):
+        grouped = Counter()
+        for key, count in self.counts.items():
+            if key[0] != 'get':
+                grouped[key[index]] += count
+        return grouped
+
+    def callsByFunction(self):
+        return self._grouped(1)
+
+    def callsByPhase(self):
+        return self._grouped(2)
+
+    def callsByApi(self):
+        return self._grouped(3)
+
+    def report(self, limit=20):
+        lines = ['adsk calls: {}  property reads: {}'.format(self.calls(), self.gets())]
+        for title, grouped in (('by function', self.callsByFunction()),
+                               ('by phase', self.callsByPhase()),
+                               ('by API', self.callsByApi())):
+            lines.append(title + ':')
+            for name, count in grouped.most_common(limit):
+                lines.append('  {:<48} {:>8}'.format(name or '<none>', count))
+        return '\n'.join(lines)
+
+
+class _Proxy:
+    __slots__ = ('_profiler', '_target', '_name')
+
+    def __init__(self, profiler, target):
+        object.__setattr__(self, '_profiler', profiler)
+        object.__setattr__(self, '_target', target)
+        object.__setattr__(self, '_name', _label(target))
+
+    def __getattr__(self, attr):
+        profiler = object.__getattribute__(self, '_profiler')
+        target = object.__getattribute__(self, '_target')
+        qualified = object.__getattribute__(self, '_name') + '.' + attr
+        value = getattr(target, attr)
+
+        if isinstance(target, types.ModuleType) and isinstance(value, (type, types.ModuleType)):
+            # Walking namespaces is not a round trip.
+            return profiler.wrap(value)
+        if _isMethod(value):
+            return _BoundCall(profiler, value, qualified)
+        if isinstance(value, type):
+            return profiler.wrap(value)
+
+        if not isinstance(target, (type, types.ModuleType)):
+            profiler.record('get', qualified)
+        return profiler.wrap(value)
+
+    def __setattr__(self, attr, value):
+        profiler = object.__getattribute__(self, '_profiler')
+        target = object.__getattribute__(self, '_target')
+        profiler.record('set', object.__getattribute__(self, '_name') + '.' + attr)
+        setattr(target, attr, _unwrap(value))
+
+    def __call__(self, *args, **kwargs):
+        profiler = object.__getattribute__(self, '_profiler')
+        target = object.__getattribute__(self, '_target')
+        profiler.record('call', _callName(target, object.__getattribute__(self, '_name')))
+        result = target(*_unwrap(args), **{k: _unwrap(v) for k, v in kwargs.items()})
+        return profiler.wrap(result)
+
+    def __iter__(self):
+        profiler = object.__getattribute__(self, '_profiler')
+        for item in object.__getattribute__(self, '_target'):
+            yield profiler.wrap(item)
+
+    def __len__(self):
+        return len(object.__getattribute__(self, '_target'))
+
+    def __getitem__(self, index):
+        profiler = object.__getattribute__(self, '_profiler')
+        return profiler.wrap(object.__getattribute__(self, '_target')[index])
+
+    def __bool__(self):
+        return bool(object.__getattribute__(self, '_target'))
+
+    def __eq__(self, other):
+        return object.__getattribute__(self, '_target') == _unwrap(other)
+
+    def __hash__(self):
+        return hash(object.__getattribute__(self, '_target'))
+
+    def __instancecheck__(self, obj):
+        return isinstance(_unwrap(obj), object.__getattribute__(self, '_target'))
+
+    def __repr__(self):
+        return '<ApiProfiler proxy of {!r}>'.format(object.__getattribute__(self, '_target'))
+
+
+# A bound method reached through a proxy.  Looking a method up is free; the
+# call is the round trip.
+class _BoundCall:
+    __slots__ = ('_profiler', '_method', '_name')
+
+    def __init__(self, profiler, method, name):
+        self._profiler = profiler
+        self._method = method
+        self._name = name
+
+    def __call__(self, *args, **kwargs):
+        self._profiler.record('call', self._name)
+        result = self._method(*_unwrap(args), **{k: _unwrap(v) for k, v in kwargs.items()})
+        return self._profiler.wrap(result)
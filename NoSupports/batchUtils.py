@@ -0,0 +1,50 @@
+# Helpers shared by the headless batch tools: loading parameter sets, fanning
+# jobs out over a process pool and reporting throughput.
+
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+# Loads a list of parameter sets (dicts) from a .csv file with a header row or
+# a .json file holding either a list of objects or {"items": [...]}.  CSV
+# values are strings; callers convert them.
+def loadParameterSets(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.csv':
+        with open(path, newline='') as f:
+            return [dict(row) for row in csv.DictReader(f)]
+    if ext == '.json':
+        with open(path) as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get('items', [])
+        if not isinstance(data, list):
+            raise ValueError(path + ': expected a list of parameter sets')
+        return data
+    raise ValueError(path + ': parameter sets must be a .csv or .json file')
+
+
+# Runs worker(job) for every job, over a pool of processes when workers > 1.
+# Results come back in job order.  Returns (results, elapsedSeconds).
+def runBatch(worker, jobs, workers=None):
+    start = time.perf_counter()
+    if workers == 1 or len(jobs) <= 1:
+        results = [worker(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(worker, jobs, chunksize=max(1, len(jobs) // 64)))
+    return results, time.perf_counter() - start
+
+
+def formatThroughput(count, seconds, noun):
+    rate = count / seconds if seconds > 0 else float('inf')
+    return '{} {} in {:.2f} s ({:.1f} {}/sec)'.format(count, noun, seconds, rate, noun)
+
+
+# Turns free text into something safe to use in a file name.
+def safeName(text):
+    cleaned = ''.join(c if c.isalnum() or c in '-_.' else '_' for c in str(text))
+    return cleaned.strip('._') or 'item'
@@ -0,0 +1,85 @@
+# Headless batch generator for Ascending Chevrons panels.
+#
+# Reads a CSV or JSON list of parameter sets and writes one DXF per set, using
+# the same geometry and DXF writers as the Fusion script but without adsk.
+# Sets are spread over a process pool.
+#
+#   python chevronBatch.py panels.csv --out-dir out --workers 8
+#
+# Each parameter set has width, height, margin and webbing in millimetres,
+# numCols and numRows, and optionally a name and a writer.  Output files are
+# named <name or panelNNNN>_<cols>x<rows>_<hash>.dxf, where the hash covers the
+# inputs, so the same parameters always produce the same file name.
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)))
+
+from batchUtils import formatThroughput, loadParameterSets, runBatch, safeName
+from chevronCache import chevronCacheKey
+from chevronDxf import dxfChevronLayout, writeChevronDxf
+from dxfSink import FileDxfSink
+
+_writers = ['flat', 'insert', 'minsert', 'stream', 'welded', 'merged']
+
+
+# A parameter set converted to the units the Fusion script works in: lengths
+# in cm, counts as numbers.
+class ChevronPanel:
+    def __init__(self, index, params, writer, explode, tolerance):
+        self.index = index
+        self.name = params.get('name') or 'panel{:04d}'.format(index)
+        self.width = float(params['width']) / 10.0
+        self.height = float(params['height']) / 10.0
+        self.margin = float(params['margin']) / 10.0
+        self.webbing = float(params['webbing']) / 10.0
+        self.numCols = float(params['numCols'])
+        self.numRows = float(params['numRows'])
+        self.writer = params.get('writer') or writer
+        self.explode = explode
+        self.tolerance = tolerance
+        if self.writer not in _writers:
+            raise ValueError('Panel {}: unknown writer {}'.format(self.name, self.writer))
+
+    def fileName(self):
+        key = chevronCacheKey(self.width, self.height, self.numCols, self.numRows, self.webbing, self.margin,
+                              self.writer, explode=self.explode, tolerance=self.tolerance)
+        return '{}_{}x{}_{}.dxf'.format(safeName(self.name), int(self.numCols), int(self.numRows), key[:12])
+
+
+def writePanel(job):
+    panel, outDir = job
+    start = time.perf_counter()
+    layout = dxfChevronLayout(panel.width, panel.height, panel.numCols, panel.numRows, panel.webbing, panel.margin)
+    sink = FileDxfSink(os.path.join(outDir, panel.fileName()))
+    writeChevronDxf(layout, sink, panel.writer, panel.explode, panel.tolerance)
+    return sink.path, sink.bytesWritten, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate Ascending Chevrons DXF panels without Fusion.')
+    parser.add_argument('params', help='CSV or JSON file with one parameter set per panel')
+    parser.add_argument('--out-dir', default='.', help='directory for the DXF files')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: one per CPU)')
+    parser.add_argument('--writer', choices=_writers, default='flat', help='DXF writer for sets that do not name one')
+    parser.add_argument('--explode', action='store_true', help='explode block references into plain polylines')
+    parser.add_argument('--tolerance', type=float, default=1e-6, help='weld/snap tolerance in DXF units')
+    args = parser.parse_args(argv)
+
+    paramSets = loadParameterSets(args.params)
+    panels = [ChevronPanel(i + 1, params, args.writer, args.explode, args.tolerance)
+              for i, params in enumerate(paramSets)]
+    os.makedirs(args.out_dir, exist_ok=True)
+
+    results, seconds = runBatch(writePanel, [(panel, args.out_dir) for panel in panels], args.workers)
+    for path, numBytes, panelSeconds in results:
+        print('{}  {} bytes  {:.1f} ms'.format(path, numBytes, panelSeconds * 1000.0))
+    print(formatThroughput(len(results), seconds, 'panels'))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,181 @@
+# Persistent, content-addressed cache of generated chevron DXF files.
+#
+# Entries are keyed by a hash of the normalized inputs that determine the DXF
+# contents, so re-running the same parameters skips geometry generation and
+# DXF writing entirely.  The cache lives in a directory on disk and is bounded
+# by total size; the least recently used entries are evicted first (a hit
+# refreshes the entry's modification time).  Hit and miss counts are kept per
+# process, since the batch tool's workers share a cache: each process only
+# rewrites its own stats file, and the totals are summed over all of them.
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+# Bump this whenever the generated geometry or DXF layout changes, so stale
+# entries stop matching.
+cacheFormatVersion = 1
+
+_defaultMaxBytes = 512 * 1024 * 1024
+# Stats files are stats-<pid>.json.  stats.json is the single file older
+# versions shared between processes.
+_statsPrefix = 'stats'
+
+
+def defaultCacheDir():
+    cacheDir = os.environ.get('NOSUPPORTS_CACHE_DIR')
+    if cacheDir:
+        return cacheDir
+    return os.path.join(os.path.expanduser('~'), '.nosupports', 'chevron-cache')
+
+
+def _normalize(value):
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        value = float('{:.12g}'.format(value))
+        if value.is_integer():
+            return int(value)
+        return value
+    return str(value).strip()
+
+
+# Hash of the inputs that determine the DXF.  Floats are rounded to 12
+# significant digits so values that differ only by evaluation noise share an
+# entry.  The sketch name only decides where the result is imported, so it is
+# deliberately not part of the key.
+def chevronCacheKey(width, height, numCols, numRows, webbing, margin, writer, **options):
+    inputs = {
+        'version': cacheFormatVersion,
+        'width': width,
+        'height': height,
+        'numCols': numCols,
+        'numRows': numRows,
+        'webbing': webbing,
+        'margin': margin,
+        'writer': writer,
+    }
+    inputs.update(options)
+    normalized = {name: _normalize(value) for name, value in inputs.items()}
+    text = json.dumps(normalized, sort_keys=True)
+    return hashlib.sha256(text.encode('utf8')).hexdigest()
+
+
+class ChevronCache:
+    def __init__(self, directory=None, maxBytes=_defaultMaxBytes):
+        self.directory = directory or defaultCacheDir()
+        self.maxBytes = maxBytes
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _entryPath(self, key):
+        return os.path.join(self.directory, key + '.dxf')
+
+    # Returns the path of the cached DXF for key, or None on a miss.
+    def get(self, key):
+        path = self._entryPath(key)
+        try:
+            os.utime(path)
+        except OSError:
+            self._count('misses')
+            return None
+        self._count('hits')
+        return path
+
+    # Copies the DXF at sourcePath into the cache under key and evicts old
+    # entries if the cache has grown past maxBytes.  The copy goes through a
+    # temp file so a concurrent reader never sees a partial entry.
+    def put(self, key, sourcePath):
+        handle, tempPath = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        os.close(handle)
+        try:
+            shutil.copyfile(sourcePath, tempPath)
+            os.replace(tempPath, self._entryPath(key))
+        except OSError:
+            try:
+                os.remove(tempPath)
+            except OSError:
+                pass
+            raise
+        self.evict()
+        return self._entryPath(key)
+
+    # Removes least recently used entries until the cache fits in maxBytes.
+    def evict(self):
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith('.dxf'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                info = os.stat(path)
+            except OSError:
+                continue
+            entries.append((info.st_mtime, info.st_size, path))
+            total += info.st_size
+
+        entries.sort()
+        evicted = 0
+        for mtime, size, path in entries:
+            if total <= self.maxBytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        return evicted
+
+    def _statsPath(self, pid=None):
+        name = '{}-{}.json'.format(_statsPrefix, os.getpid() if pid is None else pid)
+        return os.path.join(self.directory, name)
+
+    # The counts of one stats file, or no counts if it cannot be read.
+    @staticmethod
+    def _readStats(path):
+        try:
+            with open(path) as f:
+                stats = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return stats if isinstance(stats, dict) else {}
+
+    # Hits and misses summed over every process that used the cache.
+    def stats(self):
+        totals = {'hits': 0, 'misses': 0}
+        for name in os.listdir(self.directory):
+            if name.startswith(_statsPrefix) and name.endswith('.json'):
+                stats = self._readStats(os.path.join(self.directory, name))
+                for counter in totals:
+                    value = stats.get(counter, 0)
+                    if isinstance(value, int):
+                        totals[counter] += value
+        return totals
+
+    # Adds one to a counter in this process's stats file.  No other process
+    # writes that file, and it is replaced in one step so a reader never sees
+    # it half written.
+    def _count(self, name):
+        path = self._statsPath()
+        stats = self._readStats(path)
+        stats[name] = stats.get(name, 0) + 1
+        try:
+            handle, tempPath = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        except OSError:
+            return
+        try:
+            with os.fdopen(handle, 'w') as f:
+                json.dump(stats, f)
+            os.replace(tempPath, path)
+        except OSError:
+            try:
+                os.remove(tempPath)
+            except OSError:
+                pass
+
+    def summary(self):
+        stats = self.stats()
+        return 'Chevron cache: {} hits, {} misses'.format(stats['hits'], stats['misses'])
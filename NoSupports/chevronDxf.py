@@ -0,0 +1,170 @@
+# Builds DXF documents for the Ascending Chevrons grid.
+#
+# Only ezdxf and chevronGeometry are needed here, so the same writers serve the
+# Fusion script and headless tools.
+
+import ezdxf
+from ezdxf.addons import r12writer
+
+from chevronGeometry import ChevronGrid, ChevronLayout, iterChevronPolylines
+from chevronOutline import mergedOutlineLoops
+from dxfSink import writeDxfUnitsHeader
+from phaseTimer import span
+from segmentWeld import weldPolylines
+
+# Design values are divided by this factor before they are written to DXF, as
+# the Fusion script has always done.
+dxfScale = 100.0
+
+# The units every writer declares: the $INSUNITS and $MEASUREMENT a new ezdxf
+# document has, which the import has always been read with.
+_dxfInsUnits = 6
+_dxfMeasurement = 1
+
+_chevronBlock = 'CHEVRON'
+_strutBlock = 'STRUT'
+
+
+# Layout of the grid in DXF space: design values (cm) scaled down by dxfScale,
+# y axis mirrored.
+def dxfChevronLayout(width, height, numCols, numRows, webbing, margin):
+    return ChevronLayout(width / dxfScale, height / dxfScale, numCols, numRows,
+                         webbing / dxfScale, margin / dxfScale)
+
+
+def _newDxfDocument():
+    doc = ezdxf.new("R2000")
+    doc.header['$INSUNITS'] = _dxfInsUnits
+    doc.header['$MEASUREMENT'] = _dxfMeasurement
+    return doc
+
+
+# One LWPOLYLINE per frame, chevron and strut line.
+def buildFlatDxf(grid):
+    doc = _newDxfDocument()
+    msp = doc.modelspace()
+    for points in grid.polylines():
+        msp.add_lwpolyline(points)
+    return doc
+
+
+# The chevron and the strut are defined once as blocks and placed with block
+# references, so the file grows with the number of cells rather than the number
+# of vertices.  With useMinsert each block is placed by a single MINSERT array,
+# since the grid spacing is regular.  With explode the references are expanded
+# back into plain polylines for importers that need flat geometry.
+def buildBlockDxf(layout, useMinsert=True, explode=False):
+    doc = _newDxfDocument()
+    msp = doc.modelspace()
+
+    for points in layout.frames().tolist():
+        msp.add_lwpolyline(points)
+
+    sign = -1.0 if layout.flip else 1.0
+    colOffsets = layout.columnOffsets()
+    rowOffsets = layout.applyFlip(layout.rowOffsets())
+
+    if layout.numCells > 0:
+        seed = layout.chevronRows(0, 1)[0, 0]
+        chevronBlock = doc.blocks.new(name=_chevronBlock)
+        chevronBlock.add_lwpolyline((seed - seed[0]).tolist())
+
+        if useMinsert:
+            insert = msp.add_blockref(_chevronBlock, (colOffsets[0], rowOffsets[0]))
+            insert.grid(size=(layout.numRows, layout.numCols),
+                        spacing=(sign * layout.yStep, layout.xStep))
+        else:
+            for y in rowOffsets.tolist():
+                for x in colOffsets.tolist():
+                    msp.add_blockref(_chevronBlock, (x, y))
+
+    if layout.numStruts > 0:
+        struts = layout.struts()
+        origin = struts[0, 0, 0]
+        strutBlock = doc.blocks.new(name=_strutBlock)
+        for line in (struts[0] - origin).tolist():
+            strutBlock.add_lwpolyline(line)
+
+        if useMinsert:
+            insert = msp.add_blockref(_strutBlock, tuple(origin.tolist()))
+            insert.grid(size=(1, layout.numStruts), spacing=(0.0, layout.xStep))
+        else:
+            for x, y in struts[:, 0, 0].tolist():
+                msp.add_blockref(_strutBlock, (x, y))
+
+    if explode:
+        for insert in msp.query('INSERT'):
+            insert.explode()
+
+    return doc
+
+
+# Welds coincident vertices and merges overlapping collinear edges before
+# writing, so each edge is written once as a LINE.  Returns the document and
+# the WeldResult describing what was removed.
+def buildWeldedDxf(layout, tolerance=1e-6):
+    result = weldPolylines(ChevronGrid(layout).polylines(), tolerance)
+    doc = _newDxfDocument()
+    msp = doc.modelspace()
+    for start, end in result.segments:
+        msp.add_line(start, end)
+    return doc, result
+
+
+# Writes the union of the chevrons, struts and frame as closed polylines, one
+# per boundary loop.  Returns the document and the number of loops.
+def buildOutlineDxf(layout, gridSize=1e-6):
+    loops = mergedOutlineLoops(layout, gridSize)
+    doc = _newDxfDocument()
+    msp = doc.modelspace()
+    for loop in loops:
+        msp.add_lwpolyline(loop, close=True)
+    return doc, len(loops)
+
+
+# Writes the grid straight to a text stream as R12 POLYLINE entities without
+# building an ezdxf document.  Polylines come from a generator that works a few
+# rows at a time, so peak memory stays flat however large the grid is.  The
+# geometry and declared units are the same as buildFlatDxf; only the DXF
+# version differs.
+def streamChevronDxf(layout, stream):
+    writeDxfUnitsHeader(stream, _dxfInsUnits, _dxfMeasurement)
+    with r12writer(stream) as dxf:
+        for points in iterChevronPolylines(layout):
+            dxf.add_polyline_2d(points)
+
+
+# Builds the DXF for a layout.  instancing is 'flat' (one polyline per entity,
+# the historic output), 'insert' (one block reference per cell) or 'minsert'
+# (one block reference array per block).
+def buildChevronDxf(layout, instancing='flat', explode=False):
+    if instancing == 'flat':
+        return buildFlatDxf(ChevronGrid(layout))
+    if instancing == 'insert':
+        return buildBlockDxf(layout, useMinsert=False, explode=explode)
+    if instancing == 'minsert':
+        return buildBlockDxf(layout, useMinsert=True, explode=explode)
+    raise ValueError('Unknown DXF instancing: ' + str(instancing))
+
+
+# Writes the DXF for a layout to a sink (see dxfSink.py) with the given writer:
+# 'flat', 'insert', 'minsert', 'stream', 'welded' or 'merged'.  Returns a
+# short note about the post-processing for the welded and merged writers.
+def writeChevronDxf(layout, dxfSink, writer='flat', explode=False, tolerance=1e-6):
+    if writer == 'stream':
+        dxfSink.writeWith(lambda stream: streamChevronDxf(layout, stream))
+    elif writer == 'welded':
+        with span('dxf build'):
+            doc, weld = buildWeldedDxf(layout, tolerance)
+        dxfSink.write(doc)
+        return weld.summary()
+    elif writer == 'merged':
+        with span('dxf build'):
+            doc, numLoops = buildOutlineDxf(layout, tolerance)
+        dxfSink.write(doc)
+        return "Merged webbing into {} outline loops".format(numLoops)
+    else:
+        with span('dxf build'):
+            doc = buildChevronDxf(layout, writer, explode)
+        dxfSink.write(doc)
+    return None
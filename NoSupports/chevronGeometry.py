@@ -0,0 +1,178 @@
+# Geometry for the Ascending Chevrons grid.
+#
+# Nothing in here touches adsk or ezdxf, so the grid can be computed, tested
+# and benchmarked on any machine that has numpy.  Every array is laid out so
+# the last axis is (x, y).
+
+import numpy as np
+
+
+# Mirrors a y coordinate the same way the DXF writer always has.  It is kept in
+# this form (rather than simply -y) so the batched results are bit-for-bit
+# identical to the old per-cell code.
+# TODO: Try to deduce the flip axis automatically
+def flipY(y, height):
+    return height - y - height
+
+
+# Describes the layout of a chevron grid: cell size, row/column steps and strut
+# height.  Values are in whatever units the caller passes in.  When flip is
+# True the y coordinates are mirrored with flipY.
+class ChevronLayout:
+    def __init__(self, width, height, numCols, numRows, webbing, margin, flip=True):
+        self.width = width
+        self.height = height
+        self.webbing = webbing
+        self.margin = margin
+        self.flip = flip
+
+        overallWidth = width - margin * 2.0
+        overallHeight = height - margin * 2.0
+
+        # numCols may arrive as a float from the dialog; the cell width uses it
+        # as-is and the loops use its integer part, as the original code did.
+        self.chevronWidth = overallWidth / numCols
+        self.numCols = int(numCols)
+        self.numRows = int(numRows)
+
+        self.xStep = self.chevronWidth
+        if self.numRows > 1:
+            self.yStep = (overallHeight - (self.chevronWidth / 2) - webbing) / (self.numRows - 1)
+        else:
+            # A single row has no vertical step (the old loop divided by zero).
+            self.yStep = 0.0
+
+        self.strutHeight = self.yStep * (self.numRows - 1) + webbing / 2
+
+    @property
+    def numCells(self):
+        return self.numRows * self.numCols
+
+    @property
+    def numStruts(self):
+        return max(self.numCols - 1, 0)
+
+    def applyFlip(self, y):
+        if self.flip:
+            return flipY(y, self.height)
+        return y
+
+    # Left edges of the columns, accumulated the same way the old loop did.
+    def columnOffsets(self):
+        steps = np.full(self.numCols, self.xStep, dtype=float)
+        if self.numCols > 0:
+            steps[0] = self.margin
+        return np.cumsum(steps)
+
+    # Bottom edges of the rows, accumulated the same way the old loop did.
+    def rowOffsets(self):
+        steps = np.full(self.numRows, self.yStep, dtype=float)
+        if self.numRows > 0:
+            steps[0] = self.margin
+        return np.cumsum(steps)
+
+    # The outer and inner (margin) rectangles as a (2, 5, 2) array.
+    def frames(self):
+        x2 = self.width
+        y2 = self.height
+        m = self.margin
+        xs = np.array([[0.0, x2, x2, 0.0, 0.0],
+                       [m, x2 - m, x2 - m, m, m]])
+        ys = np.array([[0.0, 0.0, y2, y2, 0.0],
+                       [m, m, y2 - m, y2 - m, m]])
+        return np.stack((xs, self.applyFlip(ys)), axis=-1)
+
+    # Chevron polylines for rows [start, stop) as a (rows, cols, 7, 2) array.
+    # colStart/colStop narrow it down to a range of columns.
+    def chevronRows(self, start=0, stop=None, colStart=0, colStop=None):
+        if stop is None:
+            stop = self.numRows
+        halfWidth = self.chevronWidth / 2.0
+        apexHeight = halfWidth
+
+        x0 = self.columnOffsets()[np.newaxis, colStart:colStop]
+        y0 = self.rowOffsets()[start:stop, np.newaxis]
+        x0, y0 = np.broadcast_arrays(x0, y0)
+
+        y1 = y0 + self.webbing
+        y2 = y1 + apexHeight
+        y3 = y2 - self.webbing
+        x1 = x0 + halfWidth
+        x2 = x0 + self.chevronWidth
+
+        y0, y1, y2, y3 = (self.applyFlip(y) for y in (y0, y1, y2, y3))
+
+        xs = np.stack((x0, x0, x1, x2, x2, x1, x0), axis=-1)
+        ys = np.stack((y0, y1, y2, y1, y0, y3, y0), axis=-1)
+        return np.stack((xs, ys), axis=-1)
+
+    # Every chevron in the grid as a (rows, cols, 7, 2) array.
+    def chevrons(self):
+        return self.chevronRows()
+
+    # Struts at the right side of every chevron except the last, as a
+    # (numCols - 1, 2, 2, 2) array of [strut][line][point][xy].  start/stop
+    # select a range of struts.
+    def struts(self, start=0, stop=None):
+        if stop is None or stop > self.numStruts:
+            stop = self.numStruts
+        startX = self.columnOffsets()[start:stop] + self.xStep
+        x0 = startX - self.webbing / 2.0
+        x1 = x0 + self.webbing
+
+        y0 = np.full(len(startX), self.margin, dtype=float)
+        y1 = y0 + self.strutHeight
+        y0 = self.applyFlip(y0)
+        y1 = self.applyFlip(y1)
+
+        left = np.stack((np.stack((x0, y0), axis=-1), np.stack((x0, y1), axis=-1)), axis=1)
+        right = np.stack((np.stack((x1, y0), axis=-1), np.stack((x1, y1), axis=-1)), axis=1)
+        return np.stack((left, right), axis=1)
+
+
+# The whole grid computed in one batched pass.
+class ChevronGrid:
+    def __init__(self, layout):
+        self.layout = layout
+        self.frames = layout.frames()
+        self.chevrons = layout.chevrons()
+        self.struts = layout.struts()
+
+    # Yields every polyline as a list of (x, y) pairs in the order the DXF
+    # writer has always emitted them: frames, chevrons row by row, then struts.
+    def polylines(self):
+        for frame in self.frames.tolist():
+            yield frame
+        for row in self.chevrons.tolist():
+            for chevron in row:
+                yield chevron
+        for strut in self.struts.tolist():
+            for line in strut:
+                yield line
+
+
+def computeChevronGrid(width, height, numCols, numRows, webbing, margin, flip=True):
+    return ChevronGrid(ChevronLayout(width, height, numCols, numRows, webbing, margin, flip))
+
+
+# Same sequence as ChevronGrid.polylines(), but computed in chunks of at most
+# chunkCells cells so memory use does not grow with the size of the grid.
+def iterChevronPolylines(layout, chunkCells=1024):
+    for frame in layout.frames().tolist():
+        yield frame
+
+    colsPerChunk = max(1, min(layout.numCols, chunkCells))
+    rowsPerChunk = max(1, chunkCells // colsPerChunk)
+    for rowStart in range(0, layout.numRows, rowsPerChunk):
+        rowStop = min(rowStart + rowsPerChunk, layout.numRows)
+        for colStart in range(0, layout.numCols, colsPerChunk):
+            colStop = min(colStart + colsPerChunk, layout.numCols)
+            rows = layout.chevronRows(rowStart, rowStop, colStart, colStop)
+            for row in rows.tolist():
+                for chevron in row:
+                    yield chevron
+
+    for start in range(0, layout.numStruts, chunkCells):
+        for strut in layout.struts(start, start + chunkCells).tolist():
+            for line in strut:
+                yield line
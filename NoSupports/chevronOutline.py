@@ -0,0 +1,61 @@
+# Merged outline of the chevron webbing.
+#
+# For extrusion only the final webbing region matters, so instead of handing
+# the importer hundreds of overlapping chevrons and struts to intersect, this
+# computes the boolean union of the chevrons, the struts and the margin frame
+# and returns its boundary loops.  The importer then sees a handful of profiles.
+#
+# The union is done with shapely 2, which is optional: if it is not installed
+# mergedOutlineLoops raises ImportError and the other writers still work.
+
+import numpy as np
+
+try:
+    import shapely
+except ImportError:
+    shapely = None
+
+
+def _requireShapely():
+    if shapely is None or not hasattr(shapely, 'union_all'):
+        raise ImportError('The merged outline needs shapely 2.0 or later (pip install shapely).')
+
+
+# Closed polygons for every piece of webbing in the layout.
+def webbingPolygons(layout):
+    _requireShapely()
+
+    outer, inner = layout.frames()
+    frame = shapely.Polygon(outer, [inner])
+
+    pieces = [frame]
+    if layout.numCells > 0:
+        pieces.extend(shapely.polygons(layout.chevrons().reshape(-1, 7, 2)))
+
+    if layout.numStruts > 0:
+        # Each strut is a pair of parallel lines; the material is the rectangle
+        # between them.
+        struts = layout.struts()
+        xs = struts[..., 0]
+        ys = struts[..., 1]
+        pieces.extend(shapely.box(xs.min(axis=(1, 2)), ys.min(axis=(1, 2)),
+                                  xs.max(axis=(1, 2)), ys.max(axis=(1, 2))))
+    return pieces
+
+
+# Unions the webbing and returns its boundary as a list of closed loops, each a
+# list of (x, y) points without the repeated closing point.  Vertices are
+# snapped to a grid of the given size so edges shared by neighbouring pieces
+# fuse cleanly.
+def mergedOutlineLoops(layout, gridSize=1e-6):
+    merged = shapely.union_all(webbingPolygons(layout), grid_size=gridSize)
+    merged = shapely.simplify(merged, 0.0)
+
+    loops = []
+    for polygon in shapely.get_parts(merged):
+        if polygon.is_empty:
+            continue
+        for ring in [polygon.exterior] + list(polygon.interiors):
+            coords = np.asarray(ring.coords)[:-1]
+            loops.append(coords.tolist())
+    return loops
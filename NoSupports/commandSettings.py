@@ -0,0 +1,107 @@
+# Saves a command's dialog inputs on the design as one JSON attribute.
+#
+# The scripts used to keep one string attribute per input, which meant one
+# attributes.itemByName() per input each time the dialog opened and one
+# attributes.add() per input on every execute.  CommandSettings reads a single
+# attribute when the command is created, keeps the values for the life of the
+# command and writes them back with one attributes.add().  Values keep the
+# type of their default.  Designs that still carry the old per-input
+# attributes are migrated the first time they are read, and the old
+# attributes are removed on the next save.  A stored value that cannot be read
+# as its setting's type, such as a tooth count of "3.9", is replaced by the
+# default and reported in the log; a value the command is given that cannot
+# be kept is an error, since the saved settings must match what was built.
+
+import json
+
+from uiLogger import getLogger
+
+settingsVersion = 1
+_attributeName = 'settings'
+
+
+# Converts a stored value to the type of the default.  Raises TypeError or
+# ValueError if that is not possible, which includes a whole-number setting
+# stored as a value with a fraction: "3.9" is not silently read as 3.
+def _typed(value, default):
+    if isinstance(default, bool):
+        if isinstance(value, str):
+            return value.strip().lower() in ('1', 'true', 'yes')
+        return bool(value)
+    if isinstance(default, int):
+        number = float(value)
+        if not number.is_integer():
+            raise ValueError('{!r} is not a whole number'.format(value))
+        return int(number)
+    if isinstance(default, float):
+        return float(value)
+    return str(value)
+
+
+class CommandSettings:
+    def __init__(self, design, groupName, defaults):
+        self.design = design
+        self.groupName = groupName
+        self.defaults = dict(defaults)
+        self.values = dict(defaults)
+        self._legacyAttributes = []
+
+    # Reads the stored settings, or migrates the per-input attributes that
+    # older versions of the scripts wrote.
+    def load(self):
+        attributes = self.design.attributes
+        attrib = attributes.itemByName(self.groupName, _attributeName)
+        if attrib:
+            try:
+                record = json.loads(attrib.value)
+            except (TypeError, ValueError):
+                record = {}
+            stored = record.get('values', {}) if isinstance(record, dict) else {}
+        else:
+            stored = {}
+            for name in self.defaults:
+                legacy = attributes.itemByName(self.groupName, name)
+                if legacy:
+                    stored[name] = legacy.value
+                    self._legacyAttributes.append(legacy)
+
+        for name in self.defaults:
+            if name in stored:
+                self.values[name] = self._storedValue(name, stored[name])
+        return self
+
+    # A stored value as the type of the setting's default.  Values that cannot
+    # be read as one, such as a tooth count of "3.9" left by an older version,
+    # are replaced by the default with a warning.
+    def _storedValue(self, name, value):
+        default = self.defaults[name]
+        try:
+            return _typed(value, default)
+        except (TypeError, ValueError):
+            getLogger().warning('{} setting {} cannot be {!r}; using {!r}.', self.groupName, name, value, default)
+            return default
+
+    def __getitem__(self, name):
+        return self.values[name]
+
+    # Takes the values the command is about to build with.  Raises KeyError
+    # for an unknown setting and ValueError for a value that cannot be kept
+    # as its setting's type, and then changes nothing: the saved settings must
+    # be the ones the command used, so bad input belongs in validateInputs.
+    def update(self, **values):
+        typedValues = {}
+        for name, value in values.items():
+            if name not in self.defaults:
+                raise KeyError('Unknown setting ' + name)
+            try:
+                typedValues[name] = _typed(value, self.defaults[name])
+            except (TypeError, ValueError):
+                raise ValueError('{} setting {} cannot be {!r}'.format(self.groupName, name, value))
+        self.values.update(typedValues)
+
+    def save(self):
+        record = {'version': settingsVersion, 'values': self.values}
+        self.design.attributes.add(self.groupName, _attributeName, json.dumps(record, sort_keys=True))
+        for legacy in self._legacyAttributes:
+            legacy.deleteMe()
+        self._legacyAttributes = []
@@ -0,0 +1,182 @@
+# Output sinks for generated DXF documents.
+#
+# Fusion's importer only reads DXF from a file, so every sink can hand back a
+# path to import from.  The sinks differ in where the document is written:
+#
+#   'memory'   - an in-memory stream; only spilled to disk if a path is asked for
+#   'tempfile' - a unique per-run file in a fast temp directory, removed on close
+#   'legacy'   - the fixed c:/foo.dxf path the script has always used
+#
+# Each sink measures how long the write takes and how many bytes it produced.
+
+import io
+import os
+import tempfile
+import time
+
+from phaseTimer import span
+
+_legacyPath = 'C:/foo.dxf'
+
+
+# Picks the directory for temporary DXF files.  NOSUPPORTS_TMPDIR wins, then
+# /dev/shm when it exists (tmpfs on Linux), then the platform temp directory.
+def fastTempDir():
+    tmpDir = os.environ.get('NOSUPPORTS_TMPDIR')
+    if tmpDir and os.path.isdir(tmpDir):
+        return tmpDir
+    if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK):
+        return '/dev/shm'
+    return tempfile.gettempdir()
+
+
+# Writes a HEADER section that declares the drawing units, for writers that
+# stream entities with ezdxf's r12writer, which writes no header of its own.
+# insUnits is a $INSUNITS code (4 mm, 5 cm, 6 m) and measurement is
+# $MEASUREMENT (0 imperial, 1 metric).  Call it before the r12writer starts.
+def writeDxfUnitsHeader(stream, insUnits, measurement):
+    stream.write('0\nSECTION\n2\nHEADER\n'
+                 '9\n$ACADVER\n1\nAC1009\n'
+                 '9\n$INSUNITS\n70\n{}\n'
+                 '9\n$MEASUREMENT\n70\n{}\n'
+                 '0\nENDSEC\n'.format(insUnits, measurement))
+
+
+def _makeTempPath():
+    handle, path = tempfile.mkstemp(prefix='nosupports-', suffix='.dxf', dir=fastTempDir())
+    os.close(handle)
+    return path
+
+
+class DxfSink:
+    def __init__(self, path=None):
+        # The file the document is written to, for sinks that write a file.
+        self.path = path
+        self.writeSeconds = 0.0
+        self.bytesWritten = 0
+
+    # Writes an ezdxf document to the sink.
+    def write(self, doc):
+        start = time.perf_counter()
+        with span('dxf save'):
+            self._write(doc)
+        self.writeSeconds += time.perf_counter() - start
+
+    # Calls writer(stream) with a text stream to write DXF into, for writers
+    # that stream entities instead of building a document.
+    def writeWith(self, writer):
+        start = time.perf_counter()
+        with span('dxf stream'):
+            self._writeWith(writer)
+        self.writeSeconds += time.perf_counter() - start
+
+    # Returns a file path Fusion's importer can read the document from.
+    def importPath(self):
+        return self.path
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, tb):
+        self.close()
+
+
+class MemoryDxfSink(DxfSink):
+    def __init__(self):
+        super().__init__()
+        self.stream = io.StringIO()
+        self.encoding = 'utf8'
+        self._spillPath = None
+
+    def _write(self, doc):
+        self.stream = io.StringIO()
+        self.encoding = doc.output_encoding
+        doc.write(self.stream)
+        self.bytesWritten = len(self.stream.getvalue().encode(self.encoding, errors='replace'))
+
+    def _writeWith(self, writer):
+        self.stream = io.StringIO()
+        self.encoding = 'utf8'
+        writer(self.stream)
+        self.bytesWritten = len(self.stream.getvalue().encode(self.encoding, errors='replace'))
+
+    def getvalue(self):
+        return self.stream.getvalue()
+
+    # The importer needs a file, so the stream is spilled to a temp file the
+    # first time a path is requested.  The spill is counted as write time.
+    def importPath(self):
+        if not self._spillPath:
+            start = time.perf_counter()
+            self._spillPath = _makeTempPath()
+            with open(self._spillPath, 'w', encoding=self.encoding, errors='replace', newline='') as f:
+                f.write(self.stream.getvalue())
+            self.writeSeconds += time.perf_counter() - start
+        return self._spillPath
+
+    def close(self):
+        if self._spillPath:
+            try:
+                os.remove(self._spillPath)
+            except OSError:
+                pass
+            self._spillPath = None
+
+
+class TempFileDxfSink(DxfSink):
+    def __init__(self):
+        super().__init__(_makeTempPath())
+
+    def _write(self, doc):
+        doc.saveas(self.path)
+        self.bytesWritten = os.path.getsize(self.path)
+
+    def _writeWith(self, writer):
+        with open(self.path, 'w', encoding='utf8', newline='') as f:
+            writer(f)
+        self.bytesWritten = os.path.getsize(self.path)
+
+    def close(self):
+        if self.path:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+            self.path = None
+
+
+# Writes to a caller-chosen file that is left in place.
+class FileDxfSink(DxfSink):
+    def __init__(self, path):
+        super().__init__(path)
+
+    def _write(self, doc):
+        doc.saveas(self.path)
+        self.bytesWritten = os.path.getsize(self.path)
+
+    def _writeWith(self, writer):
+        with open(self.path, 'w', encoding='utf8', newline='') as f:
+            writer(f)
+        self.bytesWritten = os.path.getsize(self.path)
+
+
+class LegacyDxfSink(FileDxfSink):
+    def __init__(self, path=_legacyPath):
+        super().__init__(path)
+
+
+_sinkTypes = {
+    'memory': MemoryDxfSink,
+    'tempfile': TempFileDxfSink,
+    'legacy': LegacyDxfSink,
+}
+
+
+def createDxfSink(sinkType):
+    try:
+        return _sinkTypes[sinkType]()
+    except KeyError:
+        raise ValueError('Unknown DXF sink type: ' + str(sinkType))
@@ -0,0 +1,54 @@
+# Memoizes unit expression evaluation for the command dialogs.
+#
+# The inputChanged and validateInputs handlers evaluate the same few input
+# expressions on every event, and each evaluation is two API round trips
+# (isValidExpression, then evaluateExpression).  Results are cached by
+# (expression, unit type, revision).  The revision changes whenever
+# invalidate() is called: the scripts call it when their command is created,
+# because user parameters cannot be edited while a command dialog is open, and
+# code that changes parameters itself must call it too.
+
+from collections import OrderedDict
+
+
+class ExpressionCache:
+    def __init__(self, maxEntries=256):
+        self.maxEntries = maxEntries
+        self.revision = 0
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()
+
+    def invalidate(self):
+        self.revision += 1
+        self._results.clear()
+
+    # Returns (True, value) for a valid expression and (False, 0) otherwise,
+    # like getCommandInputValue.
+    def evaluate(self, unitsManager, expression, unitType):
+        key = (expression, unitType, self.revision)
+        result = self._results.get(key)
+        if result is not None:
+            self.hits += 1
+            self._results.move_to_end(key)
+            return result
+
+        self.misses += 1
+        if unitsManager.isValidExpression(expression, unitType):
+            result = (True, unitsManager.evaluateExpression(expression, unitType))
+        else:
+            result = (False, 0)
+        self._results[key] = result
+        if len(self._results) > self.maxEntries:
+            self._results.popitem(last=False)
+        return result
+
+
+_cache = None
+
+
+def getExpressionCache():
+    global _cache
+    if _cache is None:
+        _cache = ExpressionCache()
+    return _cache
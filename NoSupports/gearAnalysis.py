@@ -0,0 +1,120 @@
+# Checks of a gear's tooth geometry that are cheap enough for the dialog's
+# validateInputs event, so inputs that would fail in drawGear, or build a gear
+# that cannot run, are caught before any CAD work.
+#
+# The tooth is looked at as drawGear draws it: involute flanks from the base
+# circle (or the root circle, if that is larger) to the outside circle, with
+# radial lines down to the root below the base circle.  The flanks are sampled
+# in one NumPy pass for the tooth thickness at every radius, and the root
+# fillets are checked on a GearProfile.  Meshing is checked against a mating
+# gear of the same pitch and pressure angle at the standard center distance.
+# Nothing here touches adsk.
+
+import math
+from functools import lru_cache
+
+import numpy as np
+
+from gearProfile import GearProfile
+from involuteKernel import involutePoints
+
+# Radii at which the tooth thickness is sampled.
+_thicknessSamples = 64
+
+
+class GearIssue:
+    def __init__(self, message, isError, limit=None):
+        self.message = message
+        # Errors stop the gear from being built; anything else is a warning.
+        self.isError = isError
+        # A length the message ends with, for the caller to format in its
+        # units, or None.
+        self.limit = limit
+
+
+# Half the angle a tooth spans at each radius, measured from the points the
+# first flank passes through there after it is rotated into place.
+def _halfToothAngles(spec, radii):
+    points = involutePoints(spec.baseCircleDia / 2.0, radii)
+    return -(np.arctan2(points[:, 1], points[:, 0]) + spec.rotateAngle)
+
+
+# The issues with a spec's tooth geometry and, with mateTeeth given, with its
+# mesh with a mating gear of that many teeth.  Errors come first.
+@lru_cache(maxsize=32)
+def analyzeGear(spec, mateTeeth=None):
+    issues = _toothIssues(spec)
+    if mateTeeth:
+        mateSpec = spec.replace(numTeeth=mateTeeth, rootFilletRad=0.0, holeDiam=0.0)
+        issues += _meshIssues(spec, mateSpec)
+    return tuple(sorted(issues, key=lambda issue: not issue.isError))
+
+
+def _toothIssues(spec):
+    issues = []
+    baseRadius = spec.baseCircleDia / 2.0
+    rootRadius = spec.rootDia / 2.0
+    outsideRadius = spec.outsideDia / 2.0
+    toothPitch = 2.0 * math.pi / spec.numTeeth
+
+    # The flanks meet where the tooth's thickness reaches zero, and the
+    # neighbouring teeth meet where the space between them does.  Below the
+    # base circle the radial lines keep the thickness the flanks start with.
+    radii = np.linspace(max(baseRadius, rootRadius), outsideRadius, _thicknessSamples)
+    halfAngles = _halfToothAngles(spec, radii)
+    pointed = np.flatnonzero(halfAngles <= 0.0)
+    if pointed.size:
+        issues.append(GearIssue('The teeth come to a point below the outside diameter, at a diameter of ',
+                                True, 2.0 * float(radii[pointed[0]])))
+    if halfAngles[0] >= toothPitch / 2.0:
+        issues.append(GearIssue('The teeth run into each other at the root.  Use more teeth or a smaller '
+                                'pressure angle.', True))
+    elif spec.rootFilletRad > 0.0:
+        # The root arc between two teeth runs from the end of one tooth's
+        # fillet to the start of the next one's, so it must turn forwards.
+        try:
+            rootArc = GearProfile(spec).rootArcs[0]
+            startAngle = math.atan2(rootArc[0, 1], rootArc[0, 0])
+            endAngle = math.atan2(rootArc[2, 1], rootArc[2, 0])
+            span = (endAngle - startAngle) % (2.0 * math.pi)
+            overlap = span <= 0.0 or span >= toothPitch
+        except ValueError:
+            overlap = True
+        if overlap:
+            issues.append(GearIssue('The root fillets of neighbouring teeth overlap.  The root fillet radius '
+                                    'must be smaller.', True))
+
+    # A rack with the gear's addendum undercuts a gear of fewer than
+    # 2 / sin(pressureAngle)^2 teeth.  drawGear does not draw the undercut,
+    # but most gears meshing with this one would cut into it.
+    minTeeth = math.ceil(2.0 / math.sin(spec.pressureAngle) ** 2)
+    if spec.numTeeth < minTeeth:
+        issues.append(GearIssue('Gears with fewer than {} teeth at this pressure angle are undercut when '
+                                'cut, and interfere with most mating gears.'.format(minTeeth), False))
+    return issues
+
+
+# Involute interference and contact ratio for two gears of the same pitch and
+# pressure angle.  The line of action touches each base circle at the
+# interference point of that gear; a mating tip that reaches past it meets the
+# flank below the base circle, where there is no involute.
+def _meshIssues(spec, mateSpec):
+    issues = []
+    centerDistance = (spec.pitchDia + mateSpec.pitchDia) / 2.0
+    lineOfAction = centerDistance * math.sin(spec.pressureAngle)
+    baseRadii = (spec.baseCircleDia / 2.0, mateSpec.baseCircleDia / 2.0)
+    outsideRadii = (spec.outsideDia / 2.0, mateSpec.outsideDia / 2.0)
+
+    if outsideRadii[1] > math.hypot(baseRadii[1], lineOfAction):
+        issues.append(GearIssue("The mating gear's teeth cut into this gear's flanks below its base circle.", True))
+    if outsideRadii[0] > math.hypot(baseRadii[0], lineOfAction):
+        issues.append(GearIssue("This gear's teeth cut into the mating gear's flanks below its base circle.", True))
+
+    # Contact must pass from one pair of teeth to the next before it ends.
+    approach = sum(math.sqrt(ro ** 2 - rb ** 2) for ro, rb in zip(outsideRadii, baseRadii))
+    basePitch = math.pi * math.cos(spec.pressureAngle) / spec.diametralPitchCm
+    contactRatio = (approach - lineOfAction) / basePitch
+    if contactRatio < 1.0:
+        issues.append(GearIssue('The gears are in contact for less than one tooth at a time (contact ratio '
+                                '{:.2f}).'.format(contactRatio), True))
+    return issues
@@ -0,0 +1,132 @@
+# Headless batch export of spur gear outlines for sheet cutting.
+#
+# Reads a CSV or JSON list of gears and writes a DXF and/or SVG outline of
+# each, using the same gear math as the Spur Gear script but without adsk.
+# Gears are spread over a process pool.
+#
+#   python gearBatch.py gears.csv --out-dir out --format both --workers 8
+#
+# Each gear needs numTeeth and may give module (mm) or diametralPitch (per
+# inch), pressureAngle (degrees), backlash, rootFilletRad and holeDiam (mm), a
+# name and a format; the command line gives the values a gear leaves out.
+# Gears that would not build, or whose teeth interfere with themselves, are
+# reported before anything is written.  Output files are named
+# <name or gearNNNN>_<teeth>t_<hash>.<ext>, where the hash covers the inputs,
+# so the same gear always produces the same file name and contents.
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)))
+
+from batchUtils import formatThroughput, loadParameterSets, runBatch, safeName
+from dxfSink import FileDxfSink
+from gearAnalysis import analyzeGear
+from gearExport import GearOutline, exportFormats, streamGearDxf, svgGearDocument
+from gearSpec import GearSpec, gearSpecFromParameters
+
+# Bump this whenever the exported outline changes, so file names change too.
+_exportVersion = 1
+
+
+# The first reason a spec cannot be cut, as the dialog would report it, or
+# None.
+def _gearProblem(spec):
+    problem = spec.problem()
+    if not problem:
+        errors = [issue for issue in analyzeGear(spec) if issue.isError]
+        if not errors:
+            return None
+        problem = (errors[0].message, errors[0].limit)
+    message, limit = problem
+    if limit is not None:
+        message += '{:.3f} mm'.format(limit * 10.0)
+    return message
+
+
+# A parameter set read into a GearSpec and checked, with the formats to write.
+class ExportGear:
+    def __init__(self, index, params, defaults, outputFormat, tolerance):
+        self.index = index
+        self.name = params.get('name') or 'gear{:04d}'.format(index)
+        try:
+            self.spec = gearSpecFromParameters(params, defaults)
+        except (KeyError, TypeError, ValueError) as error:
+            raise ValueError('Gear {}: {}'.format(self.name, error))
+        outputFormat = params.get('format') or outputFormat
+        if outputFormat == 'both':
+            self.formats = exportFormats
+        elif outputFormat in exportFormats:
+            self.formats = [outputFormat]
+        else:
+            raise ValueError('Gear {}: unknown format {}'.format(self.name, outputFormat))
+        self.tolerance = tolerance
+
+        problem = _gearProblem(self.spec)
+        if problem:
+            raise ValueError('Gear {}: {}'.format(self.name, problem))
+
+    def fileName(self, outputFormat):
+        inputs = {'version': _exportVersion, 'spec': self.spec.roundedKey(), 'tolerance': self.tolerance}
+        key = hashlib.sha256(json.dumps(inputs, sort_keys=True).encode('utf8')).hexdigest()
+        return '{}_{}t_{}.{}'.format(safeName(self.name), self.spec.numTeeth, key[:12], outputFormat)
+
+
+def writeGear(job):
+    gear, outDir = job
+    start = time.perf_counter()
+    outline = GearOutline(gear.spec, gear.tolerance)
+    files = []
+    for outputFormat in gear.formats:
+        path = os.path.join(outDir, gear.fileName(outputFormat))
+        if outputFormat == 'dxf':
+            sink = FileDxfSink(path)
+            sink.writeWith(lambda stream: streamGearDxf(outline, stream))
+            numBytes = sink.bytesWritten
+        else:
+            with open(path, 'w', encoding='utf8', newline='') as f:
+                f.write(svgGearDocument(outline))
+            numBytes = os.path.getsize(path)
+        files.append((path, numBytes))
+    return files, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Export spur gear outlines as DXF or SVG without Fusion.')
+    parser.add_argument('params', help='CSV or JSON file with one parameter set per gear')
+    parser.add_argument('--out-dir', default='.', help='directory for the output files')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: one per CPU)')
+    parser.add_argument('--format', choices=exportFormats + ['both'], default='dxf',
+                        help='output format for gears that do not name one')
+    parser.add_argument('--module', type=float, default=1.0, help='module (mm) for gears that give no pitch')
+    parser.add_argument('--pressure-angle', type=float, default=20.0, help='pressure angle (degrees)')
+    parser.add_argument('--backlash', type=float, default=0.0, help='backlash (mm)')
+    parser.add_argument('--root-fillet', type=float, default=0.0, help='root fillet radius (mm)')
+    parser.add_argument('--hole', type=float, default=0.0, help='center hole diameter (mm)')
+    parser.add_argument('--tolerance', type=float, default=0.005,
+                        help='largest distance (mm) of the flank polylines from the involute')
+    args = parser.parse_args(argv)
+
+    # Every gear gives its own tooth count.
+    defaults = GearSpec(25.4 / args.module, 0, math.radians(args.pressure_angle), args.backlash / 10.0,
+                        0.0, args.root_fillet / 10.0, args.hole / 10.0)
+    paramSets = loadParameterSets(args.params)
+    gears = [ExportGear(i + 1, params, defaults, args.format, args.tolerance / 10.0)
+             for i, params in enumerate(paramSets)]
+    os.makedirs(args.out_dir, exist_ok=True)
+
+    results, seconds = runBatch(writeGear, [(gear, args.out_dir) for gear in gears], args.workers)
+    for files, gearSeconds in results:
+        for path, numBytes in files:
+            print('{}  {} bytes  {:.1f} ms'.format(path, numBytes, gearSeconds * 1000.0))
+    print(formatThroughput(len(results), seconds, 'gears'))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+# Flat outlines of spur gears for laser, waterjet and other sheet cutting, as
+# DXF or SVG, without Fusion.
+#
+# The outline is the one the full-profile build draws (see gearProfile.py):
+# the flanks are sampled within a chord tolerance, and the root fillets, tips
+# and roots are exact arcs, written as polyline bulges in DXF and as arc
+# commands in SVG.  Coordinates are in millimetres with the gear centered on
+# the origin.  The output depends only on the inputs: the DXF is R12 with a
+# header that only declares the units, so there are no timestamps or handles
+# to change between runs, and numbers are written at a fixed precision.
+
+import math
+
+import numpy as np
+from ezdxf.addons import r12writer
+
+from dxfSink import writeDxfUnitsHeader
+from gearProfile import GearProfile
+from involuteKernel import adaptiveInvoluteRadii, involutePoints
+
+exportFormats = ['dxf', 'svg']
+
+# Decimal places of the millimetre values written.
+_places = 6
+
+
+# A gear's outline in millimetres: polyline vertices (n, 2) with the bulge of
+# the segment that starts at each one, and the center hole's radius, or None.
+# tolerance (cm) bounds the chords along the flanks, as _involuteTolerance does
+# for the sketch.
+class GearOutline:
+    def __init__(self, spec, tolerance):
+        profile = GearProfile(spec)
+        radii = adaptiveInvoluteRadii(profile.baseRadius, profile.outsideRadius, tolerance,
+                                      profile.flankStartRadius)
+        points, bulges = profile.outline(involutePoints(profile.baseRadius, radii))
+        self.points = np.round(points * 10.0, _places)
+        self.bulges = np.round(bulges, _places + 3)
+        self.outsideRadius = profile.outsideRadius * 10.0
+        self.holeRadius = spec.holeDiam * 5.0 if spec.holeDiam > 0.0 else None
+
+
+# Writes the outline to a text stream as one closed R12 POLYLINE, plus a
+# CIRCLE for the hole, in a drawing declared as metric millimetres.
+def streamGearDxf(outline, stream):
+    writeDxfUnitsHeader(stream, 4, 1)
+    with r12writer(stream) as dxf:
+        vertices = np.column_stack((outline.points, outline.bulges)).tolist()
+        dxf.add_polyline_2d(vertices, format='xyb', closed=True)
+        if outline.holeRadius:
+            dxf.add_circle((0.0, 0.0), outline.holeRadius)
+
+
+def _number(value):
+    text = '{:.{}f}'.format(value, _places).rstrip('0').rstrip('.')
+    return '0' if text == '-0' else text
+
+
+# The outline as an SVG document sized in millimetres.  SVG's y axis points
+# down, so y is negated, which also turns counterclockwise arcs into ones
+# that sweep towards negative angles.
+def svgGearDocument(outline):
+    points = outline.points * (1.0, -1.0)
+    bulges = outline.bulges
+    nextPoints = np.roll(points, -1, axis=0)
+    chords = np.hypot(*(nextPoints - points).T)
+
+    commands = ['M {} {}'.format(_number(points[0, 0]), _number(points[0, 1]))]
+    for (x, y), bulge, chord in zip(nextPoints.tolist(), bulges.tolist(), chords.tolist()):
+        if bulge == 0.0:
+            commands.append('L {} {}'.format(_number(x), _number(y)))
+        else:
+            radius = chord * (1.0 + bulge * bulge) / (4.0 * abs(bulge))
+            commands.append('A {0} {0} 0 {1} {2} {3} {4}'.format(
+                _number(radius), int(abs(bulge) > 1.0), int(bulge < 0.0), _number(x), _number(y)))
+    commands.append('Z')
+
+    size = _number(2.0 * outline.outsideRadius)
+    corner = _number(-outline.outsideRadius)
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             '<svg xmlns="http://www.w3.org/2000/svg" width="{0}mm" height="{0}mm" viewBox="{1} {1} {0} {0}">'.format(
+                 size, corner),
+             '<g fill="none" stroke="black" stroke-width="0.1">',
+             '<path d="{}"/>'.format(' '.join(commands))]
+    if outline.holeRadius:
+        lines.append('<circle cx="0" cy="0" r="{}"/>'.format(_number(outline.holeRadius)))
+    lines += ['</g>', '</svg>', '']
+    return '\n'.join(lines)
@@ -0,0 +1,164 @@
+# The closed outline of a whole spur gear.
+#
+# drawGear normally builds one tooth and patterns it around the root cylinder.
+# GearProfile lays out the pieces of one tooth -- the root fillets, the radial
+# lines some gears need below the base circle, the tip arc and the root arc to
+# the next tooth -- and rotates them to every tooth in one NumPy pass, so the
+# whole gear can be drawn in one sketch and extruded once.  Nothing here
+# touches adsk.
+#
+# Arcs are (start, mid, end) points.  Every array has the teeth on its first
+# axis and (x, y) on its last.  Each side of a tooth runs from the root up: the
+# fillet from the root circle, the line, then the flank to the tip, as in the
+# tooth sketch.  The tip arc runs from the first flank to the second and the
+# root arc from the second side of a tooth to the first side of the next, so
+# the first side of each tooth is the clockwise one.
+
+import math
+
+import numpy as np
+
+from involuteKernel import involutePoints, placeFlanks
+
+
+# points rotated about the origin by each angle, with a new leading axis.
+def _rotations(points, angles):
+    cos = np.cos(angles)
+    sin = np.sin(angles)
+    matrices = np.stack((np.stack((cos, -sin), -1), np.stack((sin, cos), -1)), -2)
+    return np.einsum('nij,...j->n...i', matrices, points)
+
+
+# The midpoint of the short arc about center from start to end.
+def _arcMid(center, start, end):
+    direction = (start - center) + (end - center)
+    radius = math.hypot(*(start - center))
+    return center + direction * (radius / math.hypot(*direction))
+
+
+# The DXF bulge of each (start, mid, end) arc: tan(sweep / 4), positive
+# counterclockwise.  The mid point's offset from the chord is the sagitta.
+def arcBulges(arcs):
+    chords = arcs[:, 2] - arcs[:, 0]
+    toMid = arcs[:, 1] - arcs[:, 0]
+    cross = chords[:, 0] * toMid[:, 1] - chords[:, 1] * toMid[:, 0]
+    return -2.0 * cross / np.einsum('ij,ij->i', chords, chords)
+
+
+class GearProfile:
+    def __init__(self, spec):
+        self.spec = spec
+        self.numTeeth = spec.numTeeth
+        self.baseRadius = spec.baseCircleDia / 2.0
+        self.rootRadius = spec.rootDia / 2.0
+        self.outsideRadius = spec.outsideDia / 2.0
+        self.toothAngles = (2.0 * math.pi / self.numTeeth) * np.arange(self.numTeeth)
+
+        baseRadius = self.baseRadius
+        rootRadius = self.rootRadius
+        filletRadius = spec.rootFilletRad
+
+        # Work on the first flank before it is rotated into place: the involute
+        # leaves the base circle along the x axis and the tooth space is on
+        # its clockwise side.  A fillet tangent to the root circle has its
+        # center filletRadius outside it.  Where that center is also
+        # filletRadius from the involute the fillet meets the involute itself;
+        # otherwise the involute starts inside the fillet's reach and a radial
+        # line runs from the fillet up to the base circle.
+        centerRadius = rootRadius + filletRadius
+        reach = math.sqrt(max(centerRadius ** 2 - baseRadius ** 2, 0.0)) - filletRadius
+        if centerRadius > baseRadius and reach >= 0.0:
+            t = reach / baseRadius
+            flankStart = baseRadius * np.array([math.cos(t) + t * math.sin(t), math.sin(t) - t * math.cos(t)])
+            center = flankStart + filletRadius * np.array([math.sin(t), -math.cos(t)])
+            lineStart = None
+        else:
+            flankStart = np.array([baseRadius, 0.0])
+            delta = math.asin(filletRadius / centerRadius)
+            center = centerRadius * np.array([math.cos(delta), -math.sin(delta)])
+            lineStart = np.array([math.sqrt(centerRadius ** 2 - filletRadius ** 2), 0.0])
+        self.flankStartRadius = math.hypot(*flankStart)
+
+        rootPoint = center * (rootRadius / math.hypot(*center))
+        filletEnd = flankStart if lineStart is None else lineStart
+        if filletRadius > 0.0:
+            fillet = np.array([rootPoint, _arcMid(center, rootPoint, filletEnd), filletEnd])
+        else:
+            fillet = None
+        if lineStart is not None:
+            line = np.array([filletEnd, flankStart])
+        else:
+            line = None
+
+        # Rotate the first side into place, mirror it for the second and copy
+        # both to every tooth.
+        rotateAngle = spec.rotateAngle
+        if fillet is not None:
+            fillet1, fillet2 = placeFlanks(fillet, rotateAngle)
+            self.fillets1 = _rotations(fillet1, self.toothAngles)
+            self.fillets2 = _rotations(fillet2, self.toothAngles)
+        else:
+            self.fillets1 = self.fillets2 = None
+        if line is not None:
+            line1, line2 = placeFlanks(line, rotateAngle)
+            self.lines1 = _rotations(line1, self.toothAngles)
+            self.lines2 = _rotations(line2, self.toothAngles)
+        else:
+            self.lines1 = self.lines2 = None
+
+        tip1, tip2 = placeFlanks(involutePoints(baseRadius, [self.outsideRadius]), rotateAngle)
+        tip = np.array([tip1[0], (self.outsideRadius, 0.0), tip2[0]])
+        self.tipArcs = _rotations(tip, self.toothAngles)
+
+        # The root arc from the second side of each tooth to the first side of
+        # the next.
+        root1, root2 = placeFlanks(rootPoint[None, :], rotateAngle)
+        rootAngle1 = math.atan2(root1[0, 1], root1[0, 0])
+        rootAngle2 = math.atan2(root2[0, 1], root2[0, 0])
+        toothPitch = 2.0 * math.pi / self.numTeeth
+        angles = np.array([rootAngle2, (rootAngle2 + rootAngle1 + toothPitch) / 2.0, rootAngle1 + toothPitch])
+        root = self.rootRadius * np.column_stack((np.cos(angles), np.sin(angles)))
+        self.rootArcs = _rotations(root, self.toothAngles)
+
+    # Both flanks of every tooth from the points of one flank as it leaves the
+    # base circle (samples or spline control points, starting at
+    # flankStartRadius), each of shape (teeth, points, 2) and running from the
+    # root to the tip.
+    def teeth(self, flankPoints):
+        flank1, flank2 = placeFlanks(flankPoints, self.spec.rotateAngle)
+        return _rotations(flank1, self.toothAngles), _rotations(flank2, self.toothAngles)
+
+    # The closed outline as polyline vertices and the bulge of the segment
+    # that starts at each one (0 for a straight segment), from points sampled
+    # along one flank as for teeth.  Runs counterclockwise around the gear,
+    # tooth by tooth, starting at the root of the first side of the first
+    # tooth.  Returns arrays of shape (n, 2) and (n,).
+    def outline(self, flankPoints):
+        flanks1, flanks2 = self.teeth(flankPoints)
+        numTeeth = self.numTeeth
+        zeros = np.zeros((numTeeth, 1))
+        rootBulges = arcBulges(self.rootArcs)[:, None]
+
+        # Each piece is (vertices, bulges) for every tooth, in outline order.
+        # Going back down the second side the arcs are reversed, which
+        # negates their bulges.
+        pieces = []
+        if self.fillets1 is not None:
+            pieces.append((self.fillets1[:, :1], arcBulges(self.fillets1)[:, None]))
+        if self.lines1 is not None:
+            pieces.append((self.lines1[:, :1], zeros))
+        pieces.append((flanks1[:, :-1], np.zeros((numTeeth, flanks1.shape[1] - 1))))
+        pieces.append((flanks1[:, -1:], arcBulges(self.tipArcs)[:, None]))
+        pieces.append((flanks2[:, :0:-1], np.zeros((numTeeth, flanks2.shape[1] - 1))))
+        downBulges = rootBulges if self.fillets2 is None else -arcBulges(self.fillets2)[:, None]
+        if self.lines2 is not None:
+            pieces.append((flanks2[:, :1], zeros))
+            pieces.append((self.lines2[:, :1], downBulges))
+        else:
+            pieces.append((flanks2[:, :1], downBulges))
+        if self.fillets2 is not None:
+            pieces.append((self.fillets2[:, :1], rootBulges))
+
+        points = np.concatenate([vertices for vertices, bulges in pieces], axis=1)
+        bulges = np.concatenate([bulges for vertices, bulges in pieces], axis=1)
+        return points.reshape(-1, 2), bulges.reshape(-1)
@@ -0,0 +1,203 @@
+# The inputs of a spur gear and the dimensions derived from them.
+#
+# The dialog's validation, its pitch diameter readout and drawGear all work
+# from a GearSpec, so the gear math lives in one place and they always agree.
+# A GearSpec cannot be changed once built; each derived dimension is computed
+# the first time it is asked for and then kept.  Lengths are in cm and angles
+# in radians, except diametralPitch which, as in the dialog, is per inch.
+# A spec round-trips through the SpurGear/Values attribute drawGear leaves on
+# each gear component.
+
+import ast
+import math
+from functools import cached_property
+
+
+# The point (x, y) on the involute of the base circle that lies
+# distFromCenterToInvolutePoint from the center.
+def involuteXY(baseCircleRadius, distFromCenterToInvolutePoint):
+    # The other side of the right-angle triangle defined by the base circle and
+    # the current distance radius: the length of the involute chord as it
+    # comes off of the base circle.
+    triangleSide = math.sqrt(distFromCenterToInvolutePoint ** 2 - baseCircleRadius ** 2)
+
+    # The angle of the involute, and the angle where the involute point is.
+    alpha = triangleSide / baseCircleRadius
+    theta = alpha - math.acos(baseCircleRadius / distFromCenterToInvolutePoint)
+
+    return (distFromCenterToInvolutePoint * math.cos(theta),
+            distFromCenterToInvolutePoint * math.sin(theta))
+
+
+class GearSpec:
+    _fields = ('diametralPitch', 'numTeeth', 'pressureAngle', 'backlash', 'thickness', 'rootFilletRad', 'holeDiam')
+
+    def __init__(self, diametralPitch, numTeeth, pressureAngle, backlash=0.0, thickness=0.0,
+                 rootFilletRad=0.0, holeDiam=0.0):
+        values = (float(diametralPitch), int(numTeeth), float(pressureAngle), float(backlash),
+                  float(thickness), float(rootFilletRad), float(holeDiam))
+        for name, value in zip(self._fields, values):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('GearSpec is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('GearSpec is immutable')
+
+    def key(self):
+        return tuple(getattr(self, name) for name in self._fields)
+
+    def __eq__(self, other):
+        return isinstance(other, GearSpec) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __repr__(self):
+        return 'GearSpec({})'.format(', '.join('{}={!r}'.format(n, getattr(self, n)) for n in self._fields))
+
+    # key() with the lengths and angles rounded, for finding a gear built from
+    # the same inputs: values that went through unit conversions can differ in
+    # their last bits.
+    def roundedKey(self, places=9):
+        return tuple(round(value, places) if isinstance(value, float) else value for value in self.key())
+
+    # The names of the inputs that differ between this spec and other,
+    # compared as roundedKey does.
+    def changes(self, other):
+        return {name for name, mine, theirs in zip(self._fields, self.roundedKey(), other.roundedKey())
+                if mine != theirs}
+
+    # The text drawGear stores in each gear component's SpurGear/Values
+    # attribute.  The keys and their order are the ones it has always written.
+    def attributeValue(self):
+        gearValues = {}
+        gearValues['diametralPitch'] = str(self.diametralPitch)
+        gearValues['numTeeth'] = str(self.numTeeth)
+        gearValues['thickness'] = str(self.thickness)
+        gearValues['rootFilletRad'] = str(self.rootFilletRad)
+        gearValues['pressureAngle'] = str(self.pressureAngle)
+        gearValues['holeDiam'] = str(self.holeDiam)
+        gearValues['backlash'] = str(self.backlash)
+        return str(gearValues)
+
+    # A copy with some inputs changed.
+    def replace(self, **changes):
+        values = {name: getattr(self, name) for name in self._fields}
+        values.update(changes)
+        return GearSpec(**values)
+
+    # The diametral pitch is specified in inches but everything here is in
+    # centimeters.
+    @cached_property
+    def diametralPitchCm(self):
+        return self.diametralPitch / 2.54
+
+    @cached_property
+    def pitchDia(self):
+        return self.numTeeth / self.diametralPitchCm
+
+    @cached_property
+    def dedendum(self):
+        diametralPitch = self.diametralPitchCm
+        if (diametralPitch < (20 *(math.pi/180))-0.000001):
+            return 1.157 / diametralPitch
+        circularPitch = math.pi / diametralPitch
+        if circularPitch >= 20:
+            return 1.25 / diametralPitch
+        return (1.2 / diametralPitch) + (.002 * 2.54)
+
+    @cached_property
+    def rootDia(self):
+        return self.pitchDia - (2 * self.dedendum)
+
+    @cached_property
+    def baseCircleDia(self):
+        return self.pitchDia * math.cos(self.pressureAngle)
+
+    @cached_property
+    def outsideDia(self):
+        return (self.numTeeth + 2) / self.diametralPitchCm
+
+    # Tooth thickness measured along the base circle.
+    @cached_property
+    def toothThickness(self):
+        baseCircleCircumference = 2 * math.pi * (self.baseCircleDia / 2)
+        return baseCircleCircumference / (self.numTeeth * 2)
+
+    # The largest center hole and root fillet the gear can take.
+    @cached_property
+    def maxHoleDiam(self):
+        return self.rootDia - 0.01
+
+    @cached_property
+    def maxRootFilletRad(self):
+        return self.toothThickness * .4
+
+    # Angle of the involute point on the pitch circle.
+    @cached_property
+    def pitchPointAngle(self):
+        x, y = involuteXY(self.baseCircleDia / 2.0, self.pitchDia / 2.0)
+        return math.atan(y / x)
+
+    # The angle to rotate the involute by so the middle of the tooth lies on
+    # the x axis, taking the tooth thickness at the pitch circle and the
+    # backlash into account.
+    @cached_property
+    def rotateAngle(self):
+        toothThicknessAngle = (2 * math.pi) / (2 * self.numTeeth)
+        backlashAngle = (self.backlash / (self.pitchDia / 2.0)) * .25
+        return -((toothThicknessAngle/2) + self.pitchPointAngle - backlashAngle)
+
+    # The first problem with the spec as (message, limit), or None if it can
+    # be built.  The limit is the length the message refers to, so callers can
+    # format it in their units.
+    def problem(self):
+        if self.numTeeth < 4:
+            return ('The number of teeth must be 4 or more.', None)
+        if self.holeDiam >= self.maxHoleDiam:
+            return ('The center hole diameter is too large.  It must be less than ', self.maxHoleDiam)
+        if self.rootFilletRad > self.maxRootFilletRad:
+            return ('The root fillet radius is too large.  It must be less than ', self.maxRootFilletRad)
+        return None
+
+
+# The GearSpec stored in a SpurGear/Values attribute, or None if the text is
+# not one.
+def gearSpecFromAttribute(text):
+    try:
+        values = ast.literal_eval(text)
+        return GearSpec(**{name: values[name] for name in GearSpec._fields})
+    except (ValueError, TypeError, SyntaxError, KeyError):
+        return None
+
+
+# A length (cm) from a parameter set, where lengths are given in mm, or
+# default if the set leaves it out or blank.
+def parameterLength(params, name, default):
+    value = params.get(name)
+    if value is None or value == '':
+        return default
+    return float(value) / 10.0
+
+
+# A GearSpec from a parameter set as batchUtils.loadParameterSets reads it:
+# numTeeth, diametralPitch (per inch) or module (mm), pressureAngle (degrees),
+# and backlash, thickness, rootFilletRad and holeDiam (mm).  Values the set
+# leaves out come from the GearSpec defaults.  Raises KeyError, TypeError or
+# ValueError if the set cannot be read.
+def gearSpecFromParameters(params, defaults):
+    diametralPitch = defaults.diametralPitch
+    if params.get('module') not in (None, ''):
+        diametralPitch = 25.4 / float(params['module'])
+    elif params.get('diametralPitch') not in (None, ''):
+        diametralPitch = float(params['diametralPitch'])
+    pressureAngle = defaults.pressureAngle
+    if params.get('pressureAngle') not in (None, ''):
+        pressureAngle = math.radians(float(params['pressureAngle']))
+    return GearSpec(diametralPitch, int(params['numTeeth']), pressureAngle,
+                    parameterLength(params, 'backlash', defaults.backlash),
+                    parameterLength(params, 'thickness', defaults.thickness),
+                    parameterLength(params, 'rootFilletRad', defaults.rootFilletRad),
+                    parameterLength(params, 'holeDiam', defaults.holeDiam))
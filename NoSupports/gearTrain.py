@@ -0,0 +1,85 @@
+# Gear trains: several gears built by one command, each placed so it meshes
+# with its mate.
+#
+# A train is a CSV or JSON list of gears, read with
+# batchUtils.loadParameterSets.  Each gear needs numTeeth and can override any
+# of the dialog's values, as gearSpec.gearSpecFromParameters reads them.  A
+# gear meshes with the gear at index mate, the previous one by default, with
+# its center direction degrees counterclockwise from the mate's center.  With
+# mate set to none it is placed at x, y (mm) instead, e.g. as a second gear on
+# an existing shaft.  The first gear is placed that way too.
+# Nothing here touches adsk.
+
+import math
+
+from gearSpec import gearSpecFromParameters, parameterLength
+
+
+class TrainGear:
+    def __init__(self, name, spec, mate, direction, center):
+        self.name = name
+        self.spec = spec
+        # Index of the gear this one meshes with, or None.
+        self.mate = mate
+        self.direction = direction
+        # Where the gear's center goes (cm) and how far it is turned about its
+        # axis (radians); layoutGearTrain sets both for meshing gears.
+        self.center = center
+        self.rotation = 0.0
+
+
+# The gears described by a list of parameter sets, laid out.  defaults is the
+# GearSpec whose values a gear takes where its parameter set has none.
+def gearTrainFromParameterSets(paramSets, defaults):
+    gears = []
+    for index, params in enumerate(paramSets):
+        name = params.get('name') or 'gear{}'.format(index + 1)
+        try:
+            spec = gearSpecFromParameters(params, defaults)
+
+            mate = params.get('mate')
+            if mate in (None, ''):
+                mate = index - 1 if index > 0 else None
+            elif isinstance(mate, str) and mate.strip().lower() == 'none':
+                mate = None
+            else:
+                mate = int(mate)
+            direction = math.radians(float(params.get('direction') or 0.0))
+            center = (parameterLength(params, 'x', 0.0), parameterLength(params, 'y', 0.0))
+        except (KeyError, TypeError, ValueError) as error:
+            raise ValueError('{}: {}'.format(name, error))
+
+        problem = spec.problem()
+        if problem:
+            raise ValueError('{}: {}'.format(name, problem[0]))
+        if mate is not None and not 0 <= mate < index:
+            raise ValueError('{}: the mate must be one of the gears before it.'.format(name))
+        gears.append(TrainGear(name, spec, mate, direction, center))
+
+    layoutGearTrain(gears)
+    return gears
+
+
+# Places each meshing gear at the standard center distance from its mate,
+# turned so that the teeth of one fall into the spaces of the other.  drawGear
+# centers a tooth on the x axis, so gear teeth sit at rotation + k * pitch,
+# where pitch is 2 pi / numTeeth.  A mate whose tooth is f pitches short of
+# the line of centers needs the gear's tooth space f of its own pitches past
+# the opposite direction.
+def layoutGearTrain(gears):
+    for gear in gears:
+        if gear.mate is None:
+            continue
+        mate = gears[gear.mate]
+        if not (math.isclose(mate.spec.diametralPitch, gear.spec.diametralPitch) and
+                math.isclose(mate.spec.pressureAngle, gear.spec.pressureAngle)):
+            raise ValueError('{}: it must have the same pitch and pressure angle as {} to mesh with it.'.format(
+                gear.name, mate.name))
+
+        distance = (mate.spec.pitchDia + gear.spec.pitchDia) / 2.0
+        gear.center = (mate.center[0] + distance * math.cos(gear.direction),
+                       mate.center[1] + distance * math.sin(gear.direction))
+        matePitch = 2.0 * math.pi / mate.spec.numTeeth
+        pitch = 2.0 * math.pi / gear.spec.numTeeth
+        offset = (gear.direction - mate.rotation) / matePitch
+        gear.rotation = gear.direction + math.pi + pitch * (0.5 + offset)
@@ -0,0 +1,164 @@
+# Batched involute sampling for SpurGear.
+#
+# Computes both flanks of a tooth in one NumPy pass: the involute points, the
+# rotation that centres the tooth on the x axis, and the mirrored second
+# flank.  Nothing here touches adsk, so drawGear only creates API objects for
+# the final points.
+#
+# The number of samples can be fixed, or chosen from a chord-error tolerance:
+# samples are spaced evenly in roll angle t, where the involute's radius of
+# curvature is baseRadius * t, so the sagitta of each chord is at most
+# baseRadius * tMax * dt**2 / 8.  Picking dt from that bound keeps the chords
+# within the tolerance of the true curve; the fitted spline through the same
+# points deviates less than the chords do.
+#
+# For fixed splines, involuteSplineControlPoints gives the control points and
+# knots of a cubic spline whose deviation from the involute is bounded here,
+# so Fusion does not have to fit a spline through samples.
+
+import math
+
+import numpy as np
+
+minInvoluteSamples = 4
+maxInvoluteSamples = 200
+
+
+# The roll angle at which the involute reaches radius r.
+def _rollAngle(baseRadius, r):
+    return math.sqrt(max((r / baseRadius) ** 2 - 1.0, 0.0))
+
+
+# count radii evenly spaced from the base circle to the outside circle, as
+# drawGear has always sampled the involute.  innerRadius starts the flank
+# further out than the base circle.
+def involuteRadii(baseRadius, outsideRadius, count, innerRadius=None):
+    if innerRadius is None:
+        innerRadius = baseRadius
+    involuteSize = outsideRadius - innerRadius
+    return innerRadius + (involuteSize / (count - 1)) * np.arange(count)
+
+
+# Radii for the fewest samples, evenly spaced in roll angle, whose chords stay
+# within tolerance of the involute.
+def adaptiveInvoluteRadii(baseRadius, outsideRadius, tolerance, innerRadius=None):
+    if innerRadius is None:
+        innerRadius = baseRadius
+    tMin = _rollAngle(baseRadius, innerRadius)
+    tMax = _rollAngle(baseRadius, outsideRadius)
+    if tMax <= tMin:
+        return np.array([innerRadius, outsideRadius])
+    dt = math.sqrt(8.0 * tolerance / (baseRadius * tMax))
+    count = int(math.ceil((tMax - tMin) / dt)) + 1
+    count = min(max(count, minInvoluteSamples), maxInvoluteSamples)
+    t = np.linspace(tMin, tMax, count)
+    radii = baseRadius * np.sqrt(1.0 + t * t)
+    radii[0] = innerRadius
+    radii[-1] = outsideRadius
+    return radii
+
+
+# Points (x, y) on the involute of the base circle at each radius, shape (n, 2).
+def involutePoints(baseRadius, radii):
+    radii = np.asarray(radii, dtype=float)
+    triangleSide = np.sqrt(np.maximum(radii * radii - baseRadius * baseRadius, 0.0))
+    alpha = triangleSide / baseRadius
+    theta = alpha - np.arccos(np.minimum(baseRadius / radii, 1.0))
+    return np.column_stack((radii * np.cos(theta), radii * np.sin(theta)))
+
+
+# Both flanks of a tooth centred on the x axis: the involute rotated by
+# rotateAngle and its mirror image about the x axis, each of shape (n, 2).
+def toothFlanks(baseRadius, radii, rotateAngle):
+    return placeFlanks(involutePoints(baseRadius, radii), rotateAngle)
+
+
+# Rotates points of one flank (samples or spline control points) into place
+# and mirrors them for the other flank.
+def placeFlanks(points, rotateAngle):
+    cosAngle = math.cos(rotateAngle)
+    sinAngle = math.sin(rotateAngle)
+    flank1 = np.empty_like(points)
+    flank1[:, 0] = points[:, 0] * cosAngle - points[:, 1] * sinAngle
+    flank1[:, 1] = points[:, 0] * sinAngle + points[:, 1] * cosAngle
+    flank2 = flank1 * (1.0, -1.0)
+    return flank1, flank2
+
+
+# Involute points at roll angles t, shape (n, 2).
+def _involuteAt(baseRadius, t):
+    return baseRadius * np.column_stack((np.cos(t) + t * np.sin(t), np.sin(t) - t * np.cos(t)))
+
+
+# Control points of piecewise cubic Bezier segments over the roll-angle ranges
+# between breaks.  Each segment is the Hermite cubic of its end points and
+# unit tangents, scaled by the segment's arc length, so neighbouring segments
+# share tangents and the curve is G1 everywhere, including at the base
+# circle where the involute's parametric derivative vanishes.
+def _bezierSegments(baseRadius, breaks):
+    ends = _involuteAt(baseRadius, breaks)
+    tangents = np.column_stack((np.cos(breaks), np.sin(breaks)))
+    lengths = baseRadius * (breaks[1:] ** 2 - breaks[:-1] ** 2) / 2.0
+    segments = np.empty((len(breaks) - 1, 4, 2))
+    segments[:, 0] = ends[:-1]
+    segments[:, 1] = ends[:-1] + tangents[:-1] * (lengths / 3.0)[:, None]
+    segments[:, 2] = ends[1:] - tangents[1:] * (lengths / 3.0)[:, None]
+    segments[:, 3] = ends[1:]
+    return segments
+
+
+# An upper bound on how far the Bezier segments stray from the involute
+# between roll angles tMin and tMax.  Each segment is split into
+# samplesPerSegment - 1 equal steps of its parameter.  At the ends of a step
+# the distance to the involute point at the same radius bounds the distance
+# to the curve.  Within a step the segment stays within |B''| / (8 m^2) of
+# the chord between those ends, where m is the number of steps and |B''| is
+# at most six times the largest second difference of the control points.  A
+# point on that chord is within the larger end distance of the chord between
+# the two involute points, and the involute, which has no inflections, is
+# within (s / 2) sin(turn) of that chord for an arc of length s that turns
+# by turn.  The bound is the largest sum of the three over all steps.
+def _bezierDeviation(baseRadius, segments, tMin, tMax, samplesPerSegment=32):
+    u = np.linspace(0.0, 1.0, samplesPerSegment)[:, None]
+    weights = np.hstack(((1 - u) ** 3, 3 * u * (1 - u) ** 2, 3 * u * u * (1 - u), u ** 3))
+    points = np.einsum('sk,nkd->nsd', weights, segments)
+    radii = np.hypot(points[..., 0], points[..., 1])
+    t = np.clip(np.sqrt(np.maximum((radii / baseRadius) ** 2 - 1.0, 0.0)), tMin, tMax)
+    offsets = points - _involuteAt(baseRadius, t.ravel()).reshape(points.shape)
+    distances = np.hypot(offsets[..., 0], offsets[..., 1])
+    endDistances = np.maximum(distances[:, :-1], distances[:, 1:])
+
+    t0 = t[:, :-1]
+    t1 = t[:, 1:]
+    arcLengths = baseRadius * np.abs(t1 * t1 - t0 * t0) / 2.0
+    sagittas = arcLengths / 2.0 * np.sin(np.minimum(np.abs(t1 - t0), math.pi / 2.0))
+
+    secondDifferences = segments[:, :-2] - 2.0 * segments[:, 1:-1] + segments[:, 2:]
+    maxSecondDerivatives = 6.0 * np.max(np.hypot(secondDifferences[..., 0], secondDifferences[..., 1]), axis=1)
+    chordErrors = maxSecondDerivatives / (8.0 * (samplesPerSegment - 1) ** 2)
+    return float(np.max(endDistances + sagittas + chordErrors[:, None]))
+
+
+# A cubic spline within tolerance of the involute from the base circle (or
+# innerRadius) to the outside circle.  Returns (controlPoints, knots,
+# deviation): the control points as an (n, 2) array, a clamped knot vector for
+# a non-rational cubic NURBS made of Bezier segments, and the bound on the
+# deviation actually reached.  Segments are added one at a time until the
+# bound is met.
+def involuteSplineControlPoints(baseRadius, outsideRadius, tolerance, maxSegments=64, innerRadius=None):
+    tMin = 0.0 if innerRadius is None else _rollAngle(baseRadius, innerRadius)
+    tMax = _rollAngle(baseRadius, outsideRadius)
+    numSegments = 1
+    while True:
+        segments = _bezierSegments(baseRadius, np.linspace(tMin, tMax, numSegments + 1))
+        deviation = _bezierDeviation(baseRadius, segments, tMin, tMax)
+        if deviation <= tolerance or numSegments >= maxSegments:
+            break
+        numSegments += 1
+
+    controlPoints = np.vstack((segments[:, :3].reshape(-1, 2), segments[-1, 3]))
+    knots = [0.0] * 4
+    for i in range(1, numSegments):
+        knots += [float(i)] * 3
+    knots += [float(numSegments)] * 4
+    return controlPoints, knots, deviation
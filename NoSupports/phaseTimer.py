@@ -0,0 +1,130 @@
+# Timing spans for the scripts' execute handlers.
+#
+# Code marks its phases with
+#
+#     with span('import'):
+#         ...
+#
+# which does nothing unless a trace has been started with startTrace().  While
+# a trace is running every span records its start and duration, nested spans
+# included, so one run can be summarised as a table (summary()) or written as
+# a Chrome trace (writeChromeTrace(); open it in chrome://tracing or
+# https://ui.perfetto.dev).
+
+import json
+import os
+import threading
+import time
+
+_activeTrace = None
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, tb):
+        return False
+
+
+_nullSpan = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('trace', 'name', 'depth', 'start', 'seconds')
+
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+        self.depth = 0
+        self.start = 0.0
+        self.seconds = 0.0
+
+    def __enter__(self):
+        stack = self.trace.stack
+        self.depth = len(stack)
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, excType, excValue, tb):
+        self.seconds = time.perf_counter() - self.start
+        self.trace.stack.pop()
+        self.trace.spans.append(self)
+        return False
+
+
+class PhaseTrace:
+    def __init__(self, name):
+        self.name = name
+        self.origin = time.perf_counter()
+        self.stack = []
+        self.spans = []
+
+    def span(self, name):
+        return _Span(self, name)
+
+    # The innermost open span, or '' outside of any span.
+    def currentPhase(self):
+        return self.stack[-1].name if self.stack else ''
+
+    def totalSeconds(self):
+        return sum(s.seconds for s in self.spans if s.depth == 0)
+
+    # One row per span name, in the order the spans started, with nested
+    # spans indented under their parents.  Repeated spans are added together.
+    def summary(self):
+        rows = {}
+        for s in sorted(self.spans, key=lambda s: s.start):
+            key = (s.depth, s.name)
+            if key in rows:
+                rows[key][0] += s.seconds
+                rows[key][1] += 1
+            else:
+                rows[key] = [s.seconds, 1]
+        total = self.totalSeconds()
+        lines = ['{} phases'.format(self.name),
+                 '{:<36} {:>10} {:>6} {:>6}'.format('phase', 'ms', '%', 'count')]
+        for (depth, name), (seconds, count) in rows.items():
+            share = 100.0 * seconds / total if total > 0 else 0.0
+            lines.append('{:<36} {:>10.1f} {:>6.1f} {:>6}'.format(
+                '  ' * depth + name, seconds * 1000.0, share, count))
+        lines.append('{:<36} {:>10.1f}'.format('total', total * 1000.0))
+        return lines
+
+    # The spans as Chrome trace-event JSON ("complete" events, microseconds).
+    def chromeTrace(self):
+        pid = os.getpid()
+        tid = threading.get_ident()
+        events = [{'name': s.name, 'cat': self.name, 'ph': 'X', 'pid': pid, 'tid': tid,
+                   'ts': (s.start - self.origin) * 1e6, 'dur': s.seconds * 1e6}
+                  for s in sorted(self.spans, key=lambda s: s.start)]
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def writeChromeTrace(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.chromeTrace(), f)
+
+
+def span(name):
+    if _activeTrace is None:
+        return _nullSpan
+    return _activeTrace.span(name)
+
+
+def activeTrace():
+    return _activeTrace
+
+
+def startTrace(name):
+    global _activeTrace
+    _activeTrace = PhaseTrace(name)
+    return _activeTrace
+
+
+# Stops the running trace and returns it (None if none was running).
+def finishTrace():
+    global _activeTrace
+    trace = _activeTrace
+    _activeTrace = None
+    return trace
@@ -0,0 +1,138 @@
+# Vertex welding and shared-edge removal for polyline geometry.
+#
+# Neighbouring chevrons repeat each other's edge vertices and the importer has
+# to reconcile every duplicate and overlapping segment.  weldPolylines snaps
+# coincident vertices together through a hashed grid, then merges collinear
+# segments that overlap, so each edge reaches the output only once.
+
+import math
+
+# Unit direction vectors are compared at this resolution when grouping
+# segments onto lines.
+_directionQuantum = 1e-9
+
+
+class WeldResult:
+    def __init__(self, segments, vertexCount, uniqueVertexCount, segmentsIn):
+        # Segments as ((x0, y0), (x1, y1)) pairs.
+        self.segments = segments
+        self.verticesWelded = vertexCount - uniqueVertexCount
+        self.segmentsIn = segmentsIn
+
+    @property
+    def segmentsOut(self):
+        return len(self.segments)
+
+    @property
+    def removed(self):
+        return self.segmentsIn - self.segmentsOut
+
+    def summary(self):
+        return 'Welded {} vertices, removed {} of {} segments'.format(
+            self.verticesWelded, self.removed, self.segmentsIn)
+
+
+# Snaps points that lie within tolerance of one another onto the first one
+# seen.  Points are hashed into square cells the size of the tolerance, so a
+# lookup only has to look at the 3x3 block of cells around the point.
+class VertexGrid:
+    def __init__(self, tolerance):
+        self.tolerance = tolerance
+        self.cells = {}
+        self.vertices = []
+        self.lookups = 0
+
+    def weld(self, x, y):
+        self.lookups += 1
+        tol = self.tolerance
+        cx = math.floor(x / tol)
+        cy = math.floor(y / tol)
+        for i in (cx - 1, cx, cx + 1):
+            for j in (cy - 1, cy, cy + 1):
+                for index in self.cells.get((i, j), ()):
+                    vx, vy = self.vertices[index]
+                    if abs(vx - x) <= tol and abs(vy - y) <= tol:
+                        return index
+        index = len(self.vertices)
+        self.vertices.append((x, y))
+        self.cells.setdefault((cx, cy), []).append(index)
+        return index
+
+
+# The (ux, uy, edges) group for the line with direction key (kx, ky) and the
+# given offset in tolerance steps.  Offsets that differ by less than a step
+# can still round to either side of a step boundary, so a line one step away
+# on the side of the boundary the offset is nearer is the same line.
+def _lineGroup(lines, kx, ky, offset, ux, uy):
+    step = round(offset)
+    group = lines.get((kx, ky, step))
+    if group is None:
+        group = lines.get((kx, ky, step + 1 if offset > step else step - 1))
+        if group is None:
+            group = lines[(kx, ky, step)] = (ux, uy, [])
+    return group
+
+
+# Welds the vertices of the given polylines and merges collinear segments
+# that overlap by more than the tolerance.  Segments that only touch end to
+# end are left alone.  Returns a WeldResult with the surviving segments.
+def weldPolylines(polylines, tolerance=1e-6):
+    grid = VertexGrid(tolerance)
+
+    # Explode the polylines into segments between welded vertices.
+    segmentsIn = 0
+    edges = set()
+    for polyline in polylines:
+        prev = None
+        for x, y in polyline:
+            index = grid.weld(x, y)
+            if prev is not None:
+                segmentsIn += 1
+                if index != prev:
+                    edges.add((prev, index) if prev < index else (index, prev))
+            prev = index
+
+    # Group the edges by the infinite line they lie on.
+    vertices = grid.vertices
+    lines = {}
+    for a, b in edges:
+        ax, ay = vertices[a]
+        bx, by = vertices[b]
+        dx = bx - ax
+        dy = by - ay
+        length = math.hypot(dx, dy)
+        ux = dx / length
+        uy = dy / length
+        if ux < -tolerance or (abs(ux) <= tolerance and uy < 0):
+            ux = -ux
+            uy = -uy
+        offset = ux * ay - uy * ax
+        kx = round(ux / _directionQuantum)
+        ky = round(uy / _directionQuantum)
+        _lineGroup(lines, kx, ky, offset / tolerance, ux, uy)[2].append((a, b))
+
+    # Merge overlapping intervals along each line.
+    segments = []
+    for ux, uy, lineEdges in lines.values():
+        intervals = []
+        for a, b in lineEdges:
+            ta = ux * vertices[a][0] + uy * vertices[a][1]
+            tb = ux * vertices[b][0] + uy * vertices[b][1]
+            if ta <= tb:
+                intervals.append((ta, tb, a, b))
+            else:
+                intervals.append((tb, ta, b, a))
+        intervals.sort()
+
+        start, end, startVertex, endVertex = intervals[0]
+        for t0, t1, v0, v1 in intervals[1:]:
+            if t0 < end - tolerance:
+                if t1 > end:
+                    end = t1
+                    endVertex = v1
+            else:
+                segments.append((vertices[startVertex], vertices[endVertex]))
+                start, end, startVertex, endVertex = t0, t1, v0, v1
+        segments.append((vertices[startVertex], vertices[endVertex]))
+
+    return WeldResult(segments, grid.lookups, len(vertices), segmentsIn)
@@ -0,0 +1,103 @@
+# A buffered, leveled logger for the TextCommands palette.
+#
+# Writing to the palette is an API round trip, and pumping the UI with
+# adsk.doEvents() so the text shows up mid-run is far more expensive, so lines
+# are collected in memory and written in batches: when flushLines lines are
+# waiting, or when the command calls flush() at the end.  Batches never depend
+# on the clock, so a run makes the same API calls however long it takes.
+# Lines below the logger's level are dropped
+# before they are formatted.  The last `capacity` lines are also kept in a
+# ring buffer (records) whatever the palette shows.
+#
+# The scripts share one logger; getLogger() returns it and resetLogger()
+# starts a fresh one for each command run.
+
+from collections import deque
+
+import adsk.core
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+_levelNames = {DEBUG: 'DEBUG', INFO: 'INFO', WARNING: 'WARNING', ERROR: 'ERROR'}
+
+
+class UiLogger:
+    def __init__(self, level=INFO, flushLines=50, capacity=1000, updateUi=True):
+        self.level = level
+        self.flushLines = flushLines
+        # Pump the UI after each batch so the palette repaints during long runs.
+        self.updateUi = updateUi
+        self.records = deque(maxlen=capacity)
+        self._pending = []
+        self._textPalette = None
+
+    def isEnabledFor(self, level):
+        return level >= self.level
+
+    # Logs text at the given level.  With args, text is a format string that
+    # is only formatted if the line is kept.
+    def log(self, level, text, *args):
+        if level < self.level:
+            return
+        if args:
+            text = text.format(*args)
+        if level > INFO:
+            text = _levelNames[level] + ': ' + text
+        self.records.append((level, text))
+        self._pending.append(text)
+        if len(self._pending) >= self.flushLines:
+            self.flush()
+
+    def debug(self, text, *args):
+        self.log(DEBUG, text, *args)
+
+    def info(self, text, *args):
+        self.log(INFO, text, *args)
+
+    def warning(self, text, *args):
+        self.log(WARNING, text, *args)
+
+    def error(self, text, *args):
+        self.log(ERROR, text, *args)
+
+    # The scripts' original logging call.
+    def print(self, text):
+        self.log(INFO, text)
+
+    # Writes the waiting lines to the palette in one call.
+    def flush(self):
+        if not self._pending:
+            return
+        text = '\n'.join(self._pending)
+        self._pending = []
+        self._palette().writeText(text)
+        if self.updateUi:
+            adsk.doEvents()
+
+    def _palette(self):
+        if self._textPalette is None or not self._textPalette.isValid:
+            ui = adsk.core.Application.get().userInterface
+            self._textPalette = ui.palettes.itemById('TextCommands')
+            self._textPalette.isVisible = True
+        return self._textPalette
+
+
+_logger = None
+
+
+def getLogger():
+    global _logger
+    if _logger is None:
+        _logger = UiLogger()
+    return _logger
+
+
+# Replaces the shared logger with a new one, dropping any lines still waiting,
+# and returns it.
+def resetLogger(*args, **kwargs):
+    global _logger
+    _logger = UiLogger(*args, **kwargs)
+    return _logger
@@ -0,0 +1,161 @@
+# adsk API-call budgets for the benchmark scenarios.
+#
+# Runs the scenarios from runBenchmarks.py with an ApiProfiler installed on the
+# scripts and checks the calls (method calls plus property sets) against the
+# budgets in apiBudgets.json.  Each budget entry may give
+#
+#   "calls"      maximum calls for the whole scenario
+#   "perCell"    maximum calls per chevron cell
+#   "perTooth"   maximum calls per gear tooth
+#   "functions"  the same limits for single script functions
+#
+#   python benchmarks/apiBudget.py              # check, exit 1 if over budget
+#   python benchmarks/apiBudget.py --report     # also print where calls go
+#   python benchmarks/apiBudget.py --record     # re-derive the budgets
+#
+# Scenarios without a budget entry are run and reported but not checked.  The
+# check also runs as part of the test suite (tests/test_apiBudgets.py).
+#
+# Call counts are the same on every run, so a budget is derived from the
+# count it was recorded against: each limit is the recorded value plus
+# _budgetMargin, rounded up to a whole call, or to a hundredth for the
+# per-cell and per-tooth limits, and call limits are at least
+# _budgetSlackCalls over the count so small counts are not held to the call.
+# That leaves room for small refactors while still catching a change that adds
+# a call to every cell or tooth.  After a change that is meant to alter the
+# counts, --record rewrites the limits the budget file already has from the
+# current counts; entries and keys are still added by hand.
+
+import argparse
+import json
+import math
+import os
+import sys
+
+import runBenchmarks
+from apiProfiler import ApiProfiler
+from phaseTimer import finishTrace, startTrace
+
+_here = os.path.dirname(os.path.realpath(__file__))
+
+# Headroom of a recorded budget over the count it was recorded from.
+_budgetMargin = 0.10
+_budgetSlackCalls = 3
+
+
+def profileScenario(scenario):
+    profiler = ApiProfiler()
+    for module in scenario.modules:
+        profiler.install(module)
+    # Calls made inside the scripts' phase spans are counted by phase.
+    startTrace(scenario.name)
+    try:
+        with profiler.phase(scenario.name):
+            scenario.run()
+    finally:
+        finishTrace()
+        profiler.uninstall()
+    return profiler
+
+
+def _limits(budget):
+    return [(key, budget[key]) for key in ('calls', 'perCell', 'perTooth') if key in budget]
+
+
+# The value a budget key limits, from a count of calls.
+def _measure(scenario, key, calls):
+    if key == 'perCell':
+        return calls / scenario.cells
+    if key == 'perTooth':
+        return calls / scenario.teeth
+    return calls
+
+
+# (label, function, limits) for the scenario and each function it budgets;
+# function is None for the scenario as a whole.
+def _checks(scenario, budget):
+    checks = [(scenario.name, None, budget)]
+    for function, functionBudget in budget.get('functions', {}).items():
+        checks.append(('{} {}()'.format(scenario.name, function), function, functionBudget))
+    return checks
+
+
+def checkBudget(scenario, profiler, budget):
+    failures = []
+    for label, function, limits in _checks(scenario, budget):
+        calls = profiler.calls(function=function)
+        for key, limit in _limits(limits):
+            value = _measure(scenario, key, calls)
+            if value > limit:
+                failures.append('{}: {} {:.4g} over budget {}'.format(label, key, value, limit))
+    return failures
+
+
+# The limit recorded for a measured value: _budgetMargin over it, rounded up.
+def budgetLimit(key, value):
+    if key == 'calls':
+        return math.ceil(max(value * (1.0 + _budgetMargin), value + _budgetSlackCalls))
+    value *= 1.0 + _budgetMargin
+    return math.ceil(round(value * 100.0, 6)) / 100.0
+
+
+# The budget with each of its limits re-derived from the profiled counts.
+def recordBudget(scenario, profiler, budget):
+    budget = json.loads(json.dumps(budget))
+    for label, function, limits in _checks(scenario, budget):
+        calls = profiler.calls(function=function)
+        for key, limit in _limits(limits):
+            limits[key] = budgetLimit(key, _measure(scenario, key, calls))
+    return budget
+
+
+# Writes the budgets one scenario to a line, the way the file is laid out.
+def writeBudgets(path, budgets):
+    lines = ['  {}: {}'.format(json.dumps(name), json.dumps(budget)) for name, budget in budgets.items()]
+    with open(path, 'w') as f:
+        f.write('{\n' + ',\n'.join(lines) + '\n}\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check adsk API-call budgets for the benchmark scenarios.')
+    parser.add_argument('--budgets', default=os.path.join(_here, 'apiBudgets.json'), help='budget file')
+    parser.add_argument('--filter', default='', help='only run scenarios whose name contains this text')
+    parser.add_argument('--report', action='store_true', help='print calls by function and API for each scenario')
+    parser.add_argument('--record', action='store_true',
+                        help='rewrite the budgets from the current counts instead of checking them')
+    args = parser.parse_args(argv)
+
+    with open(args.budgets) as f:
+        budgets = json.load(f)
+
+    failures = []
+    for scenario in runBenchmarks.allScenarios():
+        if args.filter not in scenario.name:
+            continue
+        profiler = profileScenario(scenario)
+        units = scenario.cells or scenario.teeth
+        perUnit = '  {:.2f}/{}'.format(profiler.calls() / units, 'cell' if scenario.cells else 'tooth') if units else ''
+        print('{:<32} {:>8} calls{}'.format(scenario.name, profiler.calls(), perUnit))
+        if args.report:
+            print(profiler.report(limit=10))
+            print()
+        if scenario.name in budgets:
+            if args.record:
+                budgets[scenario.name] = recordBudget(scenario, profiler, budgets[scenario.name])
+            else:
+                failures.extend(checkBudget(scenario, profiler, budgets[scenario.name]))
+
+    if args.record:
+        writeBudgets(args.budgets, budgets)
+        print('Recorded budgets in ' + args.budgets)
+        return 0
+    for failure in failures:
+        print('OVER BUDGET ' + failure)
+    if failures:
+        return 1
+    print('All scenarios within budget')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,17 @@
+# Recording stand-in for Fusion's adsk package, used by the benchmarks to run
+# the scripts on plain Linux and count the API calls they make.  See
+# _recording.py for how calls are captured.
+
+from adsk._recording import callLog
+
+
+def doEvents():
+    callLog.call('adsk.doEvents')
+
+
+def autoTerminate(value):
+    callLog.call('adsk.autoTerminate')
+
+
+def terminate():
+    callLog.call('adsk.terminate')
@@ -0,0 +1,169 @@
+# Machinery behind the recording adsk stand-in.
+#
+# Every object handed out by the fake API is a Recorder.  Reading an attribute,
+# setting one or calling a method is logged in callLog under a short name such
+# as 'sketchLines.addByTwoPoints', and whatever is returned is another Recorder,
+# so scripts can walk arbitrarily deep into the object model.  Iterating a
+# Recorder yields nothing, which is enough for the scripts' collection loops.
+
+from collections import Counter
+
+
+class CallLog:
+    def __init__(self):
+        self.calls = Counter()
+        self.sets = Counter()
+        self.gets = Counter()
+        self.listeners = []
+
+    def reset(self):
+        self.calls.clear()
+        self.sets.clear()
+        self.gets.clear()
+
+    def _notify(self, kind, name):
+        for listener in self.listeners:
+            listener(kind, name)
+
+    def call(self, name):
+        self.calls[name] += 1
+        self._notify('call', name)
+
+    def set(self, name):
+        self.sets[name] += 1
+        self._notify('set', name)
+
+    def get(self, name):
+        self.gets[name] += 1
+        self._notify('get', name)
+
+    # Method calls and property sets: the round trips that change the model.
+    def totalCalls(self):
+        return sum(self.calls.values()) + sum(self.sets.values())
+
+    def totalGets(self):
+        return sum(self.gets.values())
+
+
+callLog = CallLog()
+
+# Property values the scripts do arithmetic with.
+_defaultValues = {
+    'pointTolerance': 1e-8,
+    'markerPosition': 0,
+}
+
+
+class Recorder:
+    def __init__(self, name):
+        object.__setattr__(self, '_name', name)
+        object.__setattr__(self, '_values', {})
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        values = object.__getattribute__(self, '_values')
+        callLog.get(self._name + '.' + name)
+        if name not in values:
+            values[name] = _defaultValues.get(name, _Member(self._name, name))
+        return values[name]
+
+    def __setattr__(self, name, value):
+        callLog.set(self._name + '.' + name)
+        self._values[name] = value
+
+    def __iter__(self):
+        return iter(())
+
+    def __bool__(self):
+        return True
+
+    def __repr__(self):
+        return '<Recorder {}>'.format(self._name)
+
+
+# An attribute of a Recorder.  It is a Recorder itself (for property chains
+# like sketch.sketchCurves.sketchLines) and callable (for methods).
+class _Member(Recorder):
+    def __init__(self, ownerName, name):
+        super().__init__(name)
+        object.__setattr__(self, '_qualifiedName', ownerName + '.' + name)
+
+    def __call__(self, *args, **kwargs):
+        callLog.call(self._qualifiedName)
+        return Recorder(self._name)
+
+
+# Metaclass for fake API classes: unknown static members become recorded
+# calls, e.g. adsk.core.ValueInput.createByReal(...).
+class ApiType(type):
+    def __getattr__(cls, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return _StaticMember(cls.__name__, name)
+
+
+class ApiObject(metaclass=ApiType):
+    @classmethod
+    def cast(cls, obj):
+        return obj
+
+    @classmethod
+    def classType(cls):
+        return cls.__name__
+
+
+class _StaticMember:
+    def __init__(self, className, name):
+        self._qualifiedName = className + '.' + name
+
+    def __call__(self, *args, **kwargs):
+        callLog.call(self._qualifiedName)
+        return Recorder(self._qualifiedName.split('.')[-1])
+
+    def __repr__(self):
+        return '<ApiMember {}>'.format(self._qualifiedName)
+
+
+# Module-level __getattr__ for the fake namespaces: any class the scripts name
+# that is not defined explicitly becomes a plain ApiObject subclass.
+def makeModuleGetattr(moduleGlobals):
+    def __getattr__(name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        cls = ApiType(name, (ApiObject,), {})
+        moduleGlobals[name] = cls
+        return cls
+    return __getattr__
+
+
+# Lays out state a scenario wants the scripts to find, such as the attributes
+# an earlier run left on the design: reading recorder.name then returns value,
+# and a value of None drops it again.  A callable value stands in for a method
+# and is recorded when called.
+def seedValue(recorder, name, value):
+    values = object.__getattribute__(recorder, '_values')
+    if value is None:
+        values.pop(name, None)
+    elif callable(value):
+        values[name] = _SeededMember(object.__getattribute__(recorder, '_name'), name, value)
+    else:
+        values[name] = value
+
+
+# The object a recorded property read returns, without recording the read.
+def peekValue(recorder, name):
+    values = object.__getattribute__(recorder, '_values')
+    if name not in values:
+        values[name] = _Member(object.__getattribute__(recorder, '_name'), name)
+    return values[name]
+
+
+class _SeededMember(_Member):
+    def __init__(self, ownerName, name, function):
+        super().__init__(ownerName, name)
+        object.__setattr__(self, '_function', function)
+
+    def __call__(self, *args, **kwargs):
+        callLog.call(self._qualifiedName)
+        return self._function(*args, **kwargs)
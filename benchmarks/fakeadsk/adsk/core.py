@@ -0,0 +1,110 @@
+# Recording stand-in for adsk.core.  Geometry value types that the scripts
+# compute with (Point3D, Matrix3D, ObjectCollection) hold real data; everything
+# else is recorded.
+
+import math
+
+from adsk._recording import ApiObject, Recorder, callLog, makeModuleGetattr
+
+
+class Application(ApiObject):
+    _instance = None
+
+    @classmethod
+    def get(cls):
+        callLog.call('Application.get')
+        if cls._instance is None:
+            cls._instance = Recorder('app')
+        return cls._instance
+
+
+class Point3D(ApiObject):
+    def __init__(self, x, y, z):
+        self.x = x
+        self.y = y
+        self.z = z
+
+    @classmethod
+    def create(cls, x=0.0, y=0.0, z=0.0):
+        callLog.call('Point3D.create')
+        return cls(x, y, z)
+
+    def distanceTo(self, other):
+        callLog.call('Point3D.distanceTo')
+        return math.sqrt((self.x - other.x) ** 2 + (self.y - other.y) ** 2 + (self.z - other.z) ** 2)
+
+
+class Vector3D(Point3D):
+    @classmethod
+    def create(cls, x=0.0, y=0.0, z=0.0):
+        callLog.call('Vector3D.create')
+        return cls(x, y, z)
+
+
+class Matrix3D(ApiObject):
+    def __init__(self):
+        self.translation = Vector3D(0.0, 0.0, 0.0)
+
+    @classmethod
+    def create(cls):
+        callLog.call('Matrix3D.create')
+        return cls()
+
+    def setToRotation(self, angle, axis, origin):
+        callLog.call('Matrix3D.setToRotation')
+        return True
+
+
+class ObjectCollection(ApiObject):
+    def __init__(self, items=None):
+        self._items = list(items or [])
+
+    @classmethod
+    def create(cls):
+        callLog.call('ObjectCollection.create')
+        return cls()
+
+    @classmethod
+    def createWithArray(cls, items):
+        callLog.call('ObjectCollection.createWithArray')
+        return cls(items)
+
+    def add(self, item):
+        callLog.call('ObjectCollection.add')
+        self._items.append(item)
+        return True
+
+    @property
+    def count(self):
+        return len(self._items)
+
+    def item(self, index):
+        callLog.call('ObjectCollection.item')
+        return self._items[index]
+
+    def __iter__(self):
+        return iter(self._items)
+
+
+class Line3D(ApiObject):
+    pass
+
+
+class CommandEventHandler:
+    def __init__(self):
+        pass
+
+
+class CommandCreatedEventHandler(CommandEventHandler):
+    pass
+
+
+class InputChangedEventHandler(CommandEventHandler):
+    pass
+
+
+class ValidateInputsEventHandler(CommandEventHandler):
+    pass
+
+
+__getattr__ = makeModuleGetattr(globals())
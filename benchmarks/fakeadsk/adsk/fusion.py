@@ -0,0 +1,5 @@
+# Recording stand-in for adsk.fusion.  Every class is generated on first use.
+
+from adsk._recording import makeModuleGetattr
+
+__getattr__ = makeModuleGetattr(globals())
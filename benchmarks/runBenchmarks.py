@@ -0,0 +1,335 @@
+# Benchmarks for the Ascending Chevrons and Spur Gear scripts.
+#
+# The scripts run against the recording adsk stand-in in fakeadsk/, so this
+# works on plain Linux without Fusion.  Each scenario reports wall time, peak
+# Python memory, DXF bytes written and the number of adsk calls (method calls
+# plus property sets; property reads are listed separately).  Timings only
+# cover the Python side: the work Fusion itself does behind each call is not
+# measured here, which is why the call counts matter as much as the times.
+#
+#   python benchmarks/runBenchmarks.py                        # print results
+#   python benchmarks/runBenchmarks.py --save baselines.json   # record baseline
+#   python benchmarks/runBenchmarks.py --compare baselines.json
+#
+# --compare exits with status 1 if any scenario regressed past the tolerances
+# in _tolerances.  Call counts do not depend on the machine: every run starts
+# with a fresh palette logger and the scripts' caches off or cleared, so they
+# are the same on every run.  DXF sizes only vary by the few bytes of the
+# timestamps ezdxf writes into its headers.  Wall times do depend on the
+# machine, so --save leaves them out unless --save-times is given, and a
+# baseline without them only checks the other metrics.
+#
+# To re-record the committed baseline after a change that is meant to alter
+# call counts or output, run the full set from the repository root and commit
+# the result with the change:
+#
+#   python benchmarks/runBenchmarks.py --save benchmarks/baselines.json
+
+import argparse
+import gc
+import importlib.util
+import json
+import math
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+_here = os.path.dirname(os.path.realpath(__file__))
+_scriptsDir = os.path.join(os.path.dirname(_here), 'NoSupports')
+sys.path.insert(0, os.path.join(_here, 'fakeadsk'))
+sys.path.insert(0, _scriptsDir)
+
+import adsk.core
+from adsk._recording import Recorder, callLog, peekValue, seedValue
+from uiLogger import resetLogger
+
+# Allowed growth over the baseline before a metric counts as a regression.
+# Call counts must not grow at all; times get slack for machine noise.
+_tolerances = {
+    'adskCalls': 0.0,
+    'dxfBytes': 0.02,
+    'peakBytes': 0.25,
+    'wallSeconds': 0.5,
+}
+# Absolute slack for the wall time of very short scenarios.
+_timeSlackSeconds = 0.005
+
+
+def _loadChevrons():
+    path = os.path.join(_scriptsDir, 'NoSupports.com-AscendingChevrons.py')
+    spec = importlib.util.spec_from_file_location('ascendingChevrons', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _loadSpurGear():
+    import SpurGear
+    return SpurGear
+
+
+# Goes through the script's own adsk global so an installed ApiProfiler sees
+# everything reached from the application object.  Each run gets a fresh
+# logger, so no lines left waiting by an earlier run are flushed in this one.
+def _prepare(module):
+    resetLogger()
+    module._app = module.adsk.core.Application.get()
+    module._ui = module._app.userInterface
+    return module._app.activeProduct
+
+
+class Scenario:
+    def __init__(self, name, run, modules, cells=0, teeth=0):
+        self.name = name
+        self.run = run
+        # The script modules the scenario drives, for apiBudget.py.
+        self.modules = modules
+        # Units of work, for the per-cell and per-tooth figures.
+        self.cells = cells
+        self.teeth = teeth
+
+
+def chevronScenario(chevrons, output, numCols, numRows, writer='insert'):
+    from dxfSink import MemoryDxfSink
+
+    def run():
+        design = _prepare(chevrons)
+        chevrons._useChevronCache = False
+        chevrons._dxfWriter = writer
+        args = (design, 10.0, 13.0, numCols, numRows, 0.2, 0.3, 'Sketch1')
+        if output == 'dxf':
+            sink = MemoryDxfSink()
+            chevrons.dxfDrawAscendingChevrons(*args, dxfSink=sink)
+            return sink.bytesWritten
+        if output == 'direct':
+            chevrons.sketchDrawAscendingChevrons(*args)
+        elif output == 'pattern':
+            chevrons.patternDrawAscendingChevrons(*args, 'w1', 'h1', 'margin', '2')
+        return 0
+
+    name = 'chevrons-{}-{}x{}'.format(output if output != 'dxf' else 'dxf-' + writer, numCols, numRows)
+    return Scenario(name, run, [chevrons], cells=numCols * numRows)
+
+
+def _gearSpec(numTeeth):
+    from gearSpec import GearSpec
+    return GearSpec(8.0, numTeeth, 20.0 * (math.pi / 180), backlash=0.0, thickness=1.27,
+                    rootFilletRad=0.05, holeDiam=0.5)
+
+
+# Every gear scenario starts with no gear geometry computed.
+def _prepareGear(gear):
+    gear._geometryCache.clear()
+    return _prepare(gear)
+
+
+def gearScenario(gear, numTeeth, pointCount, splineType='fitted', buildMode='pattern'):
+    def run():
+        design = _prepareGear(gear)
+        gear._involutePointCount = pointCount
+        gear._involuteSplineType = splineType
+        gear._gearBuildMode = buildMode
+        gear.drawGear(design, _gearSpec(numTeeth))
+        return 0
+
+    # A pointCount of None samples the involute adaptively.
+    points = '{}p'.format(pointCount) if pointCount else 'auto'
+    if splineType == 'controlPoint':
+        points = 'cp'
+    name = 'gear-{}t-{}'.format(numTeeth, points)
+    if buildMode == 'fullProfile':
+        name += '-full'
+    return Scenario(name, run, [gear], teeth=numTeeth)
+
+
+# Places a gear identical to one already in the design, which drawGear finds
+# by its SpurGear/Values attribute and adds another occurrence of.
+def gearReuseScenario(gear, numTeeth):
+    def run():
+        design = _prepareGear(gear)
+        spec = _gearSpec(numTeeth)
+        attribute = Recorder('attribute')
+        seedValue(attribute, 'value', spec.attributeValue())
+        seedValue(attribute, 'parent', Recorder('component'))
+        rawDesign = peekValue(adsk.core.Application._instance, 'activeProduct')
+        seedValue(rawDesign, 'findAttributes', lambda groupName, name: [attribute])
+        try:
+            gear.drawGear(design, spec)
+        finally:
+            seedValue(rawDesign, 'findAttributes', None)
+        return 0
+
+    return Scenario('gear-{}t-reuse'.format(numTeeth), run, [gear], teeth=numTeeth)
+
+
+# Changes the thickness and root fillet of a patterned gear already in the
+# design, which editGear does by setting the parameters of its features.
+def gearEditScenario(gear, numTeeth):
+    def run():
+        design = _prepareGear(gear)
+        spec = _gearSpec(numTeeth)
+        values = Recorder('attribute')
+        seedValue(values, 'value', spec.attributeValue())
+        attributes = Recorder('attributes')
+        seedValue(attributes, 'itemByName', lambda groupName, name: values if name == 'Values' else None)
+        comp = Recorder('component')
+        seedValue(comp, 'attributes', attributes)
+        gear.editGear(design, comp, spec.replace(thickness=2.0, rootFilletRad=0.04))
+        return 0
+
+    return Scenario('gear-{}t-edit'.format(numTeeth), run, [gear], teeth=numTeeth)
+
+
+# A train of numGears meshing gears built by one drawGearTrain call.
+def gearTrainScenario(gear, numGears):
+    from gearTrain import gearTrainFromParameterSets
+
+    rows = [{'numTeeth': 12 + 12 * (i % 4), 'direction': 40 * i} for i in range(numGears)]
+
+    def run():
+        design = _prepareGear(gear)
+        gear._involutePointCount = None
+        gear._involuteSplineType = 'fitted'
+        gear._gearBuildMode = 'pattern'
+        trainGears = gearTrainFromParameterSets(rows, _gearSpec(24))
+        gear.drawGearTrain(design, trainGears)
+        return 0
+
+    teeth = sum(row['numTeeth'] for row in rows)
+    return Scenario('gear-train-{}'.format(numGears), run, [gear], teeth=teeth)
+
+
+def allScenarios():
+    chevrons = _loadChevrons()
+    gear = _loadSpurGear()
+    scenarios = []
+    for n in (10, 50, 200):
+        scenarios.append(chevronScenario(chevrons, 'dxf', n, n, 'flat'))
+        scenarios.append(chevronScenario(chevrons, 'dxf', n, n, 'insert'))
+    scenarios.append(chevronScenario(chevrons, 'dxf', 200, 200, 'minsert'))
+    scenarios.append(chevronScenario(chevrons, 'dxf', 200, 200, 'stream'))
+    for n in (10, 50):
+        scenarios.append(chevronScenario(chevrons, 'direct', n, n))
+    scenarios.append(chevronScenario(chevrons, 'pattern', 50, 50))
+    for numTeeth in (12, 48, 120):
+        scenarios.append(gearScenario(gear, numTeeth, 15))
+    scenarios.append(gearScenario(gear, 48, 60))
+    # The pattern and full-profile builds side by side across tooth counts.
+    for numTeeth in (12, 48, 120):
+        scenarios.append(gearScenario(gear, numTeeth, None))
+        scenarios.append(gearScenario(gear, numTeeth, None, buildMode='fullProfile'))
+    for numTeeth in (12, 120):
+        scenarios.append(gearScenario(gear, numTeeth, None, 'controlPoint'))
+    scenarios.append(gearReuseScenario(gear, 48))
+    scenarios.append(gearEditScenario(gear, 48))
+    scenarios.append(gearTrainScenario(gear, 10))
+    return scenarios
+
+
+# Runs a scenario once under tracemalloc for memory and call counts, then
+# `repeat` more times untraced and keeps the fastest wall time.
+def measure(scenario, repeat):
+    gc.collect()
+    callLog.reset()
+    tracemalloc.start()
+    dxfBytes = scenario.run()
+    peakBytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    calls = callLog.totalCalls()
+    gets = callLog.totalGets()
+
+    times = []
+    for i in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        scenario.run()
+        times.append(time.perf_counter() - start)
+
+    return {
+        'wallSeconds': min(times),
+        'peakBytes': peakBytes,
+        'dxfBytes': dxfBytes,
+        'adskCalls': calls,
+        'adskGets': gets,
+    }
+
+
+def compare(results, baseline):
+    regressions = []
+    for name, metrics in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print('{}: no baseline'.format(name))
+            continue
+        for metric, tolerance in _tolerances.items():
+            if metric not in base:
+                continue
+            limit = base[metric] * (1.0 + tolerance)
+            if metric == 'wallSeconds':
+                limit += _timeSlackSeconds
+            if metrics[metric] > limit:
+                regressions.append('{}: {} {} > baseline {} (+{:.0%})'.format(
+                    name, metric, _format(metrics[metric]), _format(base[metric]), tolerance))
+    return regressions
+
+
+def _format(value):
+    if isinstance(value, float):
+        return '{:.4f}'.format(value)
+    return str(value)
+
+
+def printTable(results, scenarios):
+    header = '{:<32} {:>10} {:>12} {:>12} {:>10} {:>10} {:>10}'.format(
+        'scenario', 'wall ms', 'peak KB', 'dxf bytes', 'calls', 'gets', 'calls/unit')
+    print(header)
+    print('-' * len(header))
+    for scenario in scenarios:
+        m = results[scenario.name]
+        units = scenario.cells or scenario.teeth
+        perUnit = '{:.2f}'.format(m['adskCalls'] / units) if units else ''
+        print('{:<32} {:>10.1f} {:>12.1f} {:>12} {:>10} {:>10} {:>10}'.format(
+            scenario.name, m['wallSeconds'] * 1000.0, m['peakBytes'] / 1024.0, m['dxfBytes'],
+            m['adskCalls'], m['adskGets'], perUnit))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the chevron and gear scripts against a recording adsk stand-in.')
+    parser.add_argument('--save', metavar='PATH', help='write the results as a JSON baseline')
+    parser.add_argument('--save-times', action='store_true', help='keep wall times in the saved baseline')
+    parser.add_argument('--compare', metavar='PATH', help='compare against a JSON baseline; exit 1 on regression')
+    parser.add_argument('--filter', default='', help='only run scenarios whose name contains this text')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per scenario (fastest is kept)')
+    args = parser.parse_args(argv)
+
+    scenarios = [s for s in allScenarios() if args.filter in s.name]
+    results = {}
+    for scenario in scenarios:
+        results[scenario.name] = measure(scenario, args.repeat)
+    printTable(results, scenarios)
+
+    if args.save:
+        saved = results
+        if not args.save_times:
+            saved = {name: {metric: value for metric, value in metrics.items() if metric != 'wallSeconds'}
+                     for name, metrics in results.items()}
+        with open(args.save, 'w') as f:
+            json.dump({'python': platform.python_version(), 'scenarios': saved}, f, indent=2, sort_keys=True)
+            f.write('\n')
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['scenarios']
+        regressions = compare(results, baseline)
+        for regression in regressions:
+            print('REGRESSION ' + regression)
+        if regressions:
+            return 1
+        print('No regressions against ' + args.compare)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
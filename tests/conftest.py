@@ -0,0 +1,11 @@
+# The scripts and the benchmarks are run from their own folders rather than
+# installed, so the tests import them the same way.  Modules that need adsk
+# get the benchmarks' recording stand-in.
+
+import os
+import sys
+
+_root = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, os.path.join(_root, 'benchmarks', 'fakeadsk'))
+sys.path.insert(0, os.path.join(_root, 'benchmarks'))
+sys.path.insert(0, os.path.join(_root, 'NoSupports'))
@@ -0,0 +1,31 @@
+# The adsk API-call budgets from benchmarks/apiBudgets.json, checked against
+# the benchmark scenarios run on the recording adsk stand-in.
+
+import json
+import os
+
+import pytest
+
+import apiBudget
+import runBenchmarks
+
+with open(os.path.join(apiBudget._here, 'apiBudgets.json')) as f:
+    _budgets = json.load(f)
+
+_scenarios = [scenario for scenario in runBenchmarks.allScenarios() if scenario.name in _budgets]
+
+
+@pytest.mark.parametrize('scenario', _scenarios, ids=lambda scenario: scenario.name)
+def test_scenarioWithinBudget(scenario):
+    profiler = apiBudget.profileScenario(scenario)
+    assert apiBudget.checkBudget(scenario, profiler, _budgets[scenario.name]) == []
+
+
+def test_everyBudgetHasAScenario():
+    assert set(_budgets) <= {scenario.name for scenario in runBenchmarks.allScenarios()}
+
+
+def test_budgetLimitLeavesMargin():
+    assert apiBudget.budgetLimit('calls', 5) == 8
+    assert apiBudget.budgetLimit('calls', 1000) == 1100
+    assert apiBudget.budgetLimit('perCell', 9.19) == 10.11
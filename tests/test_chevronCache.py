@@ -0,0 +1,78 @@
+# The on-disk chevron DXF cache: keys, least-recently-used eviction and hit
+# counts shared by several processes.
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from chevronCache import ChevronCache, chevronCacheKey
+
+
+def _source(tmp_path, name, size):
+    path = tmp_path / name
+    path.write_bytes(b'x' * size)
+    return str(path)
+
+
+def _age(cache, key, seconds):
+    os.utime(cache._entryPath(key), (seconds, seconds))
+
+
+def test_keyIgnoresEvaluationNoise():
+    key = chevronCacheKey(10.0, 13.0, 4, 4.0, 0.2, 0.3, 'flat')
+    assert key == chevronCacheKey(10.0 + 1e-14, 13, 4.0, 4, 0.2, 0.3, 'flat ')
+    assert key != chevronCacheKey(10.0, 13.0, 4, 4, 0.2, 0.3, 'insert')
+    assert key != chevronCacheKey(10.0, 13.0, 4, 4, 0.2, 0.3, 'flat', explode=True)
+
+
+def test_leastRecentlyUsedEntriesAreEvictedFirst(tmp_path):
+    cache = ChevronCache(str(tmp_path / 'cache'), maxBytes=250)
+    for index, key in enumerate(('a', 'b', 'c')):
+        cache.put(key, _source(tmp_path, key, 100 - index))
+        _age(cache, key, 1000 + index)
+    # Only two fit: the oldest entry went when the third was added.
+    assert cache.get('a') is None
+    assert cache.get('b') and cache.get('c')
+
+    # A hit makes b the newest, so c is the next to go.
+    _age(cache, 'c', 2000)
+    cache.get('b')
+    cache.put('d', _source(tmp_path, 'd', 100))
+    assert cache.get('c') is None
+    assert cache.get('b') and cache.get('d')
+    assert sorted(name for name in os.listdir(cache.directory) if name.endswith('.dxf')) == ['b.dxf', 'd.dxf']
+
+
+def test_entryIsReplacedWhole(tmp_path):
+    cache = ChevronCache(str(tmp_path / 'cache'))
+    cache.put('a', _source(tmp_path, 'first', 10))
+    path = cache.put('a', _source(tmp_path, 'second', 20))
+    assert os.path.getsize(path) == 20
+    assert not [name for name in os.listdir(cache.directory) if name.endswith('.tmp')]
+
+
+def _lookups(args):
+    directory, count = args
+    cache = ChevronCache(directory)
+    for index in range(count):
+        cache.get('present' if index % 2 else 'absent')
+    return os.getpid()
+
+
+def test_countsFromConcurrentProcessesAreNotLost(tmp_path):
+    directory = str(tmp_path / 'cache')
+    cache = ChevronCache(directory)
+    cache.put('present', _source(tmp_path, 'present', 10))
+    with ProcessPoolExecutor(4) as pool:
+        list(pool.map(_lookups, [(directory, 40)] * 8))
+    assert cache.stats() == {'hits': 160, 'misses': 160}
+
+
+def test_unreadableStatsFilesAreSkipped(tmp_path):
+    cache = ChevronCache(str(tmp_path / 'cache'))
+    cache.get('absent')
+    with open(os.path.join(cache.directory, 'stats-1.json'), 'w') as f:
+        f.write('{"hits": 3, "mis')
+    with open(os.path.join(cache.directory, 'stats.json'), 'w') as f:
+        f.write('{"hits": 2, "misses": 1}')
+    assert cache.stats() == {'hits': 2, 'misses': 2}
+    assert cache.summary() == 'Chevron cache: 2 hits, 2 misses'
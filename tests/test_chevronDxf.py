@@ -0,0 +1,58 @@
+# Every chevron DXF writer must come back, once read and expanded, as the
+# same polylines the flat writer writes.
+
+import io
+
+import ezdxf
+import pytest
+
+from chevronDxf import buildBlockDxf, buildFlatDxf, dxfChevronLayout, streamChevronDxf
+from chevronGeometry import ChevronGrid
+
+_layout = dxfChevronLayout(100.0, 80.0, 6, 5, 2.0, 3.0)
+
+
+# The polylines in a modelspace, block references expanded, as a sorted list
+# of point tuples rounded to places.
+def _polylines(msp, places=9):
+    entities = []
+    for entity in msp:
+        if entity.dxftype() == 'INSERT':
+            for insert in entity.multi_insert():
+                entities.extend(insert.virtual_entities())
+        else:
+            entities.append(entity)
+
+    polylines = []
+    for entity in entities:
+        if entity.dxftype() == 'LWPOLYLINE':
+            points = entity.get_points('xy')
+        else:
+            points = [vertex.dxf.location for vertex in entity.vertices]
+        polylines.append(tuple((round(x, places), round(y, places)) for x, y, *rest in points))
+    return sorted(polylines)
+
+
+_flat = _polylines(buildFlatDxf(ChevronGrid(_layout)).modelspace())
+
+
+@pytest.mark.parametrize('useMinsert', [False, True], ids=['insert', 'minsert'])
+@pytest.mark.parametrize('explode', [False, True], ids=['blocks', 'exploded'])
+def test_blockDxfExpandsToFlatPolylines(useMinsert, explode):
+    msp = buildBlockDxf(_layout, useMinsert, explode).modelspace()
+    assert _polylines(msp) == _flat
+
+
+def test_minsertUsesOneReferencePerBlock():
+    msp = buildBlockDxf(_layout, useMinsert=True).modelspace()
+    assert len(msp.query('INSERT')) == 2
+
+
+def test_streamedDxfMatchesFlatPolylines():
+    stream = io.StringIO()
+    streamChevronDxf(_layout, stream)
+    doc = ezdxf.read(io.StringIO(stream.getvalue()))
+    # The R12 writer keeps six decimal places.
+    assert _polylines(doc.modelspace(), 6) == sorted(
+        tuple((round(x, 6), round(y, 6)) for x, y in polyline) for polyline in _flat)
+    assert doc.header['$INSUNITS'] == 6
@@ -0,0 +1,94 @@
+# The batched and streamed chevron grids against the per-cell loops the DXF
+# writer used before chevronGeometry existed.
+
+import pytest
+
+from chevronDxf import dxfChevronLayout, dxfScale
+from chevronGeometry import ChevronGrid, ChevronLayout, flipY, iterChevronPolylines
+
+# (width, height, numCols, numRows, webbing, margin) in design units (cm).
+_grids = [
+    (100.0, 80.0, 6, 5, 2.0, 3.0),
+    (37.3, 91.7, 7.0, 9, 0.35, 1.15),
+    (250.0, 120.0, 40, 23, 1.2, 4.4),
+    (60.0, 60.0, 1, 4, 1.0, 2.0),
+    (60.0, 60.0, 5, 1, 1.0, 2.0),
+]
+
+
+# The polylines of the original dxfDrawAscendingChevrons, in the order it
+# wrote them, with its arithmetic kept step for step.
+def _baselinePolylines(width, height, numCols, numRows, webbing, margin):
+    outerX2 = width / dxfScale
+    outerY2 = height / dxfScale
+    height = height / dxfScale
+    width = width / dxfScale
+    margin = margin / dxfScale
+    webbing = webbing / dxfScale
+
+    polylines = []
+    r1y1 = flipY(0, height)
+    r1y2 = flipY(outerY2, height)
+    polylines.append([(0, r1y1), (outerX2, r1y1), (outerX2, r1y2), (0, r1y2), (0, r1y1)])
+    r2x1 = margin
+    r2y1 = flipY(margin, height)
+    r2x2 = outerX2 - margin
+    r2y2 = flipY(outerY2 - margin, height)
+    polylines.append([(r2x1, r2y1), (r2x2, r2y1), (r2x2, r2y2), (r2x1, r2y2), (r2x1, r2y1)])
+
+    overallWidth = width - margin * 2.0
+    overallHeight = height - margin * 2.0
+    chevronWidth = overallWidth / numCols
+    numCols = int(numCols)
+    numRows = int(numRows)
+    xStep = chevronWidth
+    yStep = (overallHeight - (chevronWidth / 2) - webbing) / (numRows - 1)
+
+    yOffset = margin
+    for y in range(numRows):
+        xOffset = margin
+        for x in range(numCols):
+            halfWidth = chevronWidth / 2.0
+            y0 = yOffset
+            y1 = y0 + webbing
+            y2 = y1 + halfWidth
+            y3 = y2 - webbing
+            y0, y1, y2, y3 = (flipY(value, height) for value in (y0, y1, y2, y3))
+            x0 = xOffset
+            x1 = x0 + halfWidth
+            x2 = xOffset + chevronWidth
+            polylines.append([(x0, y0), (x0, y1), (x1, y2), (x2, y1), (x2, y0), (x1, y3), (x0, y0)])
+            xOffset += xStep
+        yOffset += yStep
+
+    xOffset = margin
+    strutHeight = yStep * (numRows - 1) + webbing / 2
+    for x in range(1, numCols):
+        x0 = xOffset + xStep - webbing / 2.0
+        x1 = x0 + webbing
+        y0 = flipY(margin, height)
+        y1 = flipY(margin + strutHeight, height)
+        polylines.append([(x0, y0), (x0, y1)])
+        polylines.append([(x1, y0), (x1, y1)])
+        xOffset += xStep
+    return [[list(point) for point in polyline] for polyline in polylines]
+
+
+@pytest.mark.parametrize('grid', [grid for grid in _grids if grid[3] > 1])
+def test_batchedGridMatchesBaselineLoop(grid):
+    layout = dxfChevronLayout(*grid)
+    assert list(ChevronGrid(layout).polylines()) == _baselinePolylines(*grid)
+
+
+@pytest.mark.parametrize('grid', _grids)
+@pytest.mark.parametrize('chunkCells', [1, 7, 1024])
+def test_streamedGridMatchesBatched(grid, chunkCells):
+    layout = dxfChevronLayout(*grid)
+    assert list(iterChevronPolylines(layout, chunkCells)) == list(ChevronGrid(layout).polylines())
+
+
+def test_singleRowHasNoStep():
+    layout = ChevronLayout(60.0, 60.0, 5, 1, 1.0, 2.0)
+    assert layout.yStep == 0.0
+    assert layout.chevrons().shape == (1, 5, 7, 2)
+    assert layout.struts().shape == (4, 2, 2, 2)
@@ -0,0 +1,37 @@
+# The Ascending Chevrons dialog must refuse values its settings cannot keep,
+# so the saved settings always match the grid that was built.
+
+import types
+
+import pytest
+
+import runBenchmarks
+
+
+def _validate(monkeypatch, numCols='4', numRows='4', webbing='2'):
+    chevrons = runBenchmarks._loadChevrons()
+    for name, value in (('_numCols', numCols), ('_numRows', numRows), ('_webbing', webbing)):
+        monkeypatch.setattr(chevrons, name, types.SimpleNamespace(value=value))
+    monkeypatch.setattr(chevrons, '_errMessage', types.SimpleNamespace(text=None))
+    eventArgs = types.SimpleNamespace(areInputsValid=True)
+    chevrons.MeshCommandValidateInputsHandler().notify(eventArgs)
+    return eventArgs.areInputsValid, chevrons._errMessage.text
+
+
+def test_acceptsWholeCountsAndPositiveWebbing(monkeypatch):
+    assert _validate(monkeypatch, ' 12', '1', '0.5') == (True, '')
+
+
+@pytest.mark.parametrize('inputs', [
+    {'numCols': '4.5'},
+    {'numCols': '0'},
+    {'numRows': 'four'},
+    {'numRows': ''},
+    {'webbing': 'thick'},
+    {'webbing': '0'},
+    {'webbing': 'nan'},
+])
+def test_rejectsValuesTheSettingsCannotKeep(monkeypatch, inputs):
+    isValid, message = _validate(monkeypatch, **inputs)
+    assert not isValid
+    assert message
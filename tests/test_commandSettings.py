@@ -0,0 +1,98 @@
+# Loading, migrating and saving a command's dialog settings on a stand-in
+# design.
+
+import json
+
+import pytest
+
+from commandSettings import CommandSettings, settingsVersion
+from uiLogger import WARNING, resetLogger
+
+_defaults = {'numTeeth': 24, 'thickness': 1.27, 'standard': 'English', 'flip': False}
+
+
+class _Attribute:
+    def __init__(self, attributes, groupName, name, value):
+        self.attributes = attributes
+        self.key = (groupName, name)
+        self.value = value
+
+    def deleteMe(self):
+        del self.attributes.items[self.key]
+
+
+class _Attributes:
+    def __init__(self):
+        self.items = {}
+
+    def itemByName(self, groupName, name):
+        return self.items.get((groupName, name))
+
+    def add(self, groupName, name, value):
+        self.items[(groupName, name)] = _Attribute(self, groupName, name, value)
+
+
+class _Design:
+    def __init__(self, **attributeValues):
+        self.attributes = _Attributes()
+        for name, value in attributeValues.items():
+            self.attributes.add('SpurGear', name, value)
+
+
+@pytest.fixture
+def log():
+    return resetLogger(updateUi=False)
+
+
+def test_newDesignGetsTheDefaults(log):
+    settings = CommandSettings(_Design(), 'SpurGear', _defaults).load()
+    assert settings.values == _defaults
+    assert not log.records
+
+
+def test_legacyAttributesAreTypedAndRemovedOnSave(log):
+    design = _Design(numTeeth='36', thickness='2.5', standard='Metric', flip='True')
+    settings = CommandSettings(design, 'SpurGear', _defaults).load()
+    assert settings.values == {'numTeeth': 36, 'thickness': 2.5, 'standard': 'Metric', 'flip': True}
+    assert isinstance(settings['numTeeth'], int)
+
+    settings.save()
+    assert list(design.attributes.items) == [('SpurGear', 'settings')]
+    record = json.loads(design.attributes.itemByName('SpurGear', 'settings').value)
+    assert record == {'version': settingsVersion, 'values': settings.values}
+    assert CommandSettings(design, 'SpurGear', _defaults).load().values == settings.values
+
+
+@pytest.mark.parametrize('value, expected', [('3.0', 3), (7.0, 7), ('12', 12)])
+def test_wholeNumbersMayBeWrittenAsFloats(log, value, expected):
+    settings = CommandSettings(_Design(numTeeth=value), 'SpurGear', _defaults).load()
+    assert settings['numTeeth'] == expected
+    assert not log.records
+
+
+@pytest.mark.parametrize('value', ['3.9', 'many', ''])
+def test_badLegacyValuesFallBackWithAWarning(log, value):
+    settings = CommandSettings(_Design(numTeeth=value), 'SpurGear', _defaults).load()
+    assert settings['numTeeth'] == 24
+    (level, text), = log.records
+    assert level == WARNING and 'numTeeth' in text and repr(value) in text
+
+
+def test_unreadableSettingsAttributeGivesTheDefaults(log):
+    settings = CommandSettings(_Design(settings='{not json'), 'SpurGear', _defaults).load()
+    assert settings.values == _defaults
+
+
+@pytest.mark.parametrize('value', ['4.5', 'four', None])
+def test_updateRejectsValuesItCannotKeep(log, value):
+    settings = CommandSettings(_Design(), 'SpurGear', _defaults).load()
+    with pytest.raises(ValueError):
+        settings.update(thickness=3.0, numTeeth=value)
+    # Nothing from the rejected update is kept.
+    assert settings.values == _defaults
+
+
+def test_updateRejectsUnknownSettings(log):
+    settings = CommandSettings(_Design(), 'SpurGear', _defaults).load()
+    with pytest.raises(KeyError):
+        settings.update(colour='red')
@@ -0,0 +1,72 @@
+# Where each DXF sink leaves its output, and that temporary files go away on
+# close.
+
+import os
+
+import ezdxf
+import pytest
+
+from dxfSink import FileDxfSink, MemoryDxfSink, TempFileDxfSink, createDxfSink
+
+
+@pytest.fixture(autouse=True)
+def tempDir(tmp_path, monkeypatch):
+    monkeypatch.setenv('NOSUPPORTS_TMPDIR', str(tmp_path))
+    return tmp_path
+
+
+def _doc():
+    doc = ezdxf.new()
+    doc.modelspace().add_lwpolyline([(0, 0), (1, 0), (1, 1)], close=True)
+    return doc
+
+
+def _polylineCount(path):
+    return len(ezdxf.readfile(path).modelspace().query('LWPOLYLINE'))
+
+
+def test_tempFileIsImportedAndRemovedOnClose(tempDir):
+    with TempFileDxfSink() as sink:
+        sink.write(_doc())
+        path = sink.importPath()
+        assert os.path.dirname(path) == str(tempDir)
+        assert sink.bytesWritten == os.path.getsize(path)
+        assert _polylineCount(path) == 1
+    assert not os.path.exists(path)
+    assert sink.importPath() is None
+    # Closing twice is harmless.
+    sink.close()
+
+
+def test_streamedTempFileIsRemovedOnClose(tempDir):
+    with TempFileDxfSink() as sink:
+        sink.writeWith(lambda stream: stream.write('0\nEOF\n'))
+        assert sink.bytesWritten == 6
+    assert not os.listdir(str(tempDir))
+
+
+def test_memoryOnlySpillsWhenAPathIsAsked(tempDir):
+    sink = MemoryDxfSink()
+    sink.write(_doc())
+    assert sink.bytesWritten == len(sink.getvalue().encode('utf8'))
+    assert not os.listdir(str(tempDir))
+
+    path = sink.importPath()
+    assert sink.importPath() == path
+    assert _polylineCount(path) == 1
+    sink.close()
+    assert not os.listdir(str(tempDir))
+
+
+def test_fileIsLeftInPlace(tempDir):
+    path = str(tempDir / 'panel.dxf')
+    with FileDxfSink(path) as sink:
+        sink.write(_doc())
+        assert sink.importPath() == path
+    assert _polylineCount(path) == 1
+
+
+def test_unknownSinkTypeIsRejected():
+    assert isinstance(createDxfSink('memory'), MemoryDxfSink)
+    with pytest.raises(ValueError):
+        createDxfSink('floppy')
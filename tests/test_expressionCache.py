@@ -0,0 +1,68 @@
+# The dialog expression cache must only answer from memory until it is told
+# that parameters may have changed.
+
+from expressionCache import ExpressionCache
+
+
+# Evaluates expressions that are a single user parameter name and counts the
+# API calls it would have made.
+class _UnitsManager:
+    def __init__(self, **parameters):
+        self.parameters = parameters
+        self.calls = 0
+
+    def isValidExpression(self, expression, unitType):
+        self.calls += 1
+        return expression in self.parameters
+
+    def evaluateExpression(self, expression, unitType):
+        self.calls += 1
+        return self.parameters[expression]
+
+
+def test_repeatedEvaluationsMakeNoApiCalls():
+    units = _UnitsManager(width=2.0)
+    cache = ExpressionCache()
+    assert cache.evaluate(units, 'width', 'mm') == (True, 2.0)
+    assert cache.evaluate(units, 'width', 'mm') == (True, 2.0)
+    assert cache.evaluate(units, 'height', 'mm') == (False, 0)
+    assert cache.evaluate(units, 'height', 'mm') == (False, 0)
+    assert units.calls == 3
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_unitTypeIsPartOfTheKey():
+    units = _UnitsManager(width=2.0)
+    cache = ExpressionCache()
+    cache.evaluate(units, 'width', 'mm')
+    cache.evaluate(units, 'width', 'in')
+    assert cache.misses == 2
+
+
+def test_invalidateSeesChangedParameters():
+    units = _UnitsManager(width=2.0)
+    cache = ExpressionCache()
+    cache.evaluate(units, 'width', 'mm')
+    cache.evaluate(units, 'height', 'mm')
+
+    units.parameters.update(width=5.0, height=1.0)
+    # Until invalidated, the old answers stand.
+    assert cache.evaluate(units, 'width', 'mm') == (True, 2.0)
+    cache.invalidate()
+    assert cache.evaluate(units, 'width', 'mm') == (True, 5.0)
+    assert cache.evaluate(units, 'height', 'mm') == (True, 1.0)
+    assert cache.revision == 1
+
+
+def test_leastRecentlyUsedExpressionIsDropped():
+    units = _UnitsManager(a=1.0, b=2.0, c=3.0)
+    cache = ExpressionCache(maxEntries=2)
+    cache.evaluate(units, 'a', 'mm')
+    cache.evaluate(units, 'b', 'mm')
+    cache.evaluate(units, 'a', 'mm')
+    cache.evaluate(units, 'c', 'mm')
+    calls = units.calls
+    cache.evaluate(units, 'a', 'mm')
+    assert units.calls == calls
+    cache.evaluate(units, 'b', 'mm')
+    assert units.calls == calls + 2
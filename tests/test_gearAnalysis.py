@@ -0,0 +1,94 @@
+# The tooth and mesh checks validateInputs runs, against the textbook limits
+# they stand for.
+
+import math
+
+import pytest
+
+from gearAnalysis import analyzeGear
+from gearSpec import GearSpec
+
+
+def _spec(numTeeth, pressureAngle, rootFilletRad=0.0):
+    return GearSpec(8.0, numTeeth, math.radians(pressureAngle), rootFilletRad=rootFilletRad)
+
+
+def _messages(issues):
+    return [issue.message for issue in issues]
+
+
+def _involute(angle):
+    return math.tan(angle) - angle
+
+
+# The diameter at which the flanks of a tooth with no backlash meet: where
+# the tooth's half angle pi / 2N + inv(pressureAngle) - inv(phi) reaches zero.
+def _pointedDia(spec):
+    halfAngle = math.pi / (2 * spec.numTeeth) + _involute(spec.pressureAngle)
+    low, high = 0.0, math.pi / 2
+    for _ in range(60):
+        phi = (low + high) / 2
+        if _involute(phi) < halfAngle:
+            low = phi
+        else:
+            high = phi
+    return spec.baseCircleDia / math.cos(phi)
+
+
+def test_standardGearHasNoIssues():
+    assert analyzeGear(_spec(24, 20.0, 0.05), 40) == ()
+
+
+@pytest.mark.parametrize('numTeeth', [4, 8, 12])
+def test_pointedTeethAreFoundWhereTheFlanksMeet(numTeeth):
+    spec = _spec(numTeeth, 35.0)
+    issue = analyzeGear(spec)[0]
+    assert issue.isError and issue.message.startswith('The teeth come to a point')
+    # The limit is the first sampled diameter at or past the point.
+    sampleStep = (spec.outsideDia - max(spec.baseCircleDia, spec.rootDia)) / 63
+    assert 0.0 <= issue.limit - _pointedDia(spec) <= sampleStep
+    assert _pointedDia(spec) < spec.outsideDia
+
+
+# A rack undercuts gears with fewer than 2 / sin(pressureAngle)^2 teeth.
+@pytest.mark.parametrize('pressureAngle, minTeeth', [(14.5, 32), (20.0, 18), (25.0, 12)])
+def test_undercutIsAWarningBelowTheRackLimit(pressureAngle, minTeeth):
+    issue, = analyzeGear(_spec(minTeeth - 1, pressureAngle))
+    assert not issue.isError
+    assert 'fewer than {} teeth'.format(minTeeth) in issue.message
+    assert analyzeGear(_spec(minTeeth, pressureAngle)) == ()
+
+
+def test_crowdedTeethAndOverlappingFilletsAreErrors():
+    assert _messages(analyzeGear(_spec(100, 35.0))) == [
+        'The teeth run into each other at the root.  Use more teeth or a smaller pressure angle.']
+    assert _messages(analyzeGear(_spec(24, 20.0, 0.2))) == [
+        'The root fillets of neighbouring teeth overlap.  The root fillet radius must be smaller.']
+
+
+# A tip interferes when it reaches past the point where the line of action
+# touches the other gear's base circle.
+def _interferes(tipGear, flankGear):
+    lineOfAction = (tipGear.pitchDia + flankGear.pitchDia) / 2.0 * math.sin(tipGear.pressureAngle)
+    return tipGear.outsideDia / 2.0 > math.hypot(tipGear.baseCircleDia / 2.0, lineOfAction)
+
+
+@pytest.mark.parametrize('numTeeth, mateTeeth, pressureAngle', [
+    (12, 12, 14.5), (12, 12, 20.0), (12, 12, 25.0), (6, 40, 20.0), (12, 100, 20.0), (12, 100, 25.0),
+    (17, 17, 20.0), (30, 30, 20.0)])
+def test_meshInterferenceMatchesTheLineOfAction(numTeeth, mateTeeth, pressureAngle):
+    spec = _spec(numTeeth, pressureAngle)
+    mate = _spec(mateTeeth, pressureAngle)
+    messages = _messages(analyzeGear(spec, mateTeeth))
+    assert ("The mating gear's teeth cut into this gear's flanks below its base circle." in messages) \
+        == _interferes(mate, spec)
+    assert ("This gear's teeth cut into the mating gear's flanks below its base circle." in messages) \
+        == _interferes(spec, mate)
+    # Full-depth teeth always hand over to the next pair before contact ends.
+    assert not [message for message in messages if 'contact ratio' in message]
+
+
+def test_errorsComeBeforeWarnings():
+    issues = analyzeGear(_spec(6, 20.0), 40)
+    assert [issue.isError for issue in issues] == [True, False]
+    assert analyzeGear(_spec(6, 20.0), 40) is issues
@@ -0,0 +1,109 @@
+# Exported gear outlines must be simple counterclockwise polygons that reach
+# from the root circle to the outside circle, and must read back unchanged.
+
+import io
+import math
+import os
+
+import ezdxf
+import numpy as np
+import pytest
+
+shapely = pytest.importorskip('shapely')
+
+from gearAnalysis import analyzeGear
+from gearBatch import ExportGear, writeGear
+from gearExport import GearOutline, streamGearDxf, svgGearDocument
+from gearSpec import GearSpec
+
+_tolerance = 0.0005
+
+# (module mm, teeth, pressure angle degrees, backlash mm, root fillet mm,
+# hole mm)
+_gears = [
+    (1.0, 12, 20.0, 0.0, 0.0, 0.0),
+    (1.0, 24, 20.0, 0.05, 0.2, 5.0),
+    (2.5, 48, 14.5, 0.0, 0.5, 20.0),
+    (0.5, 120, 25.0, 0.02, 0.1, 0.0),
+]
+
+
+def _spec(module, teeth, pressureAngle, backlash, rootFillet, hole):
+    return GearSpec(25.4 / module, teeth, math.radians(pressureAngle), backlash / 10.0, 0.0,
+                    rootFillet / 10.0, hole / 10.0)
+
+
+# The outline with every bulged segment replaced by points along its arc.
+def _sampledOutline(points, bulges, steps=16):
+    samples = []
+    for start, end, bulge in zip(points, np.roll(points, -1, axis=0), bulges):
+        samples.append(start)
+        if bulge == 0.0:
+            continue
+        # The center lies to the left of the chord for a counterclockwise arc.
+        sweep = 4.0 * math.atan(bulge)
+        chord = end - start
+        normal = np.array((-chord[1], chord[0])) / np.hypot(*chord)
+        center = (start + end) / 2.0 + normal * np.hypot(*chord) / 2.0 / math.tan(sweep / 2.0)
+        radius = np.hypot(*(start - center))
+        startAngle = math.atan2(*(start - center)[::-1])
+        for angle in startAngle + sweep * np.arange(1, steps) / steps:
+            samples.append(center + radius * np.array((math.cos(angle), math.sin(angle))))
+    return np.array(samples)
+
+
+@pytest.mark.parametrize('gear', _gears, ids=lambda gear: '{}t'.format(gear[1]))
+def test_outlineIsValidPolygonFromRootToOutside(gear):
+    spec = _spec(*gear)
+    assert not [issue for issue in analyzeGear(spec) if issue.isError]
+    outline = GearOutline(spec, _tolerance)
+    samples = _sampledOutline(outline.points, outline.bulges)
+    polygon = shapely.Polygon(samples)
+
+    assert polygon.is_valid
+    assert polygon.exterior.is_ccw
+    radii = np.hypot(samples[:, 0], samples[:, 1])
+    assert radii.min() == pytest.approx(spec.rootDia * 5.0, abs=1e-5)
+    assert radii.max() == pytest.approx(outline.outsideRadius, abs=1e-5)
+    assert outline.outsideRadius == pytest.approx(spec.outsideDia * 5.0)
+    # The teeth are rotated copies of one another.
+    assert len(outline.points) % spec.numTeeth == 0
+    if spec.holeDiam > 0.0:
+        assert outline.holeRadius < radii.min()
+
+
+@pytest.mark.parametrize('gear', _gears, ids=lambda gear: '{}t'.format(gear[1]))
+def test_dxfReadsBackAsOutline(gear):
+    outline = GearOutline(_spec(*gear), _tolerance)
+    stream = io.StringIO()
+    streamGearDxf(outline, stream)
+    doc = ezdxf.read(io.StringIO(stream.getvalue()))
+
+    assert doc.header['$INSUNITS'] == 4
+    polyline, = doc.modelspace().query('POLYLINE')
+    assert polyline.is_closed
+    vertices = np.array([(v.dxf.location[0], v.dxf.location[1], v.dxf.bulge) for v in polyline.vertices])
+    assert np.allclose(vertices[:, :2], outline.points, atol=1e-6)
+    assert np.allclose(vertices[:, 2], outline.bulges, atol=1e-6)
+    circles = doc.modelspace().query('CIRCLE')
+    assert len(circles) == (1 if outline.holeRadius else 0)
+
+
+def test_svgHasOneArcPerBulge():
+    outline = GearOutline(_spec(*_gears[1]), _tolerance)
+    document = svgGearDocument(outline)
+    assert document.count(' A ') == np.count_nonzero(outline.bulges)
+    assert '<circle cx="0" cy="0" r="2.5"/>' in document
+
+
+def test_batchOutputIsRepeatable(tmp_path):
+    defaults = _spec(1.0, 0, 20.0, 0.0, 0.0, 0.0)
+    gear = ExportGear(1, {'numTeeth': '24', 'rootFilletRad': '0.2', 'holeDiam': '5'}, defaults, 'both',
+                      _tolerance)
+    contents = []
+    for outDir in (tmp_path / 'a', tmp_path / 'b'):
+        outDir.mkdir()
+        files, seconds = writeGear((gear, str(outDir)))
+        contents.append([(os.path.basename(path), open(path, 'rb').read()) for path, numBytes in files])
+    assert contents[0] == contents[1]
+    assert [name.rsplit('.', 1)[-1] for name, data in contents[0]] == ['dxf', 'svg']
@@ -0,0 +1,99 @@
+# GearSpec must give the dimensions drawGear and the dialog computed inline
+# before it existed, and round-trip through the attribute drawGear writes.
+
+import math
+
+import pytest
+
+from gearSpec import GearSpec, gearSpecFromAttribute, gearSpecFromParameters
+
+
+# The dimensions as the original drawGear and validateInputs worked them out.
+def _baseline(diametralPitch, numTeeth, pressureAngle, backlash):
+    diametralPitch = diametralPitch / 2.54
+    pitchDia = numTeeth / diametralPitch
+    if (diametralPitch < (20 *(math.pi/180))-0.000001):
+        dedendum = 1.157 / diametralPitch
+    else:
+        circularPitch = math.pi / diametralPitch
+        if circularPitch >= 20:
+            dedendum = 1.25 / diametralPitch
+        else:
+            dedendum = (1.2 / diametralPitch) + (.002 * 2.54)
+    rootDia = pitchDia - (2 * dedendum)
+    baseCircleDia = pitchDia * math.cos(pressureAngle)
+    baseCircleCircumference = 2 * math.pi * (baseCircleDia / 2)
+    outsideDia = (numTeeth + 2) / diametralPitch
+    toothThickness = baseCircleCircumference / (numTeeth * 2)
+
+    baseCircleRadius = baseCircleDia / 2.0
+    distance = pitchDia / 2.0
+    alpha = math.sqrt(math.pow(distance, 2) - math.pow(baseCircleRadius, 2)) / baseCircleRadius
+    theta = alpha - math.acos(baseCircleRadius / distance)
+    pitchPointAngle = math.atan((distance * math.sin(theta)) / (distance * math.cos(theta)))
+    toothThicknessAngle = (2 * math.pi) / (2 * numTeeth)
+    backlashAngle = (backlash / (pitchDia / 2.0)) * .25
+    rotateAngle = -((toothThicknessAngle/2) + pitchPointAngle - backlashAngle)
+
+    return {'pitchDia': pitchDia, 'dedendum': dedendum, 'rootDia': rootDia, 'baseCircleDia': baseCircleDia,
+            'outsideDia': outsideDia, 'maxHoleDiam': rootDia - 0.01, 'maxRootFilletRad': toothThickness * .4,
+            'pitchPointAngle': pitchPointAngle, 'rotateAngle': rotateAngle}
+
+
+# Coarse pitches take the 1.157 dedendum, a 2 mm module the metric one.
+@pytest.mark.parametrize('diametralPitch', [0.5, 8.0, 12.7, 32.0])
+@pytest.mark.parametrize('numTeeth', [6, 24, 97])
+@pytest.mark.parametrize('pressureAngle', [14.5, 20.0, 25.0])
+def test_dimensionsMatchTheOriginalFormulas(diametralPitch, numTeeth, pressureAngle):
+    pressureAngle = math.radians(pressureAngle)
+    spec = GearSpec(diametralPitch, numTeeth, pressureAngle, 0.01, 1.27, 0.05, 0.5)
+    for name, value in _baseline(diametralPitch, numTeeth, pressureAngle, 0.01).items():
+        assert getattr(spec, name) == value, name
+
+
+def test_specIsImmutable():
+    spec = GearSpec(8.0, 24, math.radians(20.0))
+    with pytest.raises(AttributeError):
+        spec.numTeeth = 12
+    assert spec.replace(numTeeth=12).numTeeth == 12
+    assert spec.numTeeth == 24
+
+
+def test_attributeRoundTrips():
+    spec = GearSpec(8.0, 24, math.radians(20.0), 0.01, 1.27, 0.05, 0.5)
+    text = spec.attributeValue()
+    assert text.startswith("{'diametralPitch': '8.0', 'numTeeth': '24', 'thickness': '1.27'")
+    assert gearSpecFromAttribute(text) == spec
+    assert gearSpecFromAttribute("{'numTeeth': '24'}") is None
+    assert gearSpecFromAttribute('not a dict') is None
+
+
+def test_changesIgnoreConversionNoise():
+    spec = GearSpec(8.0, 24, math.radians(20.0), thickness=1.27)
+    assert not spec.changes(spec.replace(thickness=1.27 + 1e-12))
+    assert spec.changes(spec.replace(thickness=2.0, numTeeth=25)) == {'thickness', 'numTeeth'}
+
+
+def test_parametersAreReadInMillimetersAndDegrees():
+    defaults = GearSpec(8.0, 24, math.radians(20.0), thickness=1.27)
+    spec = gearSpecFromParameters({'numTeeth': '30', 'module': '2', 'pressureAngle': '25', 'thickness': '5',
+                                   'holeDiam': ''}, defaults)
+    assert spec.diametralPitch == pytest.approx(12.7)
+    assert spec.pressureAngle == pytest.approx(math.radians(25.0))
+    assert spec.thickness == pytest.approx(0.5)
+    assert spec.holeDiam == 0.0
+    assert gearSpecFromParameters({'numTeeth': 12}, defaults) == defaults.replace(numTeeth=12)
+    with pytest.raises(KeyError):
+        gearSpecFromParameters({'module': '2'}, defaults)
+
+
+@pytest.mark.parametrize('changes, problem', [
+    ({}, None),
+    ({'numTeeth': 3}, 'The number of teeth must be 4 or more.'),
+    ({'holeDiam': 10.0}, 'The center hole diameter is too large.  It must be less than '),
+    ({'rootFilletRad': 1.0}, 'The root fillet radius is too large.  It must be less than '),
+])
+def test_problemIsTheFirstCheckThatFails(changes, problem):
+    spec = GearSpec(8.0, 24, math.radians(20.0), rootFilletRad=0.05, holeDiam=0.5).replace(**changes)
+    found = spec.problem()
+    assert (found and found[0]) == problem
@@ -0,0 +1,74 @@
+# Gears laid out by gearTrain must mesh: their outlines, placed and turned as
+# the train says, come close without cutting into one another.
+
+import math
+
+import pytest
+
+shapely = pytest.importorskip('shapely')
+from shapely import affinity
+
+from gearExport import GearOutline
+from gearSpec import GearSpec
+from gearTrain import gearTrainFromParameterSets
+
+# Module 1 mm and a 0.1 mm backlash, so meshing teeth have a small gap.
+_defaults = GearSpec(25.4, 12, math.radians(20.0), backlash=0.01)
+_tolerance = 0.0005
+
+
+# The outline of a train gear in millimetres, where the train puts it.
+def _placedOutline(gear):
+    polygon = shapely.Polygon(GearOutline(gear.spec, _tolerance).points)
+    polygon = affinity.rotate(polygon, gear.rotation, origin=(0.0, 0.0), use_radians=True)
+    return affinity.translate(polygon, gear.center[0] * 10.0, gear.center[1] * 10.0)
+
+
+def _train(*paramSets):
+    return gearTrainFromParameterSets(list(paramSets), _defaults)
+
+
+@pytest.mark.parametrize('paramSets', [
+    ({'numTeeth': 12}, {'numTeeth': 30}),
+    ({'numTeeth': 13}, {'numTeeth': 13, 'direction': 90}),
+    ({'numTeeth': 24, 'x': 5, 'y': -3}, {'numTeeth': 17, 'direction': 37}),
+    ({'numTeeth': 20}, {'numTeeth': 31, 'direction': 200}, {'numTeeth': 12, 'direction': 75},
+     {'numTeeth': 40, 'mate': 0, 'direction': -60}),
+], ids=['pair', 'equal', 'offset', 'chain'])
+def test_meshingGearsTouchWithoutCutting(paramSets):
+    gears = _train(*paramSets)
+    outlines = [_placedOutline(gear) for gear in gears]
+    for gear, outline in zip(gears, outlines):
+        if gear.mate is None:
+            continue
+        mate = gears[gear.mate]
+        distance = math.dist(gear.center, mate.center)
+        assert distance == pytest.approx((gear.spec.pitchDia + mate.spec.pitchDia) / 2.0)
+        assert not outline.intersects(outlines[gear.mate])
+        # The gap is less than the backlash.
+        assert outline.distance(outlines[gear.mate]) < 0.1
+
+
+# Turned half a tooth the other way, the same gears would cut into each other.
+def test_wrongPhaseWouldCut():
+    mate, gear = _train({'numTeeth': 12}, {'numTeeth': 30, 'direction': 45})
+    gear.rotation += math.pi / gear.spec.numTeeth
+    assert _placedOutline(gear).intersection(_placedOutline(mate)).area > 0.1
+
+
+def test_unmatedGearStaysWhereItIsPut():
+    first, second = _train({'numTeeth': 12, 'x': 10, 'y': 20}, {'numTeeth': 12, 'mate': 'none', 'x': -4})
+    assert first.center == pytest.approx((1.0, 2.0)) and first.rotation == 0.0
+    assert second.mate is None and second.center == pytest.approx((-0.4, 0.0))
+
+
+@pytest.mark.parametrize('paramSets, message', [
+    (({'numTeeth': 12}, {'numTeeth': 12, 'mate': 1}), 'gear2: the mate must be one of the gears before it.'),
+    (({'numTeeth': 12}, {'numTeeth': 12, 'module': 2}), 'gear2: it must have the same pitch'),
+    (({'numTeeth': 12, 'name': 'pinion'}, {'numTeeth': 'many'}), 'gear2: '),
+    (({'numTeeth': 3},), 'gear1: The number of teeth must be 4 or more.'),
+])
+def test_badTrainsAreRejectedByName(paramSets, message):
+    with pytest.raises(ValueError) as error:
+        _train(*paramSets)
+    assert str(error.value).startswith(message)
@@ -0,0 +1,74 @@
+# The involute samples and control-point splines against a dense involute.
+
+import math
+
+import numpy as np
+import pytest
+
+shapely = pytest.importorskip('shapely')
+
+from gearSpec import GearSpec
+from involuteKernel import (adaptiveInvoluteRadii, involutePoints, involuteRadii, involuteSplineControlPoints,
+                            maxInvoluteSamples, minInvoluteSamples)
+
+_tolerance = 0.0005
+
+_specs = [GearSpec(8.0, numTeeth, math.radians(pressureAngle))
+          for numTeeth in (8, 12, 24, 48, 120) for pressureAngle in (14.5, 20.0, 25.0)]
+
+
+def _specId(spec):
+    return '{}t-{:g}deg'.format(spec.numTeeth, round(math.degrees(spec.pressureAngle), 1))
+
+
+# The involute from innerRadius to outsideRadius as a polyline fine enough
+# that its own chord error is negligible.
+def _denseInvolute(baseRadius, innerRadius, outsideRadius, count=4000):
+    tMin = math.sqrt(max((innerRadius / baseRadius) ** 2 - 1.0, 0.0))
+    tMax = math.sqrt((outsideRadius / baseRadius) ** 2 - 1.0)
+    radii = baseRadius * np.sqrt(1.0 + np.linspace(tMin, tMax, count) ** 2)
+    return shapely.LineString(involutePoints(baseRadius, radii))
+
+
+# Points along the cubic Bezier segments a control-point spline is made of.
+def _splinePoints(controlPoints, samplesPerSegment=100):
+    u = np.linspace(0.0, 1.0, samplesPerSegment)[:, None]
+    weights = np.hstack(((1 - u) ** 3, 3 * u * (1 - u) ** 2, 3 * u * u * (1 - u), u ** 3))
+    segments = np.array([controlPoints[i:i + 4] for i in range(0, len(controlPoints) - 1, 3)])
+    return np.einsum('sk,nkd->nsd', weights, segments).reshape(-1, 2)
+
+
+@pytest.mark.parametrize('spec', _specs, ids=_specId)
+@pytest.mark.parametrize('fromRoot', [False, True], ids=['base', 'root'])
+def test_splineDeviationIsBounded(spec, fromRoot):
+    baseRadius = spec.baseCircleDia / 2.0
+    outsideRadius = spec.outsideDia / 2.0
+    innerRadius = max(spec.rootDia / 2.0, baseRadius) if fromRoot else None
+    controlPoints, knots, deviation = involuteSplineControlPoints(baseRadius, outsideRadius, _tolerance,
+                                                                  innerRadius=innerRadius)
+
+    involute = _denseInvolute(baseRadius, innerRadius or baseRadius, outsideRadius)
+    measured = max(shapely.distance(shapely.points(_splinePoints(controlPoints)), involute))
+    assert measured <= deviation <= _tolerance
+    assert len(knots) == len(controlPoints) + 4
+    assert np.allclose(controlPoints[-1], involutePoints(baseRadius, [outsideRadius])[0])
+
+
+@pytest.mark.parametrize('spec', _specs, ids=_specId)
+def test_adaptiveChordsStayWithinTolerance(spec):
+    baseRadius = spec.baseCircleDia / 2.0
+    outsideRadius = spec.outsideDia / 2.0
+    radii = adaptiveInvoluteRadii(baseRadius, outsideRadius, _tolerance)
+
+    assert minInvoluteSamples <= len(radii) <= maxInvoluteSamples
+    assert radii[0] == baseRadius and radii[-1] == outsideRadius
+    assert np.all(np.diff(radii) > 0.0)
+    chords = shapely.LineString(involutePoints(baseRadius, radii))
+    dense = _denseInvolute(baseRadius, baseRadius, outsideRadius)
+    assert shapely.hausdorff_distance(chords, dense) <= _tolerance
+
+
+def test_evenRadiiKeepTheOldSpacing():
+    radii = involuteRadii(1.0, 2.0, 5)
+    assert radii.tolist() == [1.0, 1.25, 1.5, 1.75, 2.0]
+    assert involuteRadii(1.0, 2.0, 3, innerRadius=1.5).tolist() == [1.5, 1.75, 2.0]
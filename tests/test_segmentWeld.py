@@ -0,0 +1,47 @@
+# Welding must drop only repeated edges: the welded segments cover the flat
+# chevron geometry exactly and do not overlap one another.
+
+import pytest
+
+shapely = pytest.importorskip('shapely')
+
+from chevronDxf import dxfChevronLayout
+from chevronGeometry import ChevronGrid
+from segmentWeld import weldPolylines
+
+_tolerance = 1e-6
+# Edges that meet at a shallow angle do not node cleanly in floating point, so
+# the overlays are done on a fine precision grid.
+_gridSize = 1e-9
+
+
+@pytest.mark.parametrize('grid', [
+    (100.0, 80.0, 6, 5, 2.0, 3.0),
+    (250.0, 120.0, 40, 23, 1.2, 4.4),
+])
+def test_weldedSegmentsCoverFlatGeometry(grid):
+    polylines = list(ChevronGrid(dxfChevronLayout(*grid)).polylines())
+    result = weldPolylines(polylines, _tolerance)
+
+    flat = shapely.union_all([shapely.LineString(polyline) for polyline in polylines], grid_size=_gridSize)
+    welded = [shapely.LineString(segment) for segment in result.segments]
+    weldedUnion = shapely.union_all(welded, grid_size=_gridSize)
+
+    assert result.removed > 0
+    assert result.segmentsIn == sum(len(polyline) - 1 for polyline in polylines)
+    assert shapely.symmetric_difference(flat, weldedUnion, grid_size=_gridSize).length < _tolerance
+    # No part of an edge is written twice.
+    assert sum(line.length for line in welded) == pytest.approx(weldedUnion.length, abs=_tolerance)
+
+
+def test_weldMergesOverlappingCollinearSegments():
+    result = weldPolylines([[(0.0, 0.0), (2.0, 0.0)], [(1.0, 0.0), (3.0, 0.0)], [(3.0, 0.0), (4.0, 0.0)]])
+    assert sorted(result.segments) == [((0.0, 0.0), (3.0, 0.0)), ((3.0, 0.0), (4.0, 0.0))]
+    assert result.verticesWelded == 1
+
+
+# The offsets of these lines round to neighbouring steps of the tolerance.
+def test_weldMergesSegmentsAcrossAnOffsetStep():
+    tolerance = 1e-6
+    result = weldPolylines([[(0.0, 0.49e-6), (2.0, 0.49e-6)], [(1.0, 0.51e-6), (3.0, 0.51e-6)]], tolerance)
+    assert result.segments == [((0.0, 0.49e-6), (3.0, 0.51e-6))]
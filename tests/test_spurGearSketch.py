@@ -0,0 +1,54 @@
+# The tooth sketch drawGear builds, run against the recording adsk stand-in.
+
+import math
+
+import pytest
+
+import runBenchmarks
+import adsk.core
+from adsk._recording import callLog
+
+
+# Builds a patterned gear with numTeeth teeth and returns the (x, y) of every
+# Point3D it created.
+def _drawPatternedGear(monkeypatch, numTeeth, splineType):
+    gear = runBenchmarks._loadSpurGear()
+    created = []
+    create = adsk.core.Point3D.create
+
+    def recordingCreate(x=0.0, y=0.0, z=0.0):
+        created.append((x, y))
+        return create(x, y, z)
+
+    monkeypatch.setattr(adsk.core.Point3D, 'create', recordingCreate)
+    monkeypatch.setattr(gear, '_involuteSplineType', splineType)
+    monkeypatch.setattr(gear, '_involutePointCount', None)
+    monkeypatch.setattr(gear, '_gearBuildMode', 'pattern')
+    design = runBenchmarks._prepareGear(gear)
+    callLog.reset()
+    spec = runBenchmarks._gearSpec(numTeeth)
+    gear.drawGear(design, spec)
+    return spec, created
+
+
+# Below about 42 teeth the base circle is outside the root circle, so lines
+# join the flanks to the root.
+@pytest.mark.parametrize('splineType, tangents', [('controlPoint', 0), ('fitted', 2)])
+@pytest.mark.parametrize('numTeeth', [12, 24, 36])
+def test_rootLinesRunRadiallyFromTheFlanks(monkeypatch, numTeeth, splineType, tangents):
+    spec, created = _drawPatternedGear(monkeypatch, numTeeth, splineType)
+    assert spec.baseCircleDia > spec.rootDia
+
+    rootRadius = spec.rootDia / 2.0
+    rootPoints = [(x, y) for x, y in created if math.isclose(math.hypot(x, y), rootRadius, rel_tol=1e-12)]
+    # The flanks start on the base circle at the tooth's rotate angle.
+    angles = sorted(math.atan2(y, x) for x, y in rootPoints)
+    assert angles == pytest.approx(sorted((spec.rotateAngle, -spec.rotateAngle)), abs=1e-12)
+    # Fixed splines already leave the base circle along the lines.
+    assert callLog.calls['geometricConstraints.addTangent'] == tangents
+
+
+def test_largeGearJoinsTheFlanksDirectly(monkeypatch):
+    spec, created = _drawPatternedGear(monkeypatch, 60, 'controlPoint')
+    assert spec.baseCircleDia < spec.rootDia
+    assert callLog.calls['geometricConstraints.addTangent'] == 0